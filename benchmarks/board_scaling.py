@@ -0,0 +1,59 @@
+import io
+import time
+import random
+import contextlib
+from helper_classes.environment import TicTacToe
+from helper_classes.q_learner import QLearningAgent
+from train_model import play_episode
+
+BOARDS = [(3, 3), (4, 4), (5, 4), (6, 4)]
+
+def measure_board(size: int, win_length: int, backend: str, episodes: int, capacity: int, seed: int) -> dict:
+    """
+        Args:
+            size: Number of rows and columns of the board
+            win_length: Marks in a row needed to win
+            backend: Q-table backend of the agents, "dict" or "hashed"
+            episodes: Number of self-play episodes
+            capacity: State slots of the hashed backend
+            seed: Seed of the random module
+
+        Returns:
+            Episodes and moves per second, entries and bytes of player 1's q_table and the states dropped by a full hashed table
+
+        Concept:
+            Headless self-play on the board with the same loop as train_model.train.
+    """
+
+    random.seed(seed)
+    env = TicTacToe(headless=True, size=size, win_length=win_length)
+    agent1 = QLearningAgent(player=1, epsilon=0.25, alpha=0.07, gamma=0.8, backend=backend, size=size, capacity=capacity)
+    agent2 = QLearningAgent(player=-1, epsilon=0.25, alpha=0.07, gamma=0.8, backend=backend, size=size, capacity=capacity)
+
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(episodes):
+        play_episode(env, agent1, agent2)
+        moves += bin(env.masks[1] | env.masks[-1]).count("1")
+    elapsed = time.perf_counter() - start
+
+    return {
+        "episodes_per_sec": episodes / elapsed,
+        "steps_per_sec": moves / elapsed,
+        "entries": len(agent1.q_table),
+        "nbytes": agent1.q_table.nbytes(),
+        "dropped": getattr(agent1.q_table, "dropped", 0),
+    }
+
+if __name__ == "__main__":
+    episodes = 2000
+    capacity = 1 << 17
+    seed = 0
+
+    print(f"{episodes} self-play episodes per run, hashed capacity {capacity} states")
+    for size, win_length in BOARDS:
+        for backend in ("dict", "hashed"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = measure_board(size, win_length, backend, episodes, capacity, seed)
+            print(f"{size}x{size} k={win_length} {backend:6s} {result['episodes_per_sec']:8,.0f} episodes/s {result['steps_per_sec']:9,.0f} steps/s "
+                  f"{result['entries']:9,d} entries {result['nbytes'] / 2 ** 20:8.1f} MiB  {result['dropped']} dropped")
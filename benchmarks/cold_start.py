@@ -0,0 +1,69 @@
+import sys
+import time
+import statistics
+import subprocess
+
+# Run in a fresh interpreter: everything test_model.py does before the agent's first move, minus the window
+FIRST_MOVE = """
+import sys, time, io, contextlib
+start = time.perf_counter()
+import numpy
+numpy_done = time.perf_counter()
+import test_model
+loader = test_model.ModelLoader({1: sys.argv[1], -1: sys.argv[2]}, {1: test_model.compiled_policy(sys.argv[1]), -1: test_model.compiled_policy(sys.argv[2])})
+env = test_model.TicTacToe(headless=True)
+agent = test_model.QLearningAgent(player=1, q_table=loader.get(1), policy=loader.get_policy(1))
+with contextlib.redirect_stdout(io.StringIO()):
+    agent.choose_action(env.reset(), env.available_actions())
+end = time.perf_counter()
+print(numpy_done - start, end - numpy_done, "pygame" in sys.modules)
+"""
+
+def cold_start(agent1_file: str, agent2_file: str, runs: int) -> dict:
+    """
+        Args:
+            agent1_file: Model file of player 1
+            agent2_file: Model file of player 2
+            runs: Number of fresh processes to start
+
+        Returns:
+            Median seconds of the whole process, of the NumPy import and of everything after it up to the first move,
+            and whether pygame was imported
+
+        Concept:
+            Every run starts a new Python process, so nothing is cached in the interpreter; the OS page cache stays warm.
+    """
+
+    process_times, numpy_times, startup_times = [], [], []
+    pygame_imported = False
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", FIRST_MOVE, agent1_file, agent2_file], capture_output=True, text=True, check=True).stdout
+        process_times.append(time.perf_counter() - start)
+        numpy_time, startup_time, pygame_flag = output.split()
+        numpy_times.append(float(numpy_time))
+        startup_times.append(float(startup_time))
+        pygame_imported |= pygame_flag == "True"
+
+    return {
+        "process": statistics.median(process_times),
+        "numpy": statistics.median(numpy_times),
+        "first_move": statistics.median(startup_times),
+        "pygame": pygame_imported,
+    }
+
+if __name__ == "__main__":
+    runs = 15
+    target = 0.1
+    results = {}
+    for name, files in (("binary (.qtb, memory-mapped)", ("agents/agent1_q_table.qtb", "agents/agent2_q_table.qtb")),
+                        ("pickle (.pkl)", ("agents/agent1_q_table.pkl", "agents/agent2_q_table.pkl"))):
+        result = results[name] = cold_start(*files, runs)
+        print(f"{name:30s} process {result['process'] * 1000:7.1f} ms, numpy import {result['numpy'] * 1000:6.1f} ms, "
+              f"imports + model + first move {result['first_move'] * 1000:6.1f} ms, pygame imported: {result['pygame']}")
+
+    best = min(results.values(), key=lambda result: result["process"])
+    print(f"Cold start to first move, whole process without the window: {best['process'] * 1000:.1f} ms (target {target * 1000:.0f} ms): "
+          f"{'ok' if best['process'] < target else 'MISSED'}")
+    print(f"  of which process start, interpreter and NumPy import {(best['process'] - best['first_move']) * 1000:.1f} ms, "
+          f"test_model.py imports + model + first move {best['first_move'] * 1000:.1f} ms (post-import only)")
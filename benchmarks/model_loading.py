@@ -0,0 +1,45 @@
+import os
+import time
+import tracemalloc
+from helper_classes.q_learner import QLearningAgent
+
+def measure_load(backend: str, filename: str, repeats: int) -> tuple[float, int]:
+    """
+        Args:
+            backend: Q-table backend of the agent
+            filename: Model file to load
+            repeats: Number of loads to time
+
+        Returns:
+            Best load time in seconds and the peak Python memory allocated by one load in bytes
+
+        Concept:
+            Times QLearningAgent.load_model, then measures one more load under tracemalloc.
+    """
+
+    agent = QLearningAgent(player=1, backend=backend)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        agent.load_model(filename)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    agent.load_model(filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+if __name__ == "__main__":
+    repeats = 20
+    runs = [
+        ("pickle -> dict", "dict", "agents/agent1_q_table.pkl"),
+        ("pickle -> array", "array", "agents/agent1_q_table.pkl"),
+        ("binary -> dict", "dict", "agents/agent1_q_table.qtb"),
+        ("binary -> array (memmap)", "array", "agents/agent1_q_table.qtb"),
+    ]
+
+    for name, backend, filename in runs:
+        seconds, peak = measure_load(backend, filename, repeats)
+        print(f"{name:26s} {os.path.getsize(filename):8d} bytes on disk  {seconds * 1000:8.2f} ms  {peak / 1024:8.0f} KiB allocated")
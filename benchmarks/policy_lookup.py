@@ -0,0 +1,81 @@
+import os
+import time
+import random
+from helper_classes.encoding import NUM_ACTIONS, reachable_states
+from helper_classes.policy import GreedyPolicy
+from helper_classes.q_learner import QLearningAgent
+from test_model import PickledQTable, BinaryQTable
+
+def open_positions() -> list:
+    """
+        Args:
+            None
+
+        Returns:
+            (state id, legal actions) of every reachable board with an empty cell
+    """
+
+    positions = []
+    for state in reachable_states().tolist():
+        legal = [action for action in range(NUM_ACTIONS) if state // 3 ** action % 3 == 0]
+        if legal:
+            positions.append((state, legal))
+    return positions
+
+def q_table_move(q_table, state: int, legal: list) -> int:
+    # The move selection of test_model.QLearningAgent without a compiled policy
+    q_values = q_table.q_values(state, legal)
+    max_q = max(q_values)
+    return random.choice([a for a, q in zip(legal, q_values) if q == max_q])
+
+def time_per_move(choose, positions: list, rounds: int) -> float:
+    """
+        Args:
+            choose: Function of (state id, legal actions) returning a move
+            positions: Positions to choose moves in
+            rounds: Passes over the positions, the fastest is kept
+
+        Returns:
+            Nanoseconds per move
+    """
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for state, legal in positions:
+            choose(state, legal)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(positions)
+
+if __name__ == "__main__":
+    rounds = 10
+    pickle_file = os.path.join("agents", "agent1_q_table.pkl")
+    binary_file = os.path.join("agents", "agent1_q_table.qtb")
+    policy_file = os.path.join("agents", "agent1_q_table.qtp")
+    positions = open_positions()
+
+    agent = QLearningAgent(player=1, epsilon=0, backend="array")
+    agent.load_model(binary_file)
+    start = time.perf_counter()
+    compiled = GreedyPolicy.from_q_table(agent.q_table)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    mismatches = compiled.validate(agent.q_table)
+    validate_time = time.perf_counter() - start
+    print(f"Compiled in {compile_time * 1000:.1f} ms, validated in {validate_time * 1000:.1f} ms: {mismatches} of {len(positions)} positions differ")
+
+    pickled = PickledQTable(pickle_file)
+    binary = BinaryQTable(binary_file)
+    policy = GreedyPolicy.load(policy_file) if os.path.exists(policy_file) else compiled
+    paths = {
+        "pickle dict (test_model)": lambda state, legal: q_table_move(pickled, state, legal),
+        "memory-mapped .qtb (test_model)": lambda state, legal: q_table_move(binary, state, legal),
+        "array backend best_actions": lambda state, legal: random.choice(agent.q_table.best_actions(state, legal)),
+        "compiled policy": lambda state, legal: policy.choose(state),
+    }
+
+    baseline = None
+    for name, choose in paths.items():
+        ns = time_per_move(choose, positions, rounds)
+        baseline = baseline or ns
+        print(f"{name:32s} {ns:8,.0f} ns/move {baseline / ns:6.1f}x")
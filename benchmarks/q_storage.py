@@ -0,0 +1,142 @@
+import io
+import os
+import pickle
+import tempfile
+import contextlib
+import numpy as np
+from evaluate_model import play_matchup
+from helper_classes.encoding import NUM_ACTIONS, POW3
+from helper_classes.model_format import QUANTIZATIONS, entries_to_arrays, save_binary, load_binary
+from helper_classes.q_learner import QLearningAgent
+from helper_classes.solver import load_or_solve, score_policy
+from train_model import train
+
+def greedy_masks(values: np.ndarray, states: np.ndarray) -> np.ndarray:
+    """
+        Args:
+            values: (num_states, 9) q values with one row per entry of states
+            states: State ids of the rows
+
+        Returns:
+            Bit mask of the greedy actions (ties included, occupied cells excluded) of every row
+    """
+
+    boards = states[:, None] // POW3 % 3
+    masked = np.where(boards == 0, values, -np.inf)
+    greedy = masked == masked.max(axis=1, keepdims=True)
+    return greedy.astype(np.int64) @ (1 << np.arange(NUM_ACTIONS))
+
+def policy_quality(agent1: QLearningAgent, agent2: QLearningAgent, games: int) -> dict:
+    """
+        Args:
+            agent1: Agent of player 1 (X) with an array q_table
+            agent2: Agent of player 2 (O) with an array q_table
+            games: Games per matchup
+
+        Returns:
+            Solver agreement of both agents, player 1's win rate against a random player and its loss rate against the optimal player
+    """
+
+    states, _, optimal = load_or_solve()
+    tables = (agent1.q_table, agent2.q_table)
+    x_wins, _, _ = play_matchup("agent1 vs random", tables, games, 1024, 0)
+    _, o_wins, _ = play_matchup("agent1 vs optimal", tables, games, 1024, 0)
+    return {
+        "agreement": (score_policy(agent1.q_table.values, states, optimal, 1), score_policy(agent2.q_table.values, states, optimal, -1)),
+        "win_vs_random": x_wins / games,
+        "loss_vs_optimal": o_wins / games,
+    }
+
+def report_quantization(agent_files: tuple, games: int) -> None:
+    """
+        Args:
+            agent_files: Pickled q_tables of player 1 and player 2
+            games: Games per matchup
+
+        Returns:
+            None
+
+        Concept:
+            Exports both agents in every .qtb value format, loads them back and prints the file size, the largest value error,
+            the share of positions whose greedy moves changed and the policy quality. Errors and greedy changes are measured against
+            the float64 values of the pickles. The matches are played with the array backend, which holds the loaded values as float32.
+    """
+
+    states, _, _ = load_or_solve()
+    reference = []
+    for player, filename in zip((1, -1), agent_files):
+        # The pickled float64 values themselves, the array backend would already round them to float32
+        agent = QLearningAgent(player=player, backend="dict")
+        agent.load_model(filename)
+        reference.append(entries_to_arrays(agent.q_table.to_dict(), states, NUM_ACTIONS, np.float64))
+
+    print(f"{'format':8s} {'bytes':>9s} {'max error':>10s} {'greedy changed':>15s} {'agreement':>13s} {'win vs random':>14s} {'loss vs optimal':>16s}")
+    with tempfile.TemporaryDirectory() as directory:
+        for quantization in QUANTIZATIONS:
+            agents = []
+            size = 0
+            error = 0.0
+            changed = []
+            for player, (values, visited) in zip((1, -1), reference):
+                output = os.path.join(directory, f"agent{player}.{quantization}.qtb")
+                save_binary(output, states, values, visited, quantization)
+                size += os.path.getsize(output)
+                exported = np.asarray(load_binary(output)[1], dtype=np.float64)
+                error = max(error, float(np.max(np.abs(exported - values))))
+                changed.append(np.mean(greedy_masks(exported, states) != greedy_masks(values, states)))
+
+                agent = QLearningAgent(player=player, backend="array")
+                agent.load_model(output)
+                agents.append(agent)
+
+            changed = np.mean(changed)
+            quality = policy_quality(agents[0], agents[1], games)
+            print(f"{quantization:8s} {size:9,d} {error:10.2e} {changed:15.2%} {quality['agreement'][0]:6.1%}/{quality['agreement'][1]:6.1%} "
+                  f"{quality['win_vs_random']:14.1%} {quality['loss_vs_optimal']:16.1%}")
+
+def report_bounded(episodes: int, capacities: list, games: int, seed: int) -> None:
+    """
+        Args:
+            episodes: Self-play episodes per run
+            capacities: State caps of the bounded backend
+            games: Games per matchup
+            seed: Seed of the training runs
+
+        Returns:
+            None
+
+        Concept:
+            Trains with the dict backend and with the bounded backend under every cap and eviction policy, then prints the entries,
+            memory and pickle size of the tables and the policy quality.
+    """
+
+    states, _, _ = load_or_solve()
+    runs = [("dict", 0, "lru")] + [("bounded", capacity, eviction) for capacity in capacities for eviction in ("lru", "lfu")]
+
+    print(f"{'backend':16s} {'entries':>8s} {'memory':>10s} {'pickle':>9s} {'evicted':>8s} {'agreement':>13s} {'win vs random':>14s} {'loss vs optimal':>16s}")
+    for backend, capacity, eviction in runs:
+        with contextlib.redirect_stdout(io.StringIO()):
+            trained = train(episodes, 0.25, 0.07, 0.8, headless=True, backend=backend, capacity=capacity or 1 << 16, eviction=eviction, seed=seed, save=False)
+
+        agents = []
+        for agent in trained:
+            array_agent = QLearningAgent(player=agent.player, backend="array")
+            array_agent.q_table.load_arrays(states, *entries_to_arrays(agent.q_table.to_dict(), states, NUM_ACTIONS, np.float32))
+            agents.append(array_agent)
+
+        quality = policy_quality(agents[0], agents[1], games)
+        name = f"{backend} {capacity} {eviction}" if capacity else backend
+        entries = sum(len(agent.q_table) for agent in trained)
+        memory = sum(agent.q_table.nbytes() for agent in trained)
+        pickled = sum(len(pickle.dumps(agent.q_table.to_dict())) for agent in trained)
+        evicted = sum(getattr(agent.q_table, "evicted", 0) for agent in trained)
+        print(f"{name:16s} {entries:8,d} {memory / 1024:7,.0f} KiB {pickled:9,d} {evicted:8,d} {quality['agreement'][0]:6.1%}/{quality['agreement'][1]:6.1%} "
+              f"{quality['win_vs_random']:14.1%} {quality['loss_vs_optimal']:16.1%}")
+
+if __name__ == "__main__":
+    games = 20000
+    print("Exported value formats of the shipped agents (sizes are both files together):")
+    report_quantization((os.path.join("agents", "agent1_q_table.pkl"), os.path.join("agents", "agent2_q_table.pkl")), games)
+    print()
+    print("Memory-bounded q_tables after 50000 self-play episodes (sizes are both tables together):")
+    report_bounded(50000, [1500, 750, 300], games, seed=0)
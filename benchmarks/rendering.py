@@ -0,0 +1,51 @@
+import io
+import time
+import random
+import contextlib
+from helper_classes.environment import TicTacToe
+from helper_classes.q_learner import QLearningAgent
+from train_model import play_episode
+
+def episodes_per_second(mode: str, seconds: float, delay: float, seed: int) -> tuple[float, int, int]:
+    """
+        Args:
+            mode: "headless", "sync" (PygameRenderer) or "async" (AsyncRenderer)
+            seconds: How long to train
+            delay: Seconds the renderer waits after every frame
+            seed: Seed of the random module
+
+        Returns:
+            Self-play episodes per second, frames drawn and frames dropped
+
+        Concept:
+            Trains with every episode rendered, so the difference to headless is the cost of watching.
+    """
+
+    random.seed(seed)
+    env = TicTacToe(headless=True)
+    if mode != "headless":
+        from helper_classes.renderer import PygameRenderer, AsyncRenderer
+        renderer_class = AsyncRenderer if mode == "async" else PygameRenderer
+        env.attach_renderer(renderer_class("Rendering benchmark", delay=delay), every=1)
+    agent1 = QLearningAgent(player=1, epsilon=0.25, alpha=0.07, gamma=0.8)
+    agent2 = QLearningAgent(player=-1, epsilon=0.25, alpha=0.07, gamma=0.8)
+
+    episodes = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() - start < seconds:
+            play_episode(env, agent1, agent2)
+            episodes += 1
+    elapsed = time.perf_counter() - start
+
+    renderer = env.renderer
+    env.close_pygame()
+    return episodes / elapsed, getattr(renderer, "drawn", 0), getattr(renderer, "dropped", 0)
+
+if __name__ == "__main__":
+    # Set SDL_VIDEODRIVER=dummy to run without a display
+    seconds = 3.0
+    delay = 0.1
+    for mode in ("headless", "sync", "async"):
+        rate, drawn, dropped = episodes_per_second(mode, seconds, delay, seed=0)
+        print(f"{mode:8s} {rate:10,.1f} episodes/s" + (f"  {drawn} frames drawn, {dropped} dropped" if mode == "async" else ""))
@@ -0,0 +1,55 @@
+import io
+import os
+import time
+import random
+import contextlib
+from helper_classes.environment import TicTacToe
+from helper_classes.q_learner import QLearningAgent
+from train_model import play_episode, train_shared
+from benchmarks.symmetry import win_rate_vs_random
+
+def train_single_process(episodes: int, seed: int) -> tuple[QLearningAgent, int, float]:
+    """
+        Args:
+            episodes: Number of self-play episodes
+            seed: Seed of the random module
+
+        Returns:
+            The trained player 1 agent, the number of moves played and the elapsed seconds
+
+        Concept:
+            Reference run: the same self-play loop in this process on an array q_table.
+    """
+
+    random.seed(seed)
+    env = TicTacToe(headless=True)
+    agent1 = QLearningAgent(player=1, epsilon=0.25, alpha=0.07, gamma=0.8, backend="array")
+    agent2 = QLearningAgent(player=-1, epsilon=0.25, alpha=0.07, gamma=0.8, backend="array")
+
+    moves = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(episodes):
+            play_episode(env, agent1, agent2)
+            moves += int((env.board != 0).sum())
+
+    return agent1, moves, time.perf_counter() - start
+
+if __name__ == "__main__":
+    episodes = 20000      # Episodes per run, split over the actors
+    eval_games = 2000     # Games against a random opponent for the convergence check
+    seed = 0
+    process_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    agent1, moves, elapsed = train_single_process(episodes, seed)
+    print(f"single process: {moves / elapsed:,.0f} steps/s, player 1 wins {win_rate_vs_random(agent1, eval_games):.1%} vs random")
+
+    for lock_stripes in (0, 64):
+        for actors in process_counts:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent1, _, moves = train_shared(episodes, 0.25, 0.07, 0.8, actors=actors, lock_stripes=lock_stripes, seed=seed, save=False)
+            elapsed = time.perf_counter() - start
+
+            mode = f"{lock_stripes} stripe locks" if lock_stripes else "lock-free"
+            print(f"shared, {actors} processes, {mode}: {moves / elapsed:,.0f} steps/s, player 1 wins {win_rate_vs_random(agent1, eval_games):.1%} vs random")
@@ -0,0 +1,252 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import random
+import argparse
+import platform
+import contextlib
+from helper_classes.environment import TicTacToe
+from helper_classes.q_learner import QLearningAgent
+from train_model import train
+
+BASELINE = os.path.join("benchmarks", "baseline.json")
+
+# Code the benchmarks time; a baseline recorded against other versions of these files no longer measures this tree
+HOT_PATH_SOURCES = [
+    os.path.join("helper_classes", name) for name in ("bitboard.py", "encoding.py", "environment.py", "geometry.py", "q_learner.py", "q_tables.py", "symmetry.py")
+] + ["train_model.py"]
+
+# A full game ending in a draw, so every move of it is legal after a reset
+DRAW_GAME = (4, 0, 2, 6, 3, 5, 1, 7, 8)
+# X to move, with two open lines so check_critical has work to do
+MIDGAME = (4, 0, 8, 2)
+
+def midgame_env() -> TicTacToe:
+    env = TicTacToe(headless=True)
+    env.reset()
+    for action in MIDGAME:
+        env.make_move(action)
+    return env
+
+def bench_make_move() -> tuple:
+    env = TicTacToe(headless=True)
+
+    def run() -> None:
+        env.reset()
+        for action in DRAW_GAME:
+            env.make_move(action)
+
+    return run, len(DRAW_GAME)
+
+def bench_check_winner() -> tuple:
+    env = midgame_env()
+    return env.check_winner, 1
+
+def bench_check_critical() -> tuple:
+    env = midgame_env()
+    return lambda: env.check_critical(1), 1
+
+def bench_available_actions() -> tuple:
+    env = midgame_env()
+    return env.available_actions, 1
+
+def bench_get_state() -> tuple:
+    env = midgame_env()
+    agent = QLearningAgent(player=1)
+    return lambda: agent.get_state(env.board), 1
+
+def bench_choose_action() -> tuple:
+    env = midgame_env()
+    agent = QLearningAgent(player=1, epsilon=0.25)
+    agent.load_model(os.path.join("agents", "agent1_q_table.pkl"))
+    actions = env.available_actions()
+    return lambda: agent.choose_action(env.board, actions), 1
+
+def bench_update_q_table() -> tuple:
+    env = midgame_env()
+    agent = QLearningAgent(player=1, alpha=0.07, gamma=0.8)
+    agent.load_model(os.path.join("agents", "agent1_q_table.pkl"))
+    state = agent.get_state(env.board)
+    actions = env.available_actions()
+    env.make_move(actions[0])
+    next_state = agent.get_state(env.board)
+    next_actions = env.available_actions()
+    return lambda: agent.update_q_table(state, actions[0], 0.1, next_state, next_actions), 1
+
+def bench_train_episode() -> tuple:
+    episodes = 500
+
+    def run() -> None:
+        random.seed(0)
+        train(episodes, 0.25, 0.07, 0.8, headless=True, save=False)
+
+    return run, episodes
+
+def bench_load_pickle() -> tuple:
+    agent = QLearningAgent(player=1)
+    return lambda: agent.load_model(os.path.join("agents", "agent1_q_table.pkl")), 1
+
+BENCHMARKS = {
+    # name: (setup returning (call, operations per call), calls per sample)
+    "env.make_move": (bench_make_move, 200),
+    "env.check_winner": (bench_check_winner, 2000),
+    "env.check_critical": (bench_check_critical, 2000),
+    "env.available_actions": (bench_available_actions, 2000),
+    "agent.get_state": (bench_get_state, 2000),
+    "agent.choose_action": (bench_choose_action, 2000),
+    "agent.update_q_table": (bench_update_q_table, 2000),
+    "train.episode": (bench_train_episode, 1),
+    "load.pickle": (bench_load_pickle, 2),
+}
+
+def measure(setup, calls: int, samples: int) -> dict:
+    """
+        Args:
+            setup: Benchmark setup, returns the call to time and the operations it performs
+            calls: Calls per sample
+            samples: Number of timed samples
+
+        Returns:
+            {"ns_per_op", "ops_per_sec", "samples"} of the fastest sample
+
+        Concept:
+            Runs one warm-up sample, then keeps the fastest sample, which is the least disturbed by other load on the machine.
+            Everything printed by the code under test is discarded.
+    """
+
+    call, operations = setup()
+    best = float("inf")
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for sample in range(samples + 1):
+            start = time.perf_counter_ns()
+            for _ in range(calls):
+                call()
+            elapsed = time.perf_counter_ns() - start
+            if sample:
+                best = min(best, elapsed)
+
+    ns_per_op = best / (calls * operations)
+    return {"ns_per_op": ns_per_op, "ops_per_sec": 1e9 / ns_per_op, "samples": samples}
+
+def source_hashes() -> dict:
+    """
+        Args:
+            None
+
+        Returns:
+            SHA-256 of every file in HOT_PATH_SOURCES
+    """
+
+    hashes = {}
+    for filename in HOT_PATH_SOURCES:
+        with open(filename, 'rb') as f:
+            hashes[filename.replace(os.sep, "/")] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+def stale_sources(results: dict, baseline: dict) -> list:
+    """
+        Args:
+            results: Output of run_suite
+            baseline: Stored output of an earlier run
+
+        Returns:
+            Hot-path files that changed since the baseline was recorded (all of them for a baseline without hashes)
+    """
+
+    recorded = baseline.get("sources", {})
+    return [filename for filename, digest in results["sources"].items() if recorded.get(filename) != digest]
+
+def run_suite(names: list, samples: int) -> dict:
+    """
+        Args:
+            names: Benchmarks to run
+            samples: Timed samples per benchmark
+
+        Returns:
+            Machine-readable results: environment info and the measurement of every benchmark
+    """
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "time": time.time(),
+        "sources": source_hashes(),
+        "benchmarks": {},
+    }
+    for name in names:
+        setup, calls = BENCHMARKS[name]
+        results["benchmarks"][name] = measure(setup, calls, samples)
+
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+        Args:
+            results: Output of run_suite
+            baseline: Stored output of an earlier run
+            threshold: Allowed slowdown, 0.2 for 20%
+
+        Returns:
+            (name, baseline ns/op, current ns/op, ratio, regressed) per benchmark present in both
+
+        Concept:
+            A benchmark regresses when its time per operation grew by more than the threshold.
+    """
+
+    rows = []
+    for name, current in results["benchmarks"].items():
+        if name not in baseline.get("benchmarks", {}):
+            continue
+        before = baseline["benchmarks"][name]["ns_per_op"]
+        ratio = current["ns_per_op"] / before
+        rows.append((name, before, current["ns_per_op"], ratio, ratio > 1 + threshold))
+
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the environment, agent and training hot paths.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--output", default="", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing, 0.2 for 20%%")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_suite(names, args.samples)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    rows = {row[0]: row for row in compare(results, baseline, args.threshold)} if baseline else {}
+    for name, result in results["benchmarks"].items():
+        line = f"{name:24s} {result['ns_per_op']:14,.0f} ns/op {result['ops_per_sec']:14,.0f} ops/s"
+        if name in rows:
+            _, _, _, ratio, regressed = rows[name]
+            line += f"  {ratio:6.2f}x baseline" + ("  REGRESSION" if regressed else "")
+            if regressed:
+                regressions.append(name)
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    stale = stale_sources(results, baseline) if baseline else []
+    if stale:
+        print(f"Baseline is stale, recorded before changes to: {', '.join(stale)}. Check the ratios above, then re-record it with --save-baseline")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+    if stale or regressions:
+        sys.exit(1)
@@ -0,0 +1,78 @@
+import io
+import random
+import contextlib
+from helper_classes.environment import TicTacToe
+from helper_classes.q_learner import QLearningAgent
+from train_model import play_episode
+
+def win_rate_vs_random(agent: QLearningAgent, games: int) -> float:
+    """
+        Args:
+            agent: Agent to evaluate, played greedily
+            games: Number of games to play
+
+        Returns:
+            Fraction of games won by the agent against a uniformly random opponent
+
+        Concept:
+            Plays headless games with exploration turned off.
+    """
+
+    env = TicTacToe(headless=True)
+    epsilon, agent.epsilon = agent.epsilon, 0
+    wins = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(games):
+            board = env.reset()
+            done = False
+            while not done:
+                actions = env.available_actions()
+                player = env.current_player
+                action = agent.choose_action(board, actions) if player == agent.player else random.choice(actions)
+                reward, done = env.make_move(action)
+            wins += reward == agent.player
+    agent.epsilon = epsilon
+
+    return wins / games
+
+def episodes_to_target(symmetry: bool, target: float, max_episodes: int, eval_every: int, eval_games: int, seed: int) -> tuple[int, int]:
+    """
+        Args:
+            symmetry: Whether the agents use the symmetry layer
+            target: Win rate of player 1 against a random opponent to reach
+            max_episodes: Give up after this many self-play episodes
+            eval_every: Episodes between evaluations
+            eval_games: Games per evaluation
+            seed: Seed of the random module
+
+        Returns:
+            Episodes needed to reach the target (-1 if never reached) and the size of the q_table of player 1
+
+        Concept:
+            Self-play training with the default hyperparameters of train_model.py, evaluated periodically.
+    """
+
+    random.seed(seed)
+    env = TicTacToe(headless=True)
+    agent1 = QLearningAgent(player=1, epsilon=0.25, alpha=0.07, gamma=0.8, symmetry=symmetry)
+    agent2 = QLearningAgent(player=-1, epsilon=0.25, alpha=0.07, gamma=0.8, symmetry=symmetry)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for episode in range(1, max_episodes + 1):
+            play_episode(env, agent1, agent2)
+            if episode % eval_every == 0 and win_rate_vs_random(agent1, eval_games) >= target:
+                return episode, len(agent1.q_table)
+
+    return -1, len(agent1.q_table)
+
+if __name__ == "__main__":
+    target = 0.9          # Win rate of player 1 against a random opponent
+    max_episodes = 100000 # Give up after this many episodes
+    eval_every = 1000     # Episodes between evaluations
+    eval_games = 1000     # Games per evaluation
+    seeds = [0, 1, 2]
+
+    for symmetry in (False, True):
+        for seed in seeds:
+            episodes, size = episodes_to_target(symmetry, target, max_episodes, eval_every, eval_games, seed)
+            print(f"symmetry={symmetry} seed={seed}: {episodes} episodes to reach {target:.0%} wins vs random, q_table size {size}")
@@ -0,0 +1,132 @@
+import os
+import sys
+import pickle
+import numpy as np
+from helper_classes.encoding import NUM_ACTIONS, is_legacy_q_table, convert_legacy_q_table, encode_board, encode_action, reachable_states
+from helper_classes.model_format import save_binary, load_binary, entries_to_arrays, arrays_to_entries, quantize, fingerprint
+from helper_classes.policy import GreedyPolicy
+from helper_classes.q_learner import QLearningAgent
+
+def convert_pickle(filename: str, output: str = None) -> None:
+    """
+        Args:
+            filename: Pickled q_table keyed by (tuple-of-tuples board, (row, col)) pairs
+            output: Where to write the converted q_table, filename itself if None
+
+        Returns:
+            None
+
+        Concept:
+            Re-keys the q_table by (state id, action id) pairs, checks that every entry survived unchanged and writes it back as a pickled dict.
+    """
+
+    output = output or filename
+    with open(filename, 'rb') as f:
+        q_table = pickle.load(f)
+
+    if not is_legacy_q_table(q_table):
+        print(f"{filename}: already uses integer ids")
+        return
+
+    converted = convert_legacy_q_table(q_table)
+    if len(converted) != len(q_table):
+        raise ValueError(f"{filename}: conversion lost entries")
+    for (state, action), q in q_table.items():
+        if converted[(encode_board(np.array(state)), encode_action(action))] != q:
+            raise ValueError(f"{filename}: conversion changed a value")
+
+    size_before = os.path.getsize(filename)
+    with open(output, 'wb') as f:
+        pickle.dump(converted, f)
+
+    print(f"{filename}: {len(converted)} entries, {size_before} -> {os.path.getsize(output)} bytes")
+
+def convert_to_binary(filename: str, output: str = None, quantization: str = None) -> None:
+    """
+        Args:
+            filename: Pickled q_table, with integer or legacy keys
+            output: Where to write the binary q_table, filename with a .qtb extension (.float16.qtb, .int8.qtb when quantized) if None
+            quantization: "float16" or "int8" to store quantized values, None for float64
+
+        Returns:
+            None
+
+        Concept:
+            Writes the q_table in the memory-mappable binary format with float64 values, and checks that reading it back gives the same entries.
+            The header keeps the fingerprint of the pickle, so test_model.py can tell whether the .qtb still matches it.
+            A quantized file is checked to hold the same entries within half a quantization step.
+    """
+
+    suffix = f".{quantization}.qtb" if quantization else ".qtb"
+    output = output or os.path.splitext(filename)[0] + suffix
+    with open(filename, 'rb') as f:
+        q_table = pickle.load(f)
+
+    if is_legacy_q_table(q_table):
+        q_table = convert_legacy_q_table(q_table)
+
+    states = reachable_states()
+    values, visited = entries_to_arrays(q_table, states, NUM_ACTIONS, np.float64)
+    save_binary(output, states, values, visited, quantization, source=fingerprint(filename))
+    loaded = arrays_to_entries(*load_binary(output))
+    if quantization is None and loaded != q_table:
+        raise ValueError(f"{filename}: binary conversion changed the q_table")
+    if quantization is not None:
+        _, scale = quantize(values, quantization)
+        tolerance = scale / 2 if quantization == "int8" else np.max(np.abs(values)) * 2 ** -11
+        if loaded.keys() != q_table.keys() or max((abs(loaded[key] - q) for key, q in q_table.items()), default=0) > tolerance:
+            raise ValueError(f"{filename}: quantized values are off by more than half a step")
+
+    print(f"{filename} -> {output}: {len(q_table)} entries, {os.path.getsize(output)} bytes")
+
+def compile_policy(filename: str, output: str = None) -> None:
+    """
+        Args:
+            filename: q_table saved by save_model, .pkl or .qtb
+            output: Where to write the compiled policy, filename with a .qtp extension if None
+
+        Returns:
+            None
+
+        Concept:
+            Compiles the greedy policy of the q_table (see helper_classes/policy.py) and checks it against the q_table in every reachable position.
+            The .pkl and .qtb files next to filename are checked as well, and the policy stores the fingerprint of every file it agrees with,
+            so test_model.py uses it only with those exact files.
+    """
+
+    base = os.path.splitext(filename)[0]
+    output = output or base + ".qtp"
+    agent = QLearningAgent(player=1)
+    agent.load_model(filename)
+
+    policy = GreedyPolicy.from_q_table(agent.q_table)
+    mismatches = policy.validate(agent.q_table)
+    if mismatches:
+        raise ValueError(f"{filename}: compiled policy differs from the q_table in {mismatches} positions")
+
+    sources = [filename] + [base + extension for extension in (".pkl", ".qtb") if os.path.exists(base + extension) and base + extension != filename]
+    validated = []
+    for source in sources:
+        agent.load_model(source)
+        if source == filename or not policy.validate(agent.q_table):
+            validated.append(source)
+    policy.fingerprints = [fingerprint(source) for source in validated]
+    policy.save(output)
+
+    print(f"{filename} -> {output}: {os.path.getsize(output)} bytes, validated against {', '.join(validated)}")
+
+if __name__ == "__main__":
+    # python convert_agents.py [--binary] [--quantize=float16|int8] [--policy] [files...]
+    arguments = sys.argv[1:]
+    quantization = next((argument.split("=", 1)[1] for argument in arguments if argument.startswith("--quantize=")), None)
+    binary = "--binary" in arguments or quantization is not None
+    policy = "--policy" in arguments
+    filenames = [argument for argument in arguments if not argument.startswith("--")] or ["agents/agent1_q_table.pkl", "agents/agent2_q_table.pkl"]
+
+    for filename in filenames:
+        if policy:
+            compile_policy(filename)
+        elif binary:
+            convert_to_binary(filename, quantization=quantization)
+        else:
+            convert_pickle(filename)
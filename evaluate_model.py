@@ -0,0 +1,224 @@
+import time
+import argparse
+import multiprocessing
+import numpy as np
+from helper_classes.batch_environment import BatchTicTacToe
+from helper_classes.encoding import NUM_STATES, NUM_ACTIONS, POW3
+from helper_classes.inference import BatchPolicy
+from helper_classes.q_learner import QLearningAgent
+from helper_classes.solver import load_or_solve, score_policy
+
+MATCHUPS = {
+    # name: (policy of player 1, policy of player 2, player the agents are scored as)
+    "agent1 vs random": ("agent", "random", 1),
+    "random vs agent2": ("random", "agent", -1),
+    "agent1 vs optimal": ("agent", "optimal", 1),
+    "optimal vs agent2": ("optimal", "agent", -1),
+    "agent1 vs agent2": ("agent", "agent", 1),
+}
+
+def optimal_table() -> np.ndarray:
+    """
+        Args:
+            None
+
+        Returns:
+            (3^9, 9) boolean array of the optimal actions of every state id
+
+        Concept:
+            Spreads the solver's optimal action masks over all state ids so a batch of boards can be looked up by state id.
+    """
+
+    states, _, optimal = load_or_solve()
+    table = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=bool)
+    table[states] = (optimal[:, None] >> np.arange(NUM_ACTIONS)) & 1
+
+    return table
+
+def choose_actions(kind: str, env: BatchTicTacToe, policy: BatchPolicy, optimal: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+        Args:
+            kind: "agent", "random" or "optimal"
+            env: Batch environment, one action is chosen per board
+            policy: Greedy policy of the trained agents
+            optimal: Optimal action table from optimal_table()
+            rng: Random generator
+
+        Returns:
+            One action per board
+
+        Concept:
+            agent plays greedily, random plays a uniformly random empty cell, optimal plays a uniformly random optimal cell.
+    """
+
+    if kind == "agent":
+        return policy.choose(env.boards)[0]
+    if kind == "random":
+        return env.sample_actions(rng)
+
+    states = (env.boards % 3).astype(np.int64) @ POW3
+    scores = rng.random(env.boards.shape) * optimal[states]
+    return scores.argmax(axis=1)
+
+def play_matchup(matchup: str, policy_source: tuple, games: int, batch_size: int, seed: int) -> tuple[int, int, int]:
+    """
+        Args:
+            matchup: Key of MATCHUPS
+            policy_source: (agent1 file, agent2 file) or (agent1 array q_table, agent2 array q_table)
+            games: Number of games to play
+            batch_size: Number of boards played at once
+            seed: Seed of the random generators
+
+        Returns:
+            player 1 wins, player 2 wins and draws
+
+        Concept:
+            Plays the games on a BatchTicTacToe with auto-reset. Every board slot plays a fixed share of the games; once a slot
+            has played its share its results are ignored. Runs in a worker process.
+    """
+
+    x_kind, o_kind, _ = MATCHUPS[matchup]
+    rng = np.random.default_rng(seed)
+    if isinstance(policy_source[0], str):
+        policy = BatchPolicy(*policy_source, seed=seed)
+    else:
+        policy = BatchPolicy.from_q_tables(*policy_source, seed=seed)
+    optimal = optimal_table() if "optimal" in (x_kind, o_kind) else None
+
+    batch_size = min(batch_size, games)
+    env = BatchTicTacToe(batch_size)
+    games_left = np.full(batch_size, games // batch_size)
+    games_left[:games % batch_size] += 1
+    counts = np.zeros(3, dtype=np.int64)
+
+    while np.any(games_left > 0):
+        x_actions = choose_actions(x_kind, env, policy, optimal, rng)
+        o_actions = x_actions if x_kind == o_kind else choose_actions(o_kind, env, policy, optimal, rng)
+        rewards, dones = env.step(np.where(env.current_player == 1, x_actions, o_actions))
+
+        finished = dones & (games_left > 0)
+        counts += [np.count_nonzero(finished & (rewards == 1)), np.count_nonzero(finished & (rewards == -1)), np.count_nonzero(finished & (rewards == 0))]
+        games_left -= finished
+
+    return tuple(counts.tolist())
+
+def wilson_interval(successes: int, total: int, z: float = 1.96) -> tuple[float, float]:
+    """
+        Args:
+            successes: Number of successes
+            total: Number of trials
+            z: Normal quantile, 1.96 for 95%
+
+        Returns:
+            Lower and upper bound of the confidence interval of the success rate
+
+        Concept:
+            Wilson score interval, well behaved for rates close to 0 or 1.
+    """
+
+    if total == 0:
+        return 0.0, 0.0
+    rate = successes / total
+    center = (rate + z * z / (2 * total)) / (1 + z * z / total)
+    margin = z * np.sqrt(rate * (1 - rate) / total + z * z / (4 * total * total)) / (1 + z * z / total)
+
+    return center - margin, center + margin
+
+def evaluate(policy_source: tuple, games: int, workers: int = 1, batch_size: int = 4096, seed: int = 0, matchups: list = None) -> dict:
+    """
+        Args:
+            policy_source: (agent1 file, agent2 file) or (agent1 array q_table, agent2 array q_table)
+            games: Games per matchup
+            workers: Number of worker processes
+            batch_size: Boards played at once by each worker
+            seed: Base seed, every matchup and worker gets its own seed
+            matchups: Keys of MATCHUPS to play, all if None
+
+        Returns:
+            {matchup: {"games", "win", "draw", "loss", "win_ci", "draw_ci", "loss_ci"}} from the point of view of the scored agent,
+            plus {"optimal_agreement": {1: fraction, -1: fraction}}
+
+        Concept:
+            Splits the games of every matchup over a process pool, then adds the share of positions where the greedy moves are optimal.
+    """
+
+    matchups = matchups or list(MATCHUPS)
+    tasks = []
+    for m, matchup in enumerate(matchups):
+        for w in range(workers):
+            worker_games = games // workers + (w < games % workers)
+            if worker_games:
+                tasks.append((matchup, policy_source, worker_games, batch_size, seed + m * workers + w))
+
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            outcomes = pool.starmap(play_matchup, tasks)
+    else:
+        outcomes = [play_matchup(*task) for task in tasks]
+
+    totals = {matchup: np.zeros(3, dtype=np.int64) for matchup in matchups}
+    for task, outcome in zip(tasks, outcomes):
+        totals[task[0]] += outcome
+
+    results = {}
+    for matchup, (x_wins, o_wins, draws) in totals.items():
+        player = MATCHUPS[matchup][2]
+        wins, losses = (x_wins, o_wins) if player == 1 else (o_wins, x_wins)
+        total = int(x_wins + o_wins + draws)
+        results[matchup] = {
+            "games": total,
+            "win": wins / total, "win_ci": wilson_interval(wins, total),
+            "draw": draws / total, "draw_ci": wilson_interval(draws, total),
+            "loss": losses / total, "loss_ci": wilson_interval(losses, total),
+        }
+
+    states, _, optimal = load_or_solve()
+    agreement = {}
+    for player, source in ((1, policy_source[0]), (-1, policy_source[1])):
+        if isinstance(source, str):
+            agent = QLearningAgent(player=player, backend="array")
+            agent.load_model(source)
+            source = agent.q_table
+        agreement[player] = score_policy(np.asarray(source.values), states, optimal, player)
+    results["optimal_agreement"] = agreement
+
+    return results
+
+def print_results(results: dict) -> None:
+    """
+        Args:
+            results: Output of evaluate()
+
+        Returns:
+            None
+
+        Concept:
+            Prints one line per matchup with 95% confidence intervals, then the optimal-move agreement.
+    """
+
+    for matchup, result in results.items():
+        if matchup == "optimal_agreement":
+            continue
+        line = f"{matchup:18s} {result['games']:>9d} games"
+        for outcome in ("win", "draw", "loss"):
+            low, high = result[f"{outcome}_ci"]
+            line += f"  {outcome} {result[outcome]:6.2%} [{low:6.2%}, {high:6.2%}]"
+        print(line)
+
+    for player, agreement in results["optimal_agreement"].items():
+        print(f"agent{1 if player == 1 else 2}: greedy moves optimal in {agreement:.2%} of positions")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate saved agents against random, optimal and each other.")
+    parser.add_argument("--agent1", default="agents/agent1_q_table.qtb")
+    parser.add_argument("--agent2", default="agents/agent2_q_table.qtb")
+    parser.add_argument("--games", type=int, default=100000, help="Games per matchup")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = evaluate((args.agent1, args.agent2), args.games, args.workers, args.batch_size, args.seed)
+    print_results(results)
+    print(f"{args.games * len(MATCHUPS)} games in {time.perf_counter() - start:.1f} s")
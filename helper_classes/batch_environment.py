@@ -0,0 +1,140 @@
+import numpy as np
+
+# Cell indices (row * 3 + col) of the 3 rows, 3 columns and 2 diagonals
+LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6],
+])
+
+# (9, 8) matrix so that boards @ LINE_MASK gives the sum of every line of every board at once
+LINE_MASK = np.zeros((9, len(LINES)), dtype=np.int8)
+LINE_MASK[LINES, np.arange(len(LINES))[:, None]] = 1
+
+class BatchTicTacToe:
+    def __init__(self, num_envs: int, auto_reset: bool = True) -> None:
+        """
+            Args:
+                num_envs: Number of boards played at the same time
+                auto_reset: If True finished boards are reset automatically after every step
+
+            Returns:
+                None
+
+            Concept:
+                Initializes N TicTacToe boards held in a single (N, 9) int8 array together with the current player of every board and the win counts.
+        """
+
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.boards = np.zeros((num_envs, 9), dtype=np.int8)
+        self.current_player = np.ones(num_envs, dtype=np.int8)
+        self.final_boards = np.zeros((num_envs, 9), dtype=np.int8)
+        self.player1_wincount = 0
+        self.player2_wincount = 0
+        self.draw_count = 0
+
+    def reset(self, mask: np.ndarray = None) -> np.ndarray:
+        """
+            Args:
+                mask: Boolean array of the boards to reset, all boards if None
+
+            Returns:
+                The boards as an (N, 9) array
+
+            Concept:
+                Clears the selected boards and gives the first move back to player 1.
+        """
+
+        if mask is None:
+            self.boards[:] = 0
+            self.current_player[:] = 1
+        else:
+            self.boards[mask] = 0
+            self.current_player[mask] = 1
+
+        return self.boards
+
+    def boards_3x3(self) -> np.ndarray:
+        """
+            Args:
+                None
+
+            Returns:
+                View of the boards as an (N, 3, 3) array
+
+            Concept:
+                Returns the boards in the same shape as the single TicTacToe environment.
+        """
+
+        return self.boards.reshape(self.num_envs, 3, 3)
+
+    def available_actions_mask(self) -> np.ndarray:
+        """
+            Args:
+                None
+
+            Returns:
+                Boolean (N, 9) array of legal actions
+
+            Concept:
+                Returns which cells of every board are still empty.
+        """
+
+        return self.boards == 0
+
+    def sample_actions(self, rng: np.random.Generator = None) -> np.ndarray:
+        """
+            Args:
+                rng: NumPy random generator, a new one if None
+
+            Returns:
+                Array of N random legal actions
+
+            Concept:
+                Picks a uniformly random empty cell on every board.
+        """
+
+        rng = rng if rng is not None else np.random.default_rng()
+        scores = rng.random((self.num_envs, 9))
+        scores[self.boards != 0] = -1
+
+        return scores.argmax(axis=1)
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Args:
+                actions: Array of N cell indices (row * 3 + col), one per board
+
+            Returns:
+                rewards (1 if player 1 won, -1 if player 2 won, 0 otherwise) and whether each game is over
+
+            Concept:
+                Makes one move on every board, checks all boards for wins and draws with a single line-mask reduction, and resets finished boards if auto_reset is set.
+                The boards after the move, before any reset, are kept in final_boards.
+        """
+
+        actions = np.asarray(actions)
+        rows = np.arange(self.num_envs)
+        if np.any(self.boards[rows, actions] != 0):
+            raise ValueError("Illegal move: cell already taken")
+
+        players = self.current_player
+        self.boards[rows, actions] = players
+
+        line_sums = self.boards @ LINE_MASK
+        wins = np.any(line_sums == 3 * players[:, None], axis=1)
+        draws = ~wins & np.all(self.boards != 0, axis=1)
+        dones = wins | draws
+        rewards = np.where(wins, players, 0).astype(np.int8)
+
+        self.player1_wincount += int(np.count_nonzero(wins & (players == 1)))
+        self.player2_wincount += int(np.count_nonzero(wins & (players == -1)))
+        self.draw_count += int(np.count_nonzero(draws))
+
+        self.final_boards[:] = self.boards
+        self.current_player = -players
+        if self.auto_reset and np.any(dones):
+            self.reset(dones)
+
+        return rewards, dones
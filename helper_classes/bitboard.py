@@ -0,0 +1,145 @@
+# Bitboard game core: every player is a 9-bit mask where bit (row * 3 + col) is set if the player owns that cell.
+# All questions about a mask are answered through 512-entry lookup tables built at import time.
+
+FULL_BOARD = 0b111111111
+
+# Lines as cell indices, in the order TicTacToe.check_critical scans them: row i, column i for each i, then both diagonals
+LINES = (
+    (0, 1, 2), (0, 3, 6),
+    (3, 4, 5), (1, 4, 7),
+    (6, 7, 8), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+)
+LINE_MASKS = tuple(sum(1 << cell for cell in line) for line in LINES)
+
+def _build_tables() -> tuple[tuple, tuple, tuple, tuple, tuple]:
+    """
+        Args:
+            None
+
+        Returns:
+            The win, completing-square, critical-order, bit-index and empty-cell tables
+
+        Concept:
+            Builds all 512-entry lookup tables once at import time.
+    """
+
+    win = []
+    completing = []
+    critical_order = []
+    for mask in range(512):
+        win.append(any(mask & line == line for line in LINE_MASKS))
+
+        squares = 0
+        order = []
+        for line, line_mask in zip(LINES, LINE_MASKS):
+            owned = mask & line_mask
+            if bin(owned).count("1") == 2:
+                cell = (line_mask ^ owned).bit_length() - 1
+                squares |= 1 << cell
+                order.append(cell)
+        completing.append(squares)
+        critical_order.append(tuple(order))
+
+    bit_index = tuple((mask & -mask).bit_length() - 1 for mask in range(512))
+    empty_cells = tuple(tuple(cell for cell in range(9) if mask >> cell & 1) for mask in range(512))
+
+    return tuple(win), tuple(completing), tuple(critical_order), bit_index, empty_cells
+
+# WIN[mask]: the mask contains a full line
+# COMPLETING[mask]: cells that would complete a line for the owner of mask, ignoring whether they are empty
+# CRITICAL_ORDER[mask]: the same cells, one per line with two owned cells, in line scan order
+# BIT_INDEX[mask]: index of the lowest set bit
+# EMPTY_CELLS[mask]: index of every set bit, in row-major order
+WIN, COMPLETING, CRITICAL_ORDER, BIT_INDEX, EMPTY_CELLS = _build_tables()
+
+def is_win(mask: int) -> bool:
+    """
+        Args:
+            mask: 9-bit mask of a player
+
+        Returns:
+            Whether the mask contains a full line
+
+        Concept:
+            Looks the mask up in the win table.
+    """
+
+    return WIN[mask]
+
+def winning_squares(own: int, opponent: int) -> int:
+    """
+        Args:
+            own: 9-bit mask of the player
+            opponent: 9-bit mask of the opponent
+
+        Returns:
+            Mask of the empty cells that complete a line for the player
+
+        Concept:
+            Completing cells of the player that are not occupied.
+    """
+
+    return COMPLETING[own] & ~(own | opponent) & FULL_BOARD
+
+def blocking_squares(own: int, opponent: int) -> int:
+    """
+        Args:
+            own: 9-bit mask of the player
+            opponent: 9-bit mask of the opponent
+
+        Returns:
+            Mask of the empty cells that block a line of the opponent
+
+        Concept:
+            Completing cells of the opponent that are not occupied.
+    """
+
+    return COMPLETING[opponent] & ~(own | opponent) & FULL_BOARD
+
+def critical_square(own: int, empty: int) -> int:
+    """
+        Args:
+            own: 9-bit mask of the player
+            empty: 9-bit mask of the empty cells
+
+        Returns:
+            Index of the first cell (in line scan order) that completes a line for the player, or -1
+
+        Concept:
+            If only one such cell exists it is read from the bit index table, otherwise the first empty cell of the critical order is taken.
+    """
+
+    squares = COMPLETING[own] & empty
+    if not squares:
+        return -1
+    if not squares & (squares - 1):
+        return BIT_INDEX[squares]
+    for cell in CRITICAL_ORDER[own]:
+        if empty >> cell & 1:
+            return cell
+    return -1
+
+def critical(own: int, opponent: int) -> tuple[float, int]:
+    """
+        Args:
+            own: 9-bit mask of the player
+            opponent: 9-bit mask of the opponent
+
+        Returns:
+            reward and cell index of the critical position, same as TicTacToe.check_critical
+
+        Concept:
+            0.1 and the cell if the player can complete a line, -0.1 and the cell if the opponent can, otherwise 0.2 and None.
+    """
+
+    empty = ~(own | opponent) & FULL_BOARD
+    cell = critical_square(own, empty)
+    if cell >= 0:
+        return 0.1, cell
+
+    cell = critical_square(opponent, empty)
+    if cell >= 0:
+        return -0.1, cell
+
+    return 0.2, None
@@ -0,0 +1,213 @@
+import os
+import time
+import queue
+import pickle
+import threading
+from helper_classes.q_learner import QLearningAgent
+
+class Checkpointer:
+    def __init__(self, directory: str = "checkpoints", every_episodes: int = 10000, every_seconds: float = 300.0, full_every: int = 10, start_episode: int = 0) -> None:
+        """
+            Args:
+                directory: Folder the checkpoint files are written to
+                every_episodes: Checkpoint after this many episodes, 0 to disable
+                every_seconds: Checkpoint after this many seconds, 0 to disable
+                full_every: Write a full snapshot every Nth checkpoint, deltas in between
+                start_episode: Episode counter the run starts from, non-zero when resuming
+
+            Returns:
+                None
+
+            Concept:
+                The first checkpoint is a full snapshot of both q_tables, the following ones only hold the entries changed since the
+                previous checkpoint (drain_changes). Every full_every checkpoints a new full snapshot is written and the older files
+                are removed. The training loop only collects the data; a writer thread pickles it and replaces the file atomically.
+        """
+
+        self.directory = directory
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.full_every = full_every
+        os.makedirs(directory, exist_ok=True)
+
+        existing = checkpoint_files(directory)
+        self.sequence = int(existing[-1][11:17]) + 1 if existing else 0
+        # A resumed run starts with a full snapshot so it never depends on deltas of an older run
+        self.since_full = full_every
+        self.last_episode = start_episode
+        self.last_time = time.monotonic()
+
+        self.queue = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def due(self, episode: int) -> bool:
+        """
+            Args:
+                episode: Number of episodes played so far
+
+            Returns:
+                True if a checkpoint should be written now
+
+            Concept:
+                Whichever of the episode and time intervals runs out first.
+        """
+
+        if self.every_episodes and episode - self.last_episode >= self.every_episodes:
+            return True
+        return bool(self.every_seconds) and time.monotonic() - self.last_time >= self.every_seconds
+
+    def save(self, episode: int, agent1: QLearningAgent, agent2: QLearningAgent, random_state: tuple, wins: tuple, hyperparameters: dict, replay: dict = None) -> None:
+        """
+            Args:
+                episode: Number of episodes played so far
+                agent1: Agent playing as player 1 (X)
+                agent2: Agent playing as player 2 (O)
+                random_state: random.getstate() after the last episode
+                wins: Player 1 wins, player 2 wins and draws so far
+                hyperparameters: Arguments needed to rebuild the agents and continue training
+                replay: Replay buffer contents and sampler state, None without replay
+
+            Returns:
+                None
+
+            Concept:
+                Collects the snapshot on the calling thread (the changed entries are drained either way, so the next delta starts here)
+                and queues it for the writer thread. The replay state changes with every episode, so every checkpoint holds all of it.
+        """
+
+        if self.error is not None:
+            raise self.error
+
+        full = self.since_full >= self.full_every
+        tables = []
+        for agent in (agent1, agent2):
+            changes = agent.q_table.drain_changes()
+            tables.append(agent.q_table.to_dict() if full else changes)
+
+        snapshot = {
+            "full": full,
+            "episode": episode,
+            "random_state": random_state,
+            "wins": tuple(wins),
+            "hyperparameters": dict(hyperparameters),
+            "agent1": tables[0],
+            "agent2": tables[1],
+            "replay": replay,
+        }
+        filename = os.path.join(self.directory, f"checkpoint_{self.sequence:06d}.pkl")
+        self.queue.put((filename, snapshot))
+
+        self.sequence += 1
+        self.since_full = 1 if full else self.since_full + 1
+        self.last_episode = episode
+        self.last_time = time.monotonic()
+
+    def write_loop(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Writes the queued snapshots in order. Each file is written to a temporary name, synced and then renamed over the final name,
+                so a crash never leaves a half-written checkpoint. Files older than a full snapshot are removed once it is on disk.
+        """
+
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            filename, snapshot = item
+            try:
+                temporary = filename + ".tmp"
+                with open(temporary, 'wb') as f:
+                    pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporary, filename)
+
+                if snapshot["full"]:
+                    for old in checkpoint_files(self.directory):
+                        if os.path.join(self.directory, old) == filename:
+                            break
+                        os.remove(os.path.join(self.directory, old))
+            except OSError as error:
+                self.error = error
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Waits until every queued snapshot is written. Raises the error of a failed write, if any.
+        """
+
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+def checkpoint_files(directory: str) -> list:
+    """
+        Args:
+            directory: Folder of the checkpoint files
+
+        Returns:
+            Names of the checkpoint files, oldest first
+
+        Concept:
+            The zero-padded sequence number in the name sorts the files in write order.
+    """
+
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.startswith("checkpoint_") and name.endswith(".pkl"))
+
+def load_checkpoint(directory: str = "checkpoints") -> tuple[dict, QLearningAgent, QLearningAgent]:
+    """
+        Args:
+            directory: Folder of the checkpoint files
+
+        Returns:
+            The state of the last checkpoint ("episode", "random_state", "wins", "hyperparameters", "replay") and both restored agents,
+            or (None, None, None) if there is no checkpoint
+
+        Concept:
+            Rebuilds the agents from the newest full snapshot, then applies every later delta in order.
+    """
+
+    files = checkpoint_files(directory)
+    snapshots = []
+    for name in reversed(files):
+        with open(os.path.join(directory, name), 'rb') as f:
+            snapshots.append(pickle.load(f))
+        if snapshots[-1]["full"]:
+            break
+
+    if not snapshots or not snapshots[-1]["full"]:
+        return None, None, None
+
+    snapshots.reverse()
+    hyperparameters = snapshots[-1]["hyperparameters"]
+    agents = []
+    for player, key in ((1, "agent1"), (-1, "agent2")):
+        agent = QLearningAgent(player=player, epsilon=hyperparameters["epsilon"], alpha=hyperparameters["alpha"], gamma=hyperparameters["gamma"],
+                               backend=hyperparameters["backend"], symmetry=hyperparameters["symmetry"],
+                               size=hyperparameters.get("size", 3), capacity=hyperparameters.get("capacity", 1 << 16),
+                               eviction=hyperparameters.get("eviction", "lru"))
+        agent.q_table = agent.make_q_table(snapshots[0][key])
+        for snapshot in snapshots[1:]:
+            agent.q_table.load_entries(snapshot[key])
+        agents.append(agent)
+
+    state = {key: snapshots[-1][key] for key in ("episode", "random_state", "wins", "hyperparameters")}
+    state["replay"] = snapshots[-1].get("replay")
+    return state, agents[0], agents[1]
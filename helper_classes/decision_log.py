@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import threading
+
+class DecisionLogger:
+    def __init__(self, filename: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, flush_interval: float = 1.0, buffer_size: int = 64 * 1024) -> None:
+        """
+            Args:
+                filename: JSON Lines file the records are appended to
+                max_bytes: Rotate the file once it grows past this size, 0 to never rotate
+                backup_count: Number of rotated files to keep (filename.1 is the newest)
+                flush_interval: Seconds between flushes of the background thread
+                buffer_size: Size of the write buffer in bytes
+
+            Returns:
+                None
+
+            Concept:
+                Streams one compact JSON record per line through a buffered writer. A daemon thread flushes the buffer periodically,
+                so logging a decision never waits for the disk.
+        """
+
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffer_size = buffer_size
+        self.lock = threading.Lock()
+        self.file = open(filename, 'a', buffering=buffer_size, encoding='utf-8')
+        self.size = self.file.tell()
+
+        self.stop_event = threading.Event()
+        self.flush_interval = flush_interval
+        self.thread = threading.Thread(target=self.flush_loop, daemon=True)
+        self.thread.start()
+
+    def log(self, record: dict) -> None:
+        """
+            Args:
+                record: JSON-serializable record
+
+            Returns:
+                None
+
+            Concept:
+                Adds a timestamp, appends the record as one line and rotates the file if it became too large.
+        """
+
+        record["t"] = time.time()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.size += len(line)
+            if self.max_bytes and self.size >= self.max_bytes:
+                self.rotate()
+
+    def log_decision(self, player: int, state: int, legal: list, q_values: list, action: int) -> None:
+        """
+            Args:
+                player: Player the agent plays as
+                state: State id of the board
+                legal: Available action ids
+                q_values: q value of every available action
+                action: Chosen action id
+
+            Returns:
+                None
+
+            Concept:
+                Logs one move of the agent.
+        """
+
+        self.log({"type": "decision", "player": player, "state": state, "legal": list(legal), "q": [float(q) for q in q_values], "action": action})
+
+    def log_event(self, event: str, **fields) -> None:
+        """
+            Args:
+                event: Name of the event, for example "game_start" or "game_end"
+                fields: Extra fields of the record
+
+            Returns:
+                None
+
+            Concept:
+                Logs a record that is not a decision.
+        """
+
+        self.log({"type": event, **fields})
+
+    def rotate(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Shifts filename.N-1 to filename.N, ..., filename to filename.1 and starts a new file. Called with the lock held.
+        """
+
+        self.file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f"{self.filename}.{i}"):
+                    os.replace(f"{self.filename}.{i}", f"{self.filename}.{i + 1}")
+            os.replace(self.filename, f"{self.filename}.1")
+        else:
+            os.remove(self.filename)
+
+        self.file = open(self.filename, 'a', buffering=self.buffer_size, encoding='utf-8')
+        self.size = 0
+
+    def flush(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Writes the buffered records to the file.
+        """
+
+        with self.lock:
+            self.file.flush()
+
+    def flush_loop(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Body of the background thread: flushes every flush_interval seconds until the logger is closed.
+        """
+
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Stops the background thread and flushes and closes the file.
+        """
+
+        self.stop_event.set()
+        self.thread.join()
+        with self.lock:
+            self.file.close()
+
+def log_files(filename: str) -> list:
+    """
+        Args:
+            filename: JSON Lines file written by a DecisionLogger
+
+        Returns:
+            The rotated files and the current file, oldest first
+
+        Concept:
+            filename.N is the oldest backup and filename itself the newest.
+    """
+
+    backups = []
+    i = 1
+    while os.path.exists(f"{filename}.{i}"):
+        backups.append(f"{filename}.{i}")
+        i += 1
+
+    return backups[::-1] + ([filename] if os.path.exists(filename) else [])
+
+def read_records(filename: str):
+    """
+        Args:
+            filename: JSON Lines file written by a DecisionLogger
+
+        Returns:
+            Generator over the records of the file and its backups, oldest first
+
+        Concept:
+            Reads one line at a time so large logs are never loaded at once.
+    """
+
+    for path in log_files(filename):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,168 @@
+import numpy as np
+from helper_classes.bitboard import WIN, FULL_BOARD
+
+# A state id is the board read as a base-3 number: cell (row * 3 + col) is digit number (row * 3 + col),
+# with 0 for an empty cell, 1 for player 1 (X) and 2 for player 2 (O). Ids run from 0 to 3^9 - 1.
+# An action id is the cell index row * 3 + col, from 0 to 8.
+NUM_STATES = 3 ** 9
+NUM_ACTIONS = 9
+POW3 = 3 ** np.arange(9)
+
+# BASE3[mask]: sum of 3^cell over the cells set in a 9-bit mask
+BASE3 = tuple(sum(3 ** cell for cell in range(9) if mask >> cell & 1) for mask in range(512))
+
+def encode_board(board: np.ndarray) -> int:
+    """
+        Args:
+            board: Square board with 0, 1 and -1 entries, 3x3 or larger
+
+        Returns:
+            The state id of the board
+
+        Concept:
+            Maps -1 to digit 2 with a modulo and reads the cells as a base-3 number (cell row * size + col is digit row * size + col).
+    """
+
+    if board.size == NUM_ACTIONS:
+        return int(np.dot(board.ravel() % 3, POW3))
+    return int(np.dot(board.ravel() % 3, powers_of_3(board.size)))
+
+_powers_of_3 = {}
+
+def powers_of_3(cells: int) -> np.ndarray:
+    """
+        Args:
+            cells: Number of cells of the board
+
+        Returns:
+            3^cell for every cell as int64, cached per board size
+    """
+
+    if cells not in _powers_of_3:
+        _powers_of_3[cells] = 3 ** np.arange(cells, dtype=np.int64)
+    return _powers_of_3[cells]
+
+def encode_masks(x_mask: int, o_mask: int) -> int:
+    """
+        Args:
+            x_mask: 9-bit mask of player 1
+            o_mask: 9-bit mask of player 2
+
+        Returns:
+            The state id of the board
+
+        Concept:
+            Same id as encode_board, computed from bitboards through the BASE3 table.
+    """
+
+    return BASE3[x_mask] + 2 * BASE3[o_mask]
+
+def decode_state(state: int) -> np.ndarray:
+    """
+        Args:
+            state: A state id
+
+        Returns:
+            The 3x3 board of the state id
+
+        Concept:
+            Reads the base-3 digits back and maps digit 2 to -1.
+    """
+
+    digits = state // POW3 % 3
+    return np.where(digits == 2, -1, digits).reshape(3, 3)
+
+def encode_action(action: tuple[int, int]) -> int:
+    """
+        Args:
+            action: (row, col) of a cell
+
+        Returns:
+            The action id of the cell
+
+        Concept:
+            Returns row * 3 + col.
+    """
+
+    return int(action[0]) * 3 + int(action[1])
+
+def decode_action(action: int) -> tuple[int, int]:
+    """
+        Args:
+            action: An action id
+
+        Returns:
+            (row, col) of the cell
+
+        Concept:
+            Inverse of encode_action.
+    """
+
+    return divmod(action, 3)
+
+def is_legacy_q_table(q_table: dict) -> bool:
+    """
+        Args:
+            q_table: A loaded q_table
+
+        Returns:
+            Whether the table is keyed by (tuple-of-tuples board, (row, col)) pairs
+
+        Concept:
+            Looks at the state part of any key.
+    """
+
+    for state, _ in q_table:
+        return not isinstance(state, (int, np.integer))
+    return False
+
+def convert_legacy_q_table(q_table: dict) -> dict:
+    """
+        Args:
+            q_table: q_table keyed by (tuple-of-tuples board, (row, col)) pairs
+
+        Returns:
+            The same q_table keyed by (state id, action id) pairs
+
+        Concept:
+            Re-encodes every key; values are kept as they are so the conversion is lossless.
+    """
+
+    return {(encode_board(np.array(state)), encode_action(action)): q for (state, action), q in q_table.items()}
+
+_reachable_states = None
+
+def reachable_states() -> np.ndarray:
+    """
+        Args:
+            None
+
+        Returns:
+            Sorted array of the state ids of every board reachable from the empty board, finished boards included
+
+        Concept:
+            Walks the game tree once on bitboards, stopping at wins and full boards, and caches the result.
+    """
+
+    global _reachable_states
+    if _reachable_states is None:
+        seen = set()
+        stack = [(0, 0)]
+        while stack:
+            x_mask, o_mask = stack.pop()
+            state = encode_masks(x_mask, o_mask)
+            if state in seen:
+                continue
+            seen.add(state)
+            if WIN[x_mask] or WIN[o_mask] or x_mask | o_mask == FULL_BOARD:
+                continue
+
+            x_to_move = bin(x_mask).count("1") == bin(o_mask).count("1")
+            empty = ~(x_mask | o_mask) & FULL_BOARD
+            for cell in range(9):
+                if empty >> cell & 1:
+                    stack.append((x_mask | 1 << cell, o_mask) if x_to_move else (x_mask, o_mask | 1 << cell))
+
+        _reachable_states = np.array(sorted(seen), dtype=np.int32)
+
+    return _reachable_states
@@ -1,26 +1,41 @@
-import time
-import pygame
 import numpy as np
+from helper_classes import bitboard
+from helper_classes.geometry import get_geometry
 
 class TicTacToe:
-    def __init__(self) -> None:
+    def __init__(self, headless: bool = False, render_every: int = 1, size: int = 3, win_length: int = None, render_async: bool = False) -> None:
         """
             Args: 
-                None
+                headless: If True pygame is never imported and nothing is drawn
+                render_every: Render only every Nth episode when a renderer is attached
+                size: Number of rows and columns of the board
+                win_length: Marks in a row needed to win, size if None
+                render_async: Draw on a separate thread that drops frames it cannot keep up with, instead of drawing every move in place
 
             Returns:
                 None
 
             Concept:
-                Initializes class Tictactoe and sets up the board, current player, and player wins and pygame.
+                Initializes class Tictactoe and sets up the board, current player, and player wins and pygame unless running headless.
         """
         
-        self.board = np.zeros((3, 3), dtype=int)
+        self.geometry = get_geometry(size, win_length)
+        self.size = self.geometry.size
+        self.classic = self.geometry.classic
+        self.board = np.zeros((self.size, self.size), dtype=int)
+        self.masks = {1: 0, -1: 0}
+        self.state = 0
         self.current_player = 1
         self.player1_wincount = 0
         self.player2_wincount = 0
         self.draw_count = 0
-        self.init_pygame()
+        self.renderer = None
+        self.render_every = render_every
+        self.render_async = render_async
+        self.episode_count = 0
+        self.render_episode = False
+        if not headless:
+            self.init_pygame()
 
     def init_pygame(self) -> None:
         """
@@ -31,14 +46,45 @@ class TicTacToe:
                 None
 
             Concept:
-                Initializes pygame and sets up the screen, font, and clock.
+                Imports pygame lazily and attaches a pygame renderer to the environment.
+        """
+        
+        from helper_classes.renderer import PygameRenderer, AsyncRenderer
+        renderer_class = AsyncRenderer if self.render_async else PygameRenderer
+        self.attach_renderer(renderer_class("Tic-Tac-Toe Training", size=self.size), self.render_every)
+
+    def attach_renderer(self, renderer, every: int = 1) -> None:
+        """
+            Args:
+                renderer: Observer with draw(board), poll_events() and close() methods
+                every: Render only every Nth episode
+
+            Returns:
+                None
+
+            Concept:
+                Attaches a renderer that is called after resets and moves of every Nth episode.
+        """
+        
+        self.renderer = renderer
+        self.render_every = max(1, every)
+        self.render_episode = self.episode_count > 0 and (self.episode_count - 1) % self.render_every == 0
+
+    def detach_renderer(self):
+        """
+            Args:
+                None
+
+            Returns:
+                The renderer that was attached, or None
+
+            Concept:
+                Detaches the renderer so the environment runs headless from now on.
         """
         
-        pygame.init()
-        self.screen = pygame.display.set_mode((300, 300))
-        pygame.display.set_caption("Tic-Tac-Toe Training")
-        self.font = pygame.font.Font(None, 74)
-        self.clock = pygame.time.Clock()
+        renderer, self.renderer = self.renderer, None
+        self.render_episode = False
+        return renderer
 
     def reset(self) -> np.ndarray:
         """
@@ -52,8 +98,12 @@ class TicTacToe:
                 Resets the board, current player, and player wins.
         """
         
-        self.board = np.zeros((3, 3), dtype=int)
+        self.board = np.zeros((self.size, self.size), dtype=int)
+        self.masks = {1: 0, -1: 0}
+        self.state = 0
         self.current_player = 1
+        self.episode_count += 1
+        self.render_episode = self.renderer is not None and (self.episode_count - 1) % self.render_every == 0
         self.render()
         
         return self.board
@@ -64,18 +114,34 @@ class TicTacToe:
                 None
             
             Returns:
-                list of available actions
+                list of available action ids
+            
+            Concept:
+                Returns a list of all available actions (cell index row * size + col) for the agent on the board.
+        """
+        
+        if self.classic:
+            return list(bitboard.EMPTY_CELLS[~(self.masks[1] | self.masks[-1]) & bitboard.FULL_BOARD])
+        return self.geometry.empty_cells(self.masks[1] | self.masks[-1])
+    
+    def state_id(self) -> int:
+        """
+            Args:
+                None
+            
+            Returns:
+                The state id of the board
             
             Concept:
-                Returns a list of all available actions for the agent on the board.
+                The board as a base-3 integer, kept up to date by make_move.
         """
         
-        return list(zip(*np.where(self.board == 0)))
+        return self.state
     
-    def make_move(self, action: tuple[int, int]) -> tuple[int, bool]:
+    def make_move(self, action: int) -> tuple[int, bool]:
         """
             Args:
-                action: Action selected by the agent (tuple)
+                action: Action id selected by the agent (row * size + col)
             
             Returns:
                 value of reward and whether the game is over with this move
@@ -84,107 +150,62 @@ class TicTacToe:
                 Makes a move on the board and updates the current player.
         """
         
-        if self.board[action] == 0:
-            self.board[action] = self.current_player
-            reward, done = self.check_winner()
+        if self.board.flat[action] == 0:
+            self.board.flat[action] = self.current_player
+            self.masks[self.current_player] |= 1 << action
+            self.state += (1 if self.current_player == 1 else 2) * self.geometry.pow3[action]
+            reward, done = self.check_winner(action)
             self.render()
             self.current_player = -self.current_player
             
             return reward, done
         return 0, False
     
-    def check_winner(self) -> tuple[int, bool]:
+    def check_winner(self, last_move: int = None) -> tuple[int, bool]:
         """
             Args:
-                None
+                last_move: Cell of the current player's last move, None to check every line
             
             Returns:
                 player who won and that the game is over
             
             Concept:
-                Checks if there is a winner on the board.
+                Checks if the current player has a full line: through the win table on 3x3, through the lines of the last move otherwise.
         """
         
-        for i in range(3):
-            if np.all(self.board[i, :] == self.current_player) or np.all(self.board[:, i] == self.current_player):
-                print(f"Player {1 if self.current_player == 1 else 2} wins!")
-                print(self.board)
-                
-                if self.current_player == 1:
-                    self.player1_wincount += 1
-                else:
-                    self.player2_wincount += 1
-                
-                return 1 if self.current_player == 1 else -1, True
-        
-        if np.all(np.diag(self.board) == self.current_player) or np.all(np.diag(np.fliplr(self.board)) == self.current_player):
-            print(f"Player {1 if self.current_player == 1 else 2} wins!")
-            print(self.board)
-            
+        mask = self.masks[self.current_player]
+        if bitboard.WIN[mask] if self.classic else self.geometry.is_win(mask, last_move):
             if self.current_player == 1:
                 self.player1_wincount += 1
             else:
                 self.player2_wincount += 1
-                
+            
             return 1 if self.current_player == 1 else -1, True
         
-        if not np.any(self.board == 0):
-            print("It's a draw!")
-            print(self.board)
-            
+        if self.masks[1] | self.masks[-1] == self.geometry.full_board:
             self.draw_count += 1
             
             return 0, True
         
         return 0, False
 
-    def check_critical(self, player: int) -> tuple[float, tuple[int, int]]:
+    def check_critical(self, player: int) -> tuple[float, int]:
         """
 
         Args:
             player: specifier of player
 
         Returns:
-            reward and critical position on the board and location of critical position.
+            reward and critical position on the board and cell index of critical position.
 
         Concept:
             Checks if there is a critical position on the board. Critical position is a position that if one move can decide the winner.
+            0.1 if the player can win, -0.1 if the opponent can, 0.2 and no location otherwise (bitboard tables on 3x3, line masks otherwise).
         """
         
-        # Checking if the current player has any critical position in in favor
-        for i in range(3):
-            if np.sum(self.board[i, :] == player) == 2 and np.any(self.board[i, :] == 0):
-                return 0.1, (i, np.where(self.board[i, :] == 0)[0][0])  # Reward and location
-            
-            if np.sum(self.board[:, i] == player) == 2 and np.any(self.board[:, i] == 0):
-                return 0.1, (np.where(self.board[:, i] == 0)[0][0], i)
-        
-        if np.sum(np.diag(self.board) == player) == 2 and np.any(np.diag(self.board) == 0):
-            idx = np.where(np.diag(self.board) == 0)[0][0]
-            return 0.1, (idx, idx)
-        
-        if np.sum(np.diag(np.fliplr(self.board)) == player) == 2 and np.any(np.diag(np.fliplr(self.board)) == 0):
-            idx = np.where(np.diag(np.fliplr(self.board)) == 0)[0][0]
-            return 0.1, (idx, 2 - idx)
-        
-        # Checking if the opponent has any critical position
-        opponent = -player
-        for i in range(3):
-            if np.sum(self.board[i, :] == opponent) == 2 and np.any(self.board[i, :] == 0):
-                return -0.1, (i, np.where(self.board[i, :] == 0)[0][0])
-            
-            if np.sum(self.board[:, i] == opponent) == 2 and np.any(self.board[:, i] == 0):
-                return -0.1, (np.where(self.board[:, i] == 0)[0][0], i)
-        
-        if np.sum(np.diag(self.board) == opponent) == 2 and np.any(np.diag(self.board) == 0):
-            idx = np.where(np.diag(self.board) == 0)[0][0]
-            return -0.1, (idx, idx)
-        
-        if np.sum(np.diag(np.fliplr(self.board)) == opponent) == 2 and np.any(np.diag(np.fliplr(self.board)) == 0):
-            idx = np.where(np.diag(np.fliplr(self.board)) == 0)[0][0]
-            return -0.1, (idx, 2 - idx)
-        
-        return 0.2, None  # Default reward and no critical location
+        if self.classic:
+            return bitboard.critical(self.masks[player], self.masks[-player])
+        return self.geometry.critical(self.masks[player], self.masks[-player])
 
     def render(self) -> None:
         """
@@ -195,25 +216,27 @@ class TicTacToe:
                 None
             
             Concept:
-                Renders the board on the screen.
+                Renders the board through the attached renderer if the current episode is a render episode.
         """
         
-        self.screen.fill((255, 255, 255))
-        for row in range(3):
-            for col in range(3):
-                if self.board[row, col] == 1:
-                    pygame.draw.line(self.screen, (0, 0, 0), (col * 100 + 15, row * 100 + 15), (col * 100 + 85, row * 100 + 85), 15)
-                    pygame.draw.line(self.screen, (0, 0, 0), (col * 100 + 15, row * 100 + 85), (col * 100 + 85, row * 100 + 15), 15)
-                elif self.board[row, col] == -1:
-                    pygame.draw.circle(self.screen, (0, 0, 0), (col * 100 + 50, row * 100 + 50), 40, 15)
-        
-        for i in range(1, 3):
-            pygame.draw.line(self.screen, (0, 0, 0), (0, i * 100), (300, i * 100), 5)
-            pygame.draw.line(self.screen, (0, 0, 0), (i * 100, 0), (i * 100, 300), 5)
+        if self.render_episode:
+            self.renderer.draw(self.board)
 
-        pygame.display.flip()
+    def poll_events(self) -> bool:
+        """
+            Args:
+                None
+            
+            Returns:
+                False if the window was closed, True otherwise
+            
+            Concept:
+                Lets the attached renderer process its window events. Always True when headless.
+        """
         
-        time.sleep(0.1)  # Delay for 100 milliseconds # Uncomment to see the moves taken by the agent in real time
+        if self.renderer is None:
+            return True
+        return self.renderer.poll_events()
 
     def close_pygame(self) -> None:
         """
@@ -224,7 +247,9 @@ class TicTacToe:
                 None
             
             Concept:
-                Closes the pygame window.
+                Closes the pygame window if a renderer is attached.
         """
         
-        pygame.quit()
\ No newline at end of file
+        renderer = self.detach_renderer()
+        if renderer is not None:
+            renderer.close()
@@ -0,0 +1,157 @@
+# Board geometry for N x N boards with k-in-a-row. Every player is a mask of N*N bits where bit (row * N + col) is set
+# if the player owns that cell. Lines (every run of k cells in a row, column or diagonal) are precomputed as masks.
+# The classic 3x3 board answers everything through the 512-entry tables of bitboard.py.
+from helper_classes import bitboard
+
+# State ids are read as base-3 numbers and must fit into an int64 (3^39 < 2^63)
+MAX_CELLS = 39
+
+_geometries = {}
+
+class BoardGeometry:
+    def __init__(self, size: int = 3, win_length: int = None) -> None:
+        """
+            Args:
+                size: Number of rows and columns
+                win_length: Marks in a row needed to win, size if None
+
+            Returns:
+                None
+
+            Concept:
+                Precomputes the line masks in scan order (for each i: the runs of row i, then the runs of column i; then the diagonal
+                runs and the anti-diagonal runs, which for 3x3 is the order of bitboard.LINES), the lines through every cell for the
+                incremental win check, and the powers of 3 of the state id.
+        """
+
+        win_length = win_length or size
+        if not 1 <= win_length <= size:
+            raise ValueError(f"win_length must be between 1 and {size}")
+        if size * size > MAX_CELLS:
+            raise ValueError(f"Boards with more than {MAX_CELLS} cells do not fit into int64 state ids")
+
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        self.full_board = (1 << self.cells) - 1
+        self.classic = size == 3 and win_length == 3
+        self.pow3 = [3 ** cell for cell in range(self.cells)]
+
+        runs = size - win_length + 1
+        lines = []
+        for i in range(size):
+            lines.extend([(i, start + j) for j in range(win_length)] for start in range(runs))
+            lines.extend([(start + j, i) for j in range(win_length)] for start in range(runs))
+        for row in range(runs):
+            for col in range(runs):
+                lines.append([(row + j, col + j) for j in range(win_length)])
+        for row in range(runs):
+            for col in range(win_length - 1, size):
+                lines.append([(row + j, col - j) for j in range(win_length)])
+
+        self.line_masks = tuple(sum(1 << (row * size + col) for row, col in line) for line in lines)
+        self.lines_through = tuple(tuple(mask for mask in self.line_masks if mask >> cell & 1) for cell in range(self.cells))
+
+    def is_win(self, mask: int, last_cell: int = None) -> bool:
+        """
+            Args:
+                mask: Mask of a player
+                last_cell: Cell of the player's last move, if known
+
+            Returns:
+                Whether the mask contains a full line
+
+            Concept:
+                Only the lines through the last move can have been completed by it, so only those are checked.
+        """
+
+        if self.classic:
+            return bitboard.WIN[mask]
+        lines = self.line_masks if last_cell is None else self.lines_through[last_cell]
+        for line in lines:
+            if mask & line == line:
+                return True
+        return False
+
+    def empty_cells(self, occupied: int) -> list:
+        """
+            Args:
+                occupied: Mask of the occupied cells
+
+            Returns:
+                Index of every empty cell, in row-major order
+        """
+
+        if self.classic:
+            return list(bitboard.EMPTY_CELLS[~occupied & bitboard.FULL_BOARD])
+        empty = ~occupied & self.full_board
+        cells = []
+        while empty:
+            lowest = empty & -empty
+            cells.append(lowest.bit_length() - 1)
+            empty ^= lowest
+        return cells
+
+    def critical_square(self, own: int, empty: int) -> int:
+        """
+            Args:
+                own: Mask of the player
+                empty: Mask of the empty cells
+
+            Returns:
+                Index of the first cell (in line scan order) that completes a line for the player, or -1
+
+            Concept:
+                A line is one move from complete when the player owns k - 1 of its cells and the last one is empty.
+        """
+
+        needed = self.win_length - 1
+        for line in self.line_masks:
+            owned = own & line
+            if owned.bit_count() == needed:
+                rest = line ^ owned
+                if rest & empty == rest:
+                    return rest.bit_length() - 1
+        return -1
+
+    def critical(self, own: int, opponent: int) -> tuple[float, int]:
+        """
+            Args:
+                own: Mask of the player
+                opponent: Mask of the opponent
+
+            Returns:
+                reward and cell index of the critical position, same as bitboard.critical
+
+            Concept:
+                0.1 and the cell if the player can complete a line, -0.1 and the cell if the opponent can, otherwise 0.2 and None.
+        """
+
+        if self.classic:
+            return bitboard.critical(own, opponent)
+        empty = ~(own | opponent) & self.full_board
+        cell = self.critical_square(own, empty)
+        if cell >= 0:
+            return 0.1, cell
+        cell = self.critical_square(opponent, empty)
+        if cell >= 0:
+            return -0.1, cell
+        return 0.2, None
+
+def get_geometry(size: int = 3, win_length: int = None) -> BoardGeometry:
+    """
+        Args:
+            size: Number of rows and columns
+            win_length: Marks in a row needed to win, size if None
+
+        Returns:
+            The shared geometry of the board
+
+        Concept:
+            Line tables are built once per board variant.
+    """
+
+    key = (size, win_length or size)
+    if key not in _geometries:
+        _geometries[key] = BoardGeometry(*key)
+    return _geometries[key]
@@ -0,0 +1,101 @@
+import numpy as np
+from helper_classes.bitboard import WIN
+from helper_classes.encoding import NUM_ACTIONS, POW3
+from helper_classes.q_learner import QLearningAgent
+from helper_classes.q_tables import ArrayQTable
+
+# WIN as an array, indexed by a batch of player masks at once
+WIN_TABLE = np.array(WIN, dtype=bool)
+CELL_BITS = 1 << np.arange(NUM_ACTIONS)
+
+class BatchPolicy:
+    def __init__(self, agent1_file: str, agent2_file: str, seed: int = None) -> None:
+        """
+            Args:
+                agent1_file: Model file of player 1 (X), .qtb or .pkl
+                agent2_file: Model file of player 2 (O), .qtb or .pkl
+                seed: Seed of the tie-breaking random generator
+
+            Returns:
+                None
+
+            Concept:
+                Loads both agents once into array q_tables (memory-mapped for .qtb files) so a whole batch of boards can be answered
+                with one vectorized lookup.
+        """
+
+        tables = []
+        for player, filename in ((1, agent1_file), (-1, agent2_file)):
+            agent = QLearningAgent(player=player, backend="array")
+            agent.load_model(filename)
+            tables.append(agent.q_table)
+
+        self.set_tables(tables[0], tables[1], seed)
+
+    @classmethod
+    def from_q_tables(cls, q_table1: ArrayQTable, q_table2: ArrayQTable, seed: int = None) -> "BatchPolicy":
+        """
+            Args:
+                q_table1: Array q_table of player 1 (X)
+                q_table2: Array q_table of player 2 (O)
+                seed: Seed of the tie-breaking random generator
+
+            Returns:
+                A BatchPolicy over the given tables
+
+            Concept:
+                Builds the policy from tables already in memory instead of model files.
+        """
+
+        policy = cls.__new__(cls)
+        policy.set_tables(q_table1, q_table2, seed)
+        return policy
+
+    def set_tables(self, q_table1: ArrayQTable, q_table2: ArrayQTable, seed: int = None) -> None:
+        """
+            Args:
+                q_table1: Array q_table of player 1 (X)
+                q_table2: Array q_table of player 2 (O)
+                seed: Seed of the tie-breaking random generator
+
+            Returns:
+                None
+
+            Concept:
+                Stacks both value arrays so one gather answers boards of either player.
+        """
+
+        self.rows = q_table1.rows
+        self.values = np.stack([q_table1.values, q_table2.values])
+        self.rng = np.random.default_rng(seed)
+
+    def choose(self, boards: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+            Args:
+                boards: (B, 9) boards with 0, 1 and -1 entries
+
+            Returns:
+                greedy action and its q value per board, and whether the board was valid
+
+            Concept:
+                The player to move follows from the number of marks. State ids, rows and q values are gathered for the whole batch at once,
+                occupied cells are masked out and ties are broken at random. Boards that are unreachable, full or already won are marked invalid.
+        """
+
+        boards = np.asarray(boards, dtype=np.int8).reshape(-1, 9)
+        states = (boards % 3).astype(np.int64) @ POW3
+        rows = self.rows[states]
+        legal = boards == 0
+        won = WIN_TABLE[(boards == 1) @ CELL_BITS] | WIN_TABLE[(boards == -1) @ CELL_BITS]
+        valid = (rows >= 0) & legal.any(axis=1) & ~won
+
+        # Player 2 (table 1) is to move when X has one more mark than O
+        table = (boards.sum(axis=1) == 1).astype(np.int64)
+        q_values = self.values[table, np.maximum(rows, 0)].astype(np.float64)
+        q_values[~legal] = -np.inf
+
+        best = q_values.max(axis=1, keepdims=True)
+        ties = np.where(q_values == best, self.rng.random(q_values.shape), -1)
+        actions = ties.argmax(axis=1)
+
+        return actions, best[:, 0], valid
@@ -0,0 +1,196 @@
+import struct
+import hashlib
+import numpy as np
+
+# Binary Q-table file (.qtb), little endian:
+#   header (64 bytes): magic, format version, dtype code, state count, action count, offsets of the three arrays,
+#                      scale of int8 values (version 2), fingerprint of the pickle the file was converted from (zeros if none)
+#   state index: int32[num_states], sorted state ids
+#   values:      dtype[num_states, num_actions], for int8 the q value is value * scale
+#   visited:     bool[num_states, num_actions], which entries were written
+# Every array starts on a 64-byte boundary so it can be opened with np.memmap without copying.
+MAGIC = b"TTTQ"
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+HEADER = struct.Struct("<4sHBxIIQQQd")
+HEADER_V1 = struct.Struct("<4sHBxIIQQQ")
+HEADER_SIZE = 64
+ALIGNMENT = 64
+FINGERPRINT_SIZE = 16
+DTYPES = {0: np.dtype("<f4"), 1: np.dtype("<f8"), 2: np.dtype("<f2"), 3: np.dtype("i1")}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+# Export formats of save_binary: name -> stored dtype
+QUANTIZATIONS = {"float64": np.dtype("<f8"), "float32": np.dtype("<f4"), "float16": np.dtype("<f2"), "int8": np.dtype("i1")}
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def fingerprint(filename: str) -> bytes:
+    """
+        Args:
+            filename: Model file, .pkl or .qtb
+
+        Returns:
+            BLAKE2b digest of the file's contents
+    """
+
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def quantize(values: np.ndarray, quantization: str) -> tuple[np.ndarray, float]:
+    """
+        Args:
+            values: q values
+            quantization: Key of QUANTIZATIONS
+
+        Returns:
+            The values in the stored dtype and the scale to multiply them with when reading
+
+        Concept:
+            Floats are cast. int8 uses one scale per table, the largest magnitude maps to 127 and values are rounded to the nearest step.
+    """
+
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization {quantization}")
+    if quantization != "int8":
+        return np.ascontiguousarray(values, dtype=QUANTIZATIONS[quantization]), 1.0
+
+    peak = float(np.max(np.abs(values))) if values.size else 0.0
+    scale = peak / 127 if peak > 0 else 1.0
+    return np.clip(np.rint(np.asarray(values, dtype=np.float64) / scale), -127, 127).astype(np.int8), scale
+
+def save_binary(filename: str, states: np.ndarray, values: np.ndarray, visited: np.ndarray, quantization: str = None, source: bytes = None) -> None:
+    """
+        Args:
+            filename: File to write
+            states: Sorted state ids, one per row
+            values: (num_states, num_actions) q values, float32 or float64
+            visited: (num_states, num_actions) mask of the entries that were written
+            quantization: Store the values as "float64", "float32", "float16" or "int8", None to keep their dtype
+            source: Fingerprint of the pickle the values were converted from, None if there is none
+
+        Returns:
+            None
+
+        Concept:
+            Writes the header followed by the state index, the values and the visited mask at aligned offsets.
+    """
+
+    scale = 1.0
+    if quantization is not None:
+        values, scale = quantize(values, quantization)
+    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    if values.dtype not in DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype {values.dtype}")
+
+    num_states, num_actions = values.shape
+    index_offset = HEADER_SIZE
+    values_offset = _align(index_offset + num_states * 4)
+    visited_offset = _align(values_offset + values.nbytes)
+
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, DTYPE_CODES[values.dtype], num_states, num_actions, index_offset, values_offset, visited_offset, scale)
+                + (source or b"\0" * FINGERPRINT_SIZE))
+        f.write(np.asarray(states, dtype="<i4").tobytes())
+        f.write(b"\0" * (values_offset - f.tell()))
+        f.write(values.tobytes())
+        f.write(b"\0" * (visited_offset - f.tell()))
+        f.write(np.asarray(visited, dtype=bool).tobytes())
+
+def load_binary(filename: str, mode: str = 'r') -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Args:
+            filename: File to open
+            mode: np.memmap mode, 'r' for read-only, 'c' for copy-on-write, 'r+' to write through to the file
+
+        Returns:
+            state index, values and visited mask, memory-mapped from the file
+
+        Concept:
+            Reads only the header; the arrays are mapped lazily by the OS and shared between every process that opens the file.
+            Quantized values (float16, int8) are read into a float32 array instead, scaled back for int8.
+            Version 1 files (no scale field) are still read.
+    """
+
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+
+    magic, version = struct.unpack_from("<4sH", header)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is not a binary Q-table file")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"{filename} has unsupported format version {version}")
+    if version == 1:
+        _, _, dtype_code, num_states, num_actions, index_offset, values_offset, visited_offset = HEADER_V1.unpack_from(header)
+        scale = 1.0
+    else:
+        _, _, dtype_code, num_states, num_actions, index_offset, values_offset, visited_offset, scale = HEADER.unpack_from(header)
+
+    states = np.memmap(filename, dtype="<i4", mode='r', offset=index_offset, shape=(num_states,))
+    values = np.memmap(filename, dtype=DTYPES[dtype_code], mode=mode, offset=values_offset, shape=(num_states, num_actions))
+    visited = np.memmap(filename, dtype=bool, mode=mode, offset=visited_offset, shape=(num_states, num_actions))
+    if values.dtype.itemsize < 4:
+        values = values.astype(np.float32) * np.float32(scale) if dtype_code == 3 else values.astype(np.float32)
+
+    return states, values, visited
+
+def binary_source(filename: str) -> bytes:
+    """
+        Args:
+            filename: Binary Q-table file
+
+        Returns:
+            Fingerprint of the pickle the file was converted from, None if it was not converted from one
+    """
+
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    source = header[HEADER.size:HEADER.size + FINGERPRINT_SIZE]
+    return source if len(source) == FINGERPRINT_SIZE and any(source) else None
+
+def entries_to_arrays(entries: dict, states: np.ndarray, num_actions: int, dtype: type = np.float64) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Args:
+            entries: q values keyed by (state id, action id) pairs
+            states: Sorted state ids defining the rows
+            num_actions: Number of actions per state
+            dtype: dtype of the value array
+
+        Returns:
+            values and visited mask
+
+        Concept:
+            Scatters a dict q_table into dense arrays over the given state index.
+    """
+
+    values = np.zeros((len(states), num_actions), dtype=dtype)
+    visited = np.zeros((len(states), num_actions), dtype=bool)
+    if entries:
+        keys = np.array(list(entries.keys()), dtype=np.int64)
+        rows = np.searchsorted(states, keys[:, 0])
+        if np.any(rows >= len(states)) or np.any(states[np.minimum(rows, len(states) - 1)] != keys[:, 0]):
+            raise KeyError("q_table contains states missing from the state index")
+        values[rows, keys[:, 1]] = np.fromiter(entries.values(), dtype=np.float64, count=len(entries))
+        visited[rows, keys[:, 1]] = True
+
+    return values, visited
+
+def arrays_to_entries(states: np.ndarray, values: np.ndarray, visited: np.ndarray) -> dict:
+    """
+        Args:
+            states: State id of every row
+            values: q values
+            visited: Mask of the entries that were written
+
+        Returns:
+            The visited entries keyed by (state id, action id) pairs
+
+        Concept:
+            Inverse of entries_to_arrays.
+    """
+
+    rows, actions = np.nonzero(visited)
+    return dict(zip(zip(np.asarray(states)[rows].tolist(), actions.tolist()), np.asarray(values)[rows, actions].tolist()))
@@ -0,0 +1,185 @@
+import random
+import struct
+import numpy as np
+from helper_classes.bitboard import EMPTY_CELLS
+from helper_classes.encoding import NUM_STATES, NUM_ACTIONS, POW3, reachable_states
+from helper_classes.model_format import FINGERPRINT_SIZE, entries_to_arrays, fingerprint
+
+# One record per state id: the first greedy action (-1 for full boards), a 9-bit mask of all greedy actions and their q value
+POLICY_DTYPE = np.dtype([("action", "i1"), ("ties", "<u2"), ("q", "<f4")])
+
+# Compiled policy file (.qtp), little endian:
+#   header (64 bytes): magic, format version, fingerprint count, record count, offset of the records
+#   fingerprints:      16 bytes each, one per model file the policy was validated against
+#   records:           POLICY_DTYPE[record count], indexed by state id, on a 64-byte boundary for np.memmap
+MAGIC = b"TTTP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+HEADER_SIZE = 64
+
+class GreedyPolicy:
+    def __init__(self, table: np.ndarray, fingerprints: list = None) -> None:
+        """
+            Args:
+                table: POLICY_DTYPE records indexed by state id
+                fingerprints: Fingerprints of the model files the policy was validated against
+
+            Returns:
+                None
+
+            Concept:
+                Greedy policy compiled from a q_table, so choosing a move is one array index instead of a q value lookup per legal
+                action. The columns are kept as separate arrays for fast scalar reads.
+        """
+
+        self.table = table
+        self.fingerprints = list(fingerprints or [])
+        self.actions = table["action"]
+        self.ties = table["ties"]
+        self.q = table["q"]
+
+    @classmethod
+    def from_q_table(cls, q_table) -> "GreedyPolicy":
+        """
+            Args:
+                q_table: Q-table of any backend
+
+            Returns:
+                The compiled greedy policy
+
+            Concept:
+                Scatters the entries over the reachable states, masks out occupied cells and takes the maximum of every row with
+                all ties kept, the same rule as q_table.best_actions: unvisited legal actions count as 0. Ties are found in float64
+                so values that only differ below float32 precision stay distinct.
+        """
+
+        states = reachable_states()
+        values, _ = entries_to_arrays(q_table.to_dict(), states, NUM_ACTIONS, np.float64)
+        legal = states[:, None] // POW3 % 3 == 0
+        masked = np.where(legal, values, -np.inf)
+        best_q = masked.max(axis=1)
+        greedy = legal & (masked == best_q[:, None])
+        open_rows = legal.any(axis=1)
+
+        table = np.zeros(NUM_STATES, dtype=POLICY_DTYPE)
+        table["action"] = -1
+        table["action"][states] = np.where(open_rows, greedy.argmax(axis=1), -1)
+        table["ties"][states] = greedy.astype(np.uint16) @ (1 << np.arange(NUM_ACTIONS, dtype=np.uint16))
+        table["q"][states] = np.where(open_rows, best_q, 0)
+        return cls(table)
+
+    @classmethod
+    def load(cls, filename: str) -> "GreedyPolicy":
+        """
+            Args:
+                filename: Policy saved with save, a .qtp file
+
+            Returns:
+                The policy, memory-mapped read-only from the file
+        """
+
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            magic, version, count, num_states, offset = HEADER.unpack_from(header)
+            if magic != MAGIC or num_states != NUM_STATES:
+                raise ValueError(f"{filename} is not a compiled policy")
+            if version != VERSION:
+                raise ValueError(f"{filename} has unsupported format version {version}")
+            fingerprints = [f.read(FINGERPRINT_SIZE) for _ in range(count)]
+
+        return cls(np.memmap(filename, dtype=POLICY_DTYPE, mode='r', offset=offset, shape=(num_states,)), fingerprints)
+
+    def save(self, filename: str) -> None:
+        """
+            Args:
+                filename: File to write, a .qtp file
+
+            Returns:
+                None
+
+            Concept:
+                Writes the header and the fingerprints, then the records at the next 64-byte boundary.
+        """
+
+        offset = -(-(HEADER_SIZE + FINGERPRINT_SIZE * len(self.fingerprints)) // HEADER_SIZE) * HEADER_SIZE
+        with open(filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.fingerprints), len(self.table), offset).ljust(HEADER_SIZE, b"\0"))
+            f.write(b"".join(self.fingerprints))
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(np.ascontiguousarray(self.table, dtype=POLICY_DTYPE).tobytes())
+
+    def matches(self, model_file: str) -> bool:
+        """
+            Args:
+                model_file: Model file, .pkl or .qtb
+
+            Returns:
+                Whether the policy was validated against this exact file
+
+            Concept:
+                Compares content fingerprints, so a model saved after the policy was compiled is detected regardless of file times.
+        """
+
+        return fingerprint(model_file) in self.fingerprints
+
+    def choose(self, state: int) -> int:
+        """
+            Args:
+                state: State id
+
+            Returns:
+                A greedy action, ties broken at random
+
+            Concept:
+                One index into the tie masks, and a random pick only if several actions share the best q value.
+        """
+
+        ties = EMPTY_CELLS[self.ties.item(state)]
+        if len(ties) == 1:
+            return ties[0]
+        return random.choice(ties)
+
+    def best_actions(self, state: int) -> list:
+        """
+            Args:
+                state: State id
+
+            Returns:
+                All greedy actions of the state
+        """
+
+        return list(EMPTY_CELLS[self.ties.item(state)])
+
+    def best_q(self, state: int) -> float:
+        """
+            Args:
+                state: State id
+
+            Returns:
+                The q value of the greedy actions
+        """
+
+        return self.q.item(state)
+
+    def validate(self, q_table) -> int:
+        """
+            Args:
+                q_table: Q-table the policy was compiled from
+
+            Returns:
+                Number of reachable unfinished states whose greedy actions or best q value differ from the q_table's
+
+            Concept:
+                Compares every state against q_table.best_actions and q_table.max_q over the legal actions. q values are compared
+                at float32 precision, since the policy stores them as float32.
+        """
+
+        mismatches = 0
+        for state in reachable_states().tolist():
+            legal = [action for action in range(NUM_ACTIONS) if state // 3 ** action % 3 == 0]
+            if not legal:
+                continue
+            if sorted(q_table.best_actions(state, legal)) != self.best_actions(state) or np.float32(q_table.max_q(state, legal)) != self.q.item(state):
+                mismatches += 1
+
+        return mismatches
@@ -1,51 +1,93 @@
 import numpy as np
 import random
-from collections import defaultdict
+from helper_classes.encoding import NUM_ACTIONS, encode_board, reachable_states, is_legacy_q_table, convert_legacy_q_table
+from helper_classes.q_tables import Q_TABLE_BACKENDS, ArrayQTable, HashedQTable, BoundedQTable
+from helper_classes.model_format import save_binary, load_binary, entries_to_arrays, arrays_to_entries
+from helper_classes.symmetry import SymmetricQTable
 
 class QLearningAgent:
-    def __init__(self, player: int, epsilon: int=0.1, alpha: int=0.5, gamma: int=0.9) -> None:
+    def __init__(self, player: int, epsilon: int=0.1, alpha: int=0.5, gamma: int=0.9, backend: str="dict", symmetry: bool=False, size: int=3, capacity: int=1 << 16, eviction: str="lru") -> None:
         """
             Args:
                 player: The specifier for the current player
                 epsilon: The exploration rate
                 alpha: The learning rate
                 gamma: The discount factor
+                backend: Storage of the q_table, "dict", "array", "shared", "hashed" or "bounded" (see helper_classes/q_tables.py)
+                symmetry: If True the 8 rotations and reflections of a board share their q values
+                size: Number of rows and columns of the board, only the dict, hashed and bounded backends support boards other than 3x3
+                capacity: Number of state slots of the hashed backend, maximum number of states of the bounded backend
+                eviction: Eviction policy of the bounded backend, "lru" or "lfu"
             
             Returns:
                 None
             
             Concept:
-                Initializes the class QLearningAgent with the given parameters; and sets the q_table to an empty dictionary.
+                Initializes the class QLearningAgent with the given parameters; and sets the q_table to an empty table keyed by (state id, action id) pairs.
         """
         
-        self.q_table = defaultdict(lambda: 0)
+        if size != 3 and (backend not in ("dict", "hashed", "bounded") or symmetry):
+            raise ValueError(f"A {size}x{size} board needs the dict, hashed or bounded backend without symmetry")
+        
+        self.backend = backend
+        self.symmetry = symmetry
+        self.size = size
+        self.n_actions = size * size
+        self.capacity = capacity
+        self.eviction = eviction
+        self.q_table = self.make_q_table()
         self.epsilon = epsilon
         self.alpha = alpha
         self.gamma = gamma
         self.player = player
     
-    def get_state(self, board: np.ndarray) -> tuple:
+    def make_q_table(self, entries: dict = None):
+        """
+            Args:
+                entries: Initial q values keyed by (state id, action id) pairs
+            
+            Returns:
+                A q_table of the configured backend
+            
+            Concept:
+                Builds the backend and wraps it in the symmetry layer if enabled.
+        """
+        
+        if self.backend == "bounded":
+            if self.symmetry:
+                return SymmetricQTable(BoundedQTable(capacity=self.capacity, eviction=self.eviction), entries)
+            return BoundedQTable(entries, self.capacity, self.eviction)
+        if self.backend == "hashed":
+            if self.symmetry:
+                return SymmetricQTable(HashedQTable(capacity=self.capacity), entries)
+            return HashedQTable(entries, self.n_actions, self.capacity)
+        if self.symmetry:
+            return SymmetricQTable(Q_TABLE_BACKENDS[self.backend](), entries)
+        return Q_TABLE_BACKENDS[self.backend](entries)
+    
+    def get_state(self, board: np.ndarray) -> int:
         """
             Args:
                 board: The current board being played at the moment
             
             Returns:
-                State as the board condition
+                State id of the board condition
                 
             Concept:
-                Returns the state as the board condition.
+                Returns the state as the base-3 integer id of the board condition.
         """
         
-        return tuple(map(tuple, board))
+        return encode_board(board)
     
-    def choose_action(self, board: np.ndarray, available_actions: list) -> int:
+    def choose_action(self, board: np.ndarray, available_actions: list, state: int = None) -> int:
         """
             Args:
                 board: The current board being played at the moment
-                available_actions: A list of actions that can be taken on the current board
+                available_actions: A list of action ids that can be taken on the current board
+                state: State id of the board if already known, e.g. from env.state_id(), so the board is not encoded again
             
             Returns:
-                A calculated action of the available actions
+                A calculated action id of the available actions
             
             Concept:
                 Returns a calculated action of the available actions and if epsilon value is greater than a random value then a random action is returned.
@@ -54,49 +96,54 @@ class QLearningAgent:
         if random.uniform(0, 1) < self.epsilon:
             return random.choice(available_actions)
         
-        q_values = [self.q_table[(self.get_state(board), action)] for action in available_actions]
-        max_q = max(q_values)
-        
-        return random.choice([a for a, q in zip(available_actions, q_values) if q == max_q])
+        return random.choice(self.q_table.best_actions(self.get_state(board) if state is None else state, available_actions))
     
-    def update_q_table(self, state: tuple, action: int, reward: int, next_state: tuple, next_actions: list) -> None:
+    def update_q_table(self, state: int, action: int, reward: int, next_state: int, next_actions: list) -> float:
         """
             Args:
-                state: The current board at the moment
-                action: Action taken by the agent
+                state: State id of the current board at the moment
+                action: Action id taken by the agent
                 reward: reward given for that action in that condition
-                next_state: The next board to played
-                next_actions: Actions available to model on the next board
+                next_state: State id of the next board to played
+                next_actions: Action ids available to model on the next board
             
             Returns:
-                None
+                The TD error of the update
             
             Concept:
                 Updates the q_table with the given parameters.
         """
         
-        current_q = self.q_table[(state, action)]
-        if next_actions:
-            max_next_q = max([self.q_table[(next_state, a)] for a in next_actions])
-        else:
-            max_next_q = 0
-        self.q_table[(state, action)] = current_q + self.alpha * (reward + self.gamma * max_next_q - current_q)
+        max_next_q = self.q_table.max_q(next_state, next_actions)
+        return self.q_table.td_update(state, action, reward + self.gamma * max_next_q, self.alpha)
     
-    def save_model(self, filename: str) -> None:
+    def save_model(self, filename: str, quantization: str = None) -> None:
         """
             Args:
                 filename: filename for the q_table to be saved in
+                quantization: Value storage of a .qtb file, "float64", "float32", "float16" or "int8" (None keeps the table's dtype)
             
             Returns:
                 None
             
             Concept:
-                Saves the q_table in the given filename.
+                Saves the q_table in the given filename. Files ending in .qtb use the memory-mappable binary format
+                (see helper_classes/model_format.py), anything else a pickled dict.
         """
         
+        if filename.endswith(".qtb"):
+            if self.size != 3:
+                raise ValueError("The .qtb format stores 3x3 boards only")
+            if type(self.q_table) is ArrayQTable:
+                save_binary(filename, self.q_table.states, self.q_table.values, self.q_table.visited, quantization)
+            else:
+                states = reachable_states()
+                save_binary(filename, states, *entries_to_arrays(self.q_table.to_dict(), states, NUM_ACTIONS), quantization)
+            return
+        
         import pickle
         with open(filename, 'wb') as f:
-            pickle.dump(dict(self.q_table), f)
+            pickle.dump(self.q_table.to_dict(), f)
     
     def load_model(self, filename: str) -> None:
         """
@@ -107,9 +154,26 @@ class QLearningAgent:
                 None
             
             Concept:
-                Loads the q_table from the given filename.
+                Loads the q_table from the given filename. Tables saved with tuple-of-tuples keys are converted to integer ids.
+                A .qtb file is memory-mapped copy-on-write: with the array backend the values are used in place without reading
+                the file, and updates stay private to this process.
         """
         
+        if filename.endswith(".qtb"):
+            if self.size != 3:
+                raise ValueError("The .qtb format stores 3x3 boards only")
+            states, values, visited = load_binary(filename, mode='c')
+            if self.backend == "array" and not self.symmetry:
+                self.q_table = ArrayQTable()
+                self.q_table.load_arrays(states, values, visited)
+            else:
+                self.q_table = self.make_q_table(arrays_to_entries(states, values, visited))
+            return
+        
         import pickle
         with open(filename, 'rb') as f:
-            self.q_table = defaultdict(lambda: 0, pickle.load(f))
\ No newline at end of file
+            q_table = pickle.load(f)
+        
+        if is_legacy_q_table(q_table):
+            q_table = convert_legacy_q_table(q_table)
+        self.q_table = self.make_q_table(q_table)
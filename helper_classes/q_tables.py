@@ -0,0 +1,1010 @@
+import sys
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+import heapq
+from collections import OrderedDict
+from helper_classes.encoding import NUM_STATES, NUM_ACTIONS, reachable_states
+
+class DictQTable:
+    def __init__(self, entries: dict = None) -> None:
+        """
+            Args:
+                entries: Initial q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Q-table backed by a dict, missing entries read as 0 without being inserted, so only writes grow the table.
+                changed collects the keys written since the last drain_changes call.
+        """
+
+        self.table = dict(entries or {})
+        self.changed = set()
+
+    def get(self, state: int, action: int) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+
+            Returns:
+                The q value of the action in the state
+
+            Concept:
+                Missing entries read as 0.
+        """
+
+        return self.table.get((state, action), 0)
+
+    def set(self, state: int, action: int, value: float) -> None:
+        """
+            Args:
+                state: State id
+                action: Action id
+                value: New q value
+
+            Returns:
+                None
+
+            Concept:
+                Stores the q value of the action in the state.
+        """
+
+        self.table[(state, action)] = value
+        self.changed.add((state, action))
+
+    def td_update(self, state: int, action: int, target: float, alpha: float) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+                target: TD target, reward + gamma * max next q
+                alpha: The learning rate
+
+            Returns:
+                The TD error, target minus the q value before the update
+
+            Concept:
+                Moves the q value of the action a step of size alpha towards the target.
+        """
+
+        current_q = self.table.get((state, action), 0)
+        self.set(state, action, current_q + alpha * (target - current_q))
+        return target - current_q
+
+    def q_values(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The q value of every action in the state
+
+            Concept:
+                One dict lookup per action.
+        """
+
+        table = self.table
+        return [table.get((state, action), 0) for action in actions]
+
+    def max_q(self, state: int, actions: list) -> float:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The highest q value of the actions, 0 if there are no actions
+
+            Concept:
+                Used as the bootstrap value of the TD update.
+        """
+
+        if not actions:
+            return 0
+        return max(self.q_values(state, actions))
+
+    def best_actions(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                All actions that share the highest q value
+
+            Concept:
+                Greedy action selection, ties are left to the caller.
+        """
+
+        q_values = self.q_values(state, actions)
+        max_q = max(q_values)
+        return [a for a, q in zip(actions, q_values) if q == max_q]
+
+    def to_dict(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries keyed by (state id, action id) pairs
+
+            Concept:
+                Plain dict used when saving the table.
+        """
+
+        return dict(self.table)
+
+    def drain_changes(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries written since the last call keyed by (state id, action id) pairs
+
+            Concept:
+                Used to send only the changed part of the table to another process or to disk.
+        """
+
+        changes = {key: self.table[key] for key in self.changed}
+        self.changed = set()
+        return changes
+
+    def load_entries(self, entries: dict) -> None:
+        """
+            Args:
+                entries: q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Overwrites the given entries without recording them as changed.
+        """
+
+        self.table.update(entries)
+
+    def nbytes(self) -> int:
+        """
+            Args:
+                None
+
+            Returns:
+                Approximate memory used by the table in bytes
+
+            Concept:
+                Counts the dict itself plus one key tuple, two ints and one float per entry.
+        """
+
+        per_entry = sys.getsizeof((0, 0)) + 2 * sys.getsizeof(NUM_STATES) + sys.getsizeof(0.0)
+        return sys.getsizeof(self.table) + len(self.table) * per_entry
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+class ArrayQTable:
+    def __init__(self, entries: dict = None, dtype: type = np.float32) -> None:
+        """
+            Args:
+                entries: Initial q values keyed by (state id, action id) pairs
+                dtype: dtype of the value array
+
+            Returns:
+                None
+
+            Concept:
+                Q-table backed by one contiguous (num_states, 9) array over the index of reachable states.
+                rows maps a state id to its row, -1 for unreachable states. visited marks the entries that were written.
+                Single-state operations read the whole row once with tolist(), which is cheaper than NumPy calls on 9 cells.
+        """
+
+        self.states = reachable_states()
+        self.rows = np.full(NUM_STATES, -1, dtype=np.int32)
+        self.rows[self.states] = np.arange(len(self.states), dtype=np.int32)
+        self.row_index = self.rows.tolist()
+        self.values, self.visited = self.allocate(dtype)
+        self.changed = set()
+
+        self.load_entries(entries or {})
+
+    def allocate(self, dtype: type) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Args:
+                dtype: dtype of the value array
+
+            Returns:
+                Zeroed value array and visited mask
+
+            Concept:
+                Allocates the arrays in process memory. Overridden by SharedArrayQTable.
+        """
+
+        shape = (len(self.states), NUM_ACTIONS)
+        return np.zeros(shape, dtype=dtype), np.zeros(shape, dtype=bool)
+
+    def row(self, state: int) -> int:
+        """
+            Args:
+                state: State id
+
+            Returns:
+                Row of the state in the value array
+
+            Concept:
+                Raises KeyError for states that cannot be reached in a real game.
+        """
+
+        row = self.row_index[state]
+        if row < 0:
+            raise KeyError(f"State {state} is not reachable")
+        return row
+
+    def get(self, state: int, action: int) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+
+            Returns:
+                The q value of the action in the state
+
+            Concept:
+                Reads one cell of the value array.
+        """
+
+        return self.values.item(self.row(state), action)
+
+    def set(self, state: int, action: int, value: float) -> None:
+        """
+            Args:
+                state: State id
+                action: Action id
+                value: New q value
+
+            Returns:
+                None
+
+            Concept:
+                Writes one cell of the value array and marks it visited.
+        """
+
+        row = self.row(state)
+        self.values[row, action] = value
+        self.visited[row, action] = True
+        self.changed.add((state, action))
+
+    def td_update(self, state: int, action: int, target: float, alpha: float) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+                target: TD target, reward + gamma * max next q
+                alpha: The learning rate
+
+            Returns:
+                The TD error, target minus the q value before the update
+
+            Concept:
+                Moves the q value of the action a step of size alpha towards the target.
+        """
+
+        row = self.row(state)
+        current_q = self.values.item(row, action)
+        self.values[row, action] = current_q + alpha * (target - current_q)
+        self.visited[row, action] = True
+        self.changed.add((state, action))
+        return target - current_q
+
+    def q_values(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The q value of every action in the state
+
+            Concept:
+                Gathers the actions from one row of the value array.
+        """
+
+        row = self.values[self.row(state)].tolist()
+        return [row[a] for a in actions]
+
+    def max_q(self, state: int, actions: list) -> float:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The highest q value of the actions, 0 if there are no actions
+
+            Concept:
+                Max over the actions of one row of the value array.
+        """
+
+        if not actions:
+            return 0
+        row = self.values[self.row(state)].tolist()
+        return max(row[a] for a in actions)
+
+    def best_actions(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                All actions that share the highest q value
+
+            Concept:
+                Argmax over the actions of one row of the value array, keeping ties.
+        """
+
+        row = self.values[self.row(state)].tolist()
+        max_q = max(row[a] for a in actions)
+        return [a for a in actions if row[a] == max_q]
+
+    def to_dict(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The visited entries keyed by (state id, action id) pairs
+
+            Concept:
+                Same format as DictQTable.to_dict so both backends save to the same file format.
+        """
+
+        rows, actions = np.nonzero(self.visited)
+        return {(int(self.states[r]), int(a)): float(self.values[r, a]) for r, a in zip(rows, actions)}
+
+    def drain_changes(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries written since the last call keyed by (state id, action id) pairs
+
+            Concept:
+                Used to send only the changed part of the table to another process or to disk.
+        """
+
+        changes = {(state, action): self.get(state, action) for state, action in self.changed}
+        self.changed = set()
+        return changes
+
+    def load_entries(self, entries: dict) -> None:
+        """
+            Args:
+                entries: q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Overwrites the given entries without recording them as changed.
+        """
+
+        for (state, action), q in entries.items():
+            row = self.row(state)
+            self.values[row, action] = q
+            self.visited[row, action] = True
+
+    def load_arrays(self, states: np.ndarray, values: np.ndarray, visited: np.ndarray) -> None:
+        """
+            Args:
+                states: State id of every row
+                values: q values, one row per state
+                visited: Mask of the entries that were written
+
+            Returns:
+                None
+
+            Concept:
+                Uses the arrays as they are (for example memory-mapped from a binary model file) if their rows match the reachable
+                state index, otherwise copies the entries over.
+        """
+
+        if len(states) == len(self.states) and np.array_equal(states, self.states):
+            self.values = values
+            self.visited = visited
+        else:
+            rows, actions = np.nonzero(visited)
+            self.load_entries(dict(zip(zip(np.asarray(states)[rows].tolist(), actions.tolist()), np.asarray(values)[rows, actions].tolist())))
+
+    def nbytes(self) -> int:
+        """
+            Args:
+                None
+
+            Returns:
+                Memory used by the table in bytes
+
+            Concept:
+                Size of the row index, the value array and the visited mask; fixed regardless of how many entries were written.
+        """
+
+        return self.rows.nbytes + self.values.nbytes + self.visited.nbytes
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.visited))
+
+class SharedArrayQTable(ArrayQTable):
+    def __init__(self, entries: dict = None, name: str = None, lock_stripes: int = 0, locks: list = None) -> None:
+        """
+            Args:
+                entries: Initial q values keyed by (state id, action id) pairs
+                name: Name of an existing shared memory block to attach to, a new block is created if None
+                lock_stripes: Number of locks to create, 0 for lock-free updates
+                locks: Existing locks to use instead of creating new ones
+
+            Returns:
+                None
+
+            Concept:
+                ArrayQTable whose value array and visited mask live in one multiprocessing.shared_memory block, so several processes
+                read and update the same table in place. Without locks updates are lock-free (concurrent writes to one entry can
+                lose an update); with locks every td_update takes the lock of its row's stripe.
+                The table can be passed to child processes; they attach to the same block by name.
+        """
+
+        self.name = name
+        self.owner = name is None
+        self.locks = locks if locks is not None else [multiprocessing.Lock() for _ in range(lock_stripes)]
+        super().__init__(entries, np.float32)
+
+    def allocate(self, dtype: type) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Args:
+                dtype: dtype of the value array
+
+            Returns:
+                Value array and visited mask backed by the shared memory block
+
+            Concept:
+                Creates the block if this table owns it, otherwise attaches to it by name.
+        """
+
+        shape = (len(self.states), NUM_ACTIONS)
+        values_size = shape[0] * shape[1] * np.dtype(dtype).itemsize
+        visited_size = shape[0] * shape[1]
+
+        if self.owner:
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=values_size + visited_size)
+            self.name = self.shared_memory.name
+        else:
+            self.shared_memory = shared_memory.SharedMemory(name=self.name)
+            # Only the owner may unlink the block; stop the resource tracker from doing it when this process exits
+            resource_tracker.unregister(self.shared_memory._name, "shared_memory")
+
+        values = np.ndarray(shape, dtype=dtype, buffer=self.shared_memory.buf)
+        visited = np.ndarray(shape, dtype=bool, buffer=self.shared_memory.buf, offset=values_size)
+        if self.owner:
+            values[:] = 0
+            visited[:] = False
+
+        return values, visited
+
+    def td_update(self, state: int, action: int, target: float, alpha: float) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+                target: TD target, reward + gamma * max next q
+                alpha: The learning rate
+
+            Returns:
+                The TD error, target minus the q value before the update
+
+            Concept:
+                Same update as ArrayQTable, under the stripe lock of the row if locks are used.
+        """
+
+        if not self.locks:
+            return super().td_update(state, action, target, alpha)
+
+        with self.locks[self.row(state) % len(self.locks)]:
+            return super().td_update(state, action, target, alpha)
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Detaches from the shared memory block, and frees it if this table created it. The table cannot be used afterwards.
+        """
+
+        self.values = self.visited = None
+        self.shared_memory.close()
+        if self.owner:
+            self.shared_memory.unlink()
+
+    def __getstate__(self) -> dict:
+        return {"name": self.name, "locks": self.locks}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(name=state["name"], locks=state["locks"])
+
+class HashedQTable:
+    def __init__(self, entries: dict = None, n_actions: int = NUM_ACTIONS, capacity: int = 1 << 16, max_load: float = 0.9) -> None:
+        """
+            Args:
+                entries: Initial q values keyed by (state id, action id) pairs
+                n_actions: Number of actions (cells) of the board
+                capacity: Number of state slots, rounded up to a power of two
+                max_load: Share of the slots that may be filled
+
+            Returns:
+                None
+
+            Concept:
+                Open-addressing hash table with linear probing over preallocated arrays: one int64 key and one row of n_actions q values
+                per slot. Works for any board whose state ids fit into int64, and its memory is fixed by the capacity. Once
+                max_load of the slots are taken, new states are not stored: they read as 0 and their updates are dropped (counted in dropped).
+        """
+
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.n_actions = n_actions
+        self.mask = capacity - 1
+        self.limit = int(capacity * max_load)
+        self.keys = np.full(capacity, -1, dtype=np.int64)
+        self.values = np.zeros((capacity, n_actions), dtype=np.float32)
+        self.visited = np.zeros((capacity, n_actions), dtype=bool)
+        self.states = 0
+        self.entries = 0
+        self.dropped = 0
+        self.changed = set()
+
+        self.load_entries(entries or {})
+
+    def slot(self, state: int, insert: bool = False) -> int:
+        """
+            Args:
+                state: State id
+                insert: Claim a free slot if the state is not stored yet
+
+            Returns:
+                Slot of the state, or -1 if it is not stored (and could not be inserted)
+
+            Concept:
+                Fibonacci hashing picks the first slot, then slots are probed one after another until the state or a free slot is found.
+        """
+
+        mask = self.mask
+        keys = self.keys
+        slot = (state * 0x9E3779B97F4A7C15 >> 32) & mask
+        while True:
+            key = keys.item(slot)
+            if key == state:
+                return slot
+            if key < 0:
+                if not insert:
+                    return -1
+                if self.states >= self.limit:
+                    self.dropped += 1
+                    return -1
+                keys[slot] = state
+                self.states += 1
+                return slot
+            slot = (slot + 1) & mask
+
+    def get(self, state: int, action: int) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+
+            Returns:
+                The q value of the action in the state
+
+            Concept:
+                States that are not stored read as 0, without inserting them.
+        """
+
+        slot = self.slot(state)
+        return self.values.item(slot, action) if slot >= 0 else 0.0
+
+    def set(self, state: int, action: int, value: float) -> None:
+        """
+            Args:
+                state: State id
+                action: Action id
+                value: New q value
+
+            Returns:
+                None
+
+            Concept:
+                Writes the value into the slot of the state, inserting the state if there is room.
+        """
+
+        slot = self.slot(state, insert=True)
+        if slot < 0:
+            return
+        self.values[slot, action] = value
+        if not self.visited[slot, action]:
+            self.visited[slot, action] = True
+            self.entries += 1
+        self.changed.add((state, action))
+
+    def td_update(self, state: int, action: int, target: float, alpha: float) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+                target: TD target, reward + gamma * max next q
+                alpha: The learning rate
+
+            Returns:
+                The TD error, target minus the q value before the update
+
+            Concept:
+                Moves the q value of the action a step of size alpha towards the target.
+        """
+
+        slot = self.slot(state, insert=True)
+        if slot < 0:
+            return target
+        current_q = self.values.item(slot, action)
+        self.values[slot, action] = current_q + alpha * (target - current_q)
+        if not self.visited[slot, action]:
+            self.visited[slot, action] = True
+            self.entries += 1
+        self.changed.add((state, action))
+        return target - current_q
+
+    def q_values(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The q value of every action in the state
+
+            Concept:
+                Gathers the actions from the row of the state's slot.
+        """
+
+        slot = self.slot(state)
+        if slot < 0:
+            return [0.0] * len(actions)
+        row = self.values[slot].tolist()
+        return [row[a] for a in actions]
+
+    def max_q(self, state: int, actions: list) -> float:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The highest q value of the actions, 0 if there are no actions
+        """
+
+        if not actions:
+            return 0
+        return max(self.q_values(state, actions))
+
+    def best_actions(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                All actions that share the highest q value
+        """
+
+        q_values = self.q_values(state, actions)
+        max_q = max(q_values)
+        return [a for a, q in zip(actions, q_values) if q == max_q]
+
+    def to_dict(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The visited entries keyed by (state id, action id) pairs
+
+            Concept:
+                Same format as DictQTable.to_dict so all backends save to the same file format.
+        """
+
+        slots, actions = np.nonzero(self.visited)
+        return {(int(self.keys[s]), int(a)): float(self.values[s, a]) for s, a in zip(slots, actions)}
+
+    def drain_changes(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries written since the last call keyed by (state id, action id) pairs
+        """
+
+        changes = {(state, action): self.get(state, action) for state, action in self.changed}
+        self.changed = set()
+        return changes
+
+    def load_entries(self, entries: dict) -> None:
+        """
+            Args:
+                entries: q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Overwrites the given entries without recording them as changed.
+        """
+
+        for (state, action), q in entries.items():
+            self.set(state, action, q)
+            self.changed.discard((state, action))
+
+    def nbytes(self) -> int:
+        """
+            Args:
+                None
+
+            Returns:
+                Memory used by the table in bytes
+
+            Concept:
+                Size of the key, value and visited arrays; fixed by the capacity.
+        """
+
+        return self.keys.nbytes + self.values.nbytes + self.visited.nbytes
+
+    def __len__(self) -> int:
+        return self.entries
+
+class BoundedQTable:
+    def __init__(self, entries: dict = None, capacity: int = 1 << 16, eviction: str = "lru") -> None:
+        """
+            Args:
+                entries: Initial q values keyed by (state id, action id) pairs
+                capacity: Maximum number of states kept
+                eviction: "lru" evicts the least recently updated state, "lfu" the states with the fewest updates
+
+            Returns:
+                None
+
+            Concept:
+                Q-table with a memory cap, keyed by state with one {action: q} dict per state. Reads never insert. Writing an unseen
+                state into a full table first evicts: one state for "lru", the tenth of the states with the fewest updates for "lfu"
+                (so the scan over the visit counts is paid once per capacity / 10 new states). Evicted states read as 0 again.
+                Checkpoints only hold the entries, so a resumed table keeps the cap but restarts the recency and visit counts.
+        """
+
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy {eviction}")
+
+        self.capacity = capacity
+        self.eviction = eviction
+        self.table = OrderedDict()
+        self.visits = {}
+        self.evicted = 0
+        self.changed = set()
+
+        self.load_entries(entries or {})
+
+    def row(self, state: int) -> dict:
+        """
+            Args:
+                state: State id
+
+            Returns:
+                The {action: q} dict of the state, inserted (evicting if the table is full) if missing
+
+            Concept:
+                Counts the write as a visit of the state.
+        """
+
+        row = self.table.get(state)
+        if row is None:
+            if len(self.table) >= self.capacity:
+                self.evict()
+            row = self.table[state] = {}
+            self.visits[state] = 0
+        elif self.eviction == "lru":
+            self.table.move_to_end(state)
+        self.visits[state] += 1
+        return row
+
+    def evict(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Drops the least recently updated state, or the tenth of the states with the fewest updates.
+        """
+
+        if self.eviction == "lru":
+            victims = [next(iter(self.table))]
+        else:
+            victims = heapq.nsmallest(max(1, self.capacity // 10), self.visits, key=self.visits.get)
+        for state in victims:
+            del self.table[state]
+            del self.visits[state]
+        self.evicted += len(victims)
+
+    def get(self, state: int, action: int) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+
+            Returns:
+                The q value of the action in the state
+
+            Concept:
+                Missing and evicted entries read as 0.
+        """
+
+        row = self.table.get(state)
+        return row.get(action, 0) if row is not None else 0
+
+    def set(self, state: int, action: int, value: float) -> None:
+        """
+            Args:
+                state: State id
+                action: Action id
+                value: New q value
+
+            Returns:
+                None
+        """
+
+        self.row(state)[action] = value
+        self.changed.add((state, action))
+
+    def td_update(self, state: int, action: int, target: float, alpha: float) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+                target: TD target, reward + gamma * max next q
+                alpha: The learning rate
+
+            Returns:
+                The TD error, target minus the q value before the update
+
+            Concept:
+                Moves the q value of the action a step of size alpha towards the target.
+        """
+
+        row = self.row(state)
+        current_q = row.get(action, 0)
+        row[action] = current_q + alpha * (target - current_q)
+        self.changed.add((state, action))
+        return target - current_q
+
+    def q_values(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The q value of every action in the state
+        """
+
+        row = self.table.get(state)
+        if row is None:
+            return [0] * len(actions)
+        return [row.get(action, 0) for action in actions]
+
+    def max_q(self, state: int, actions: list) -> float:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The highest q value of the actions, 0 if there are no actions
+        """
+
+        if not actions:
+            return 0
+        return max(self.q_values(state, actions))
+
+    def best_actions(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                All actions that share the highest q value
+        """
+
+        q_values = self.q_values(state, actions)
+        max_q = max(q_values)
+        return [a for a, q in zip(actions, q_values) if q == max_q]
+
+    def to_dict(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries of the kept states keyed by (state id, action id) pairs
+        """
+
+        return {(state, action): q for state, row in self.table.items() for action, q in row.items()}
+
+    def drain_changes(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries written since the last call keyed by (state id, action id) pairs, without those evicted since
+        """
+
+        table = self.table
+        changes = {(state, action): table[state][action] for state, action in self.changed if action in table.get(state, ())}
+        self.changed = set()
+        return changes
+
+    def load_entries(self, entries: dict) -> None:
+        """
+            Args:
+                entries: q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Overwrites the given entries without recording them as changed. Loading counts as one visit per entry.
+        """
+
+        for (state, action), q in entries.items():
+            self.row(state)[action] = q
+
+    def nbytes(self) -> int:
+        """
+            Args:
+                None
+
+            Returns:
+                Approximate memory used by the table in bytes
+
+            Concept:
+                Counts the state dict, the visit counts and every row with its keys and values.
+        """
+
+        per_entry = sys.getsizeof(0) + sys.getsizeof(0.0)
+        per_state = 2 * sys.getsizeof(NUM_STATES) + sys.getsizeof(0)
+        rows = sum(sys.getsizeof(row) + len(row) * per_entry for row in self.table.values())
+        return sys.getsizeof(self.table) + sys.getsizeof(self.visits) + len(self.table) * per_state + rows
+
+    def __len__(self) -> int:
+        return sum(len(row) for row in self.table.values())
+
+Q_TABLE_BACKENDS = {
+    "dict": DictQTable,
+    "array": ArrayQTable,
+    "shared": SharedArrayQTable,
+    "hashed": HashedQTable,
+    "bounded": BoundedQTable,
+}
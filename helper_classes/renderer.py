@@ -0,0 +1,253 @@
+import time
+import pygame
+import threading
+import numpy as np
+from collections import deque
+
+class PygameRenderer:
+    def __init__(self, caption: str = "Tic-Tac-Toe Training", delay: float = 0.1, size: int = 3) -> None:
+        """
+            Args:
+                caption: Title of the pygame window
+                delay: Seconds to wait after every drawn frame
+                size: Number of rows and columns of the board
+
+            Returns:
+                None
+
+            Concept:
+                Initializes pygame and sets up the screen, font, and clock. The renderer is an observer that can be attached to a TicTacToe environment.
+        """
+
+        pygame.init()
+        # 100 pixel cells up to 6x6, smaller cells beyond that
+        self.cell = min(100, 600 // size)
+        self.screen = pygame.display.set_mode((self.cell * size, self.cell * size))
+        pygame.display.set_caption(caption)
+        self.font = pygame.font.Font(None, 74)
+        self.clock = pygame.time.Clock()
+        self.delay = delay
+        self.last_board = None
+
+    def draw(self, board: np.ndarray) -> None:
+        """
+            Args:
+                board: The board to be drawn
+
+            Returns:
+                None
+
+            Concept:
+                Renders the board on the screen. After the first frame only the cells that changed since the last drawn board are
+                cleared, redrawn and pushed to the display.
+        """
+
+        if self.last_board is None or self.last_board.shape != board.shape:
+            self.draw_full(board)
+        else:
+            rows, cols = np.nonzero(board != self.last_board)
+            rects = [self.draw_cell(board, row, col) for row, col in zip(rows.tolist(), cols.tolist())]
+            if rects:
+                pygame.display.update(rects)
+        self.last_board = board.copy()
+
+        if self.delay:
+            time.sleep(self.delay)  # Delay so the moves taken by the agent can be seen in real time
+
+    def draw_full(self, board: np.ndarray) -> None:
+        """
+            Args:
+                board: The board to be drawn
+
+            Returns:
+                None
+
+            Concept:
+                Draws the grid and every cell and flips the whole display.
+        """
+
+        cell = self.cell
+        size = board.shape[0]
+        self.screen.fill((255, 255, 255))
+        for row in range(size):
+            for col in range(size):
+                self.draw_cell(board, row, col)
+
+        for i in range(1, size):
+            pygame.draw.line(self.screen, (0, 0, 0), (0, i * cell), (size * cell, i * cell), 5)
+            pygame.draw.line(self.screen, (0, 0, 0), (i * cell, 0), (i * cell, size * cell), 5)
+
+        pygame.display.flip()
+
+    def draw_cell(self, board: np.ndarray, row: int, col: int) -> pygame.Rect:
+        """
+            Args:
+                board: The board to be drawn
+                row: Row of the cell
+                col: Column of the cell
+
+            Returns:
+                The area of the screen that was drawn
+
+            Concept:
+                Clears the inside of the cell, leaving the grid lines, and draws its mark.
+        """
+
+        cell = self.cell
+        x, y = col * cell, row * cell
+        rect = pygame.Rect(x + 3, y + 3, cell - 6, cell - 6)
+        self.screen.fill((255, 255, 255), rect)
+        if board[row, col] == 1:
+            pygame.draw.line(self.screen, (0, 0, 0), (x + cell * 15 // 100, y + cell * 15 // 100), (x + cell * 85 // 100, y + cell * 85 // 100), cell * 15 // 100)
+            pygame.draw.line(self.screen, (0, 0, 0), (x + cell * 15 // 100, y + cell * 85 // 100), (x + cell * 85 // 100, y + cell * 15 // 100), cell * 15 // 100)
+        elif board[row, col] == -1:
+            pygame.draw.circle(self.screen, (0, 0, 0), (x + cell // 2, y + cell // 2), cell * 40 // 100, cell * 15 // 100)
+        return rect
+
+    def poll_events(self) -> bool:
+        """
+            Args:
+                None
+
+            Returns:
+                False if the window was closed, True otherwise
+
+            Concept:
+                Drains the pygame event queue so the window stays responsive.
+        """
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        return True
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Closes the pygame window.
+        """
+
+        pygame.quit()
+
+class AsyncRenderer:
+    def __init__(self, caption: str = "Tic-Tac-Toe Training", delay: float = 0.1, size: int = 3, queue_size: int = 2) -> None:
+        """
+            Args:
+                caption: Title of the pygame window
+                delay: Seconds the render thread waits after every drawn frame
+                size: Number of rows and columns of the board
+                queue_size: Number of board snapshots that can wait to be drawn
+
+            Returns:
+                None
+
+            Concept:
+                Renderer with the same interface as PygameRenderer whose window lives on its own thread. draw() only appends a copy
+                of the board to a bounded deque; when it is full the oldest waiting frame falls out, so a slow window never slows the
+                caller. The render thread draws the frames it gets (only the changed cells) and handles the window events, so
+                poll_events() is a flag check. The window is created off the main thread, which SDL does not support on macOS.
+        """
+
+        self.frames = deque(maxlen=queue_size)
+        self.pending = threading.Event()
+        self.closed = threading.Event()
+        self.stop_event = threading.Event()
+        self.ready = threading.Event()
+        self.error = None
+        self.queued = 0
+        self.drawn = 0
+        self.thread = threading.Thread(target=self.render_loop, args=(caption, delay, size), daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def dropped(self) -> int:
+        return self.queued - self.drawn - len(self.frames)
+
+    def render_loop(self, caption: str, delay: float, size: int) -> None:
+        """
+            Args:
+                caption: Title of the pygame window
+                delay: Seconds to wait after every drawn frame
+                size: Number of rows and columns of the board
+
+            Returns:
+                None
+
+            Concept:
+                Owns the pygame window: draws queued frames and polls the window events until stopped or the window is closed.
+        """
+
+        try:
+            renderer = PygameRenderer(caption, delay, size)
+        except Exception as error:
+            # Any failure is handed to __init__, which would otherwise wait for ready forever
+            self.error = error
+            self.ready.set()
+            return
+        self.ready.set()
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    renderer.draw(self.frames.popleft())
+                    self.drawn += 1
+                except IndexError:
+                    self.pending.wait(0.05)
+                    self.pending.clear()
+                if not renderer.poll_events():
+                    self.closed.set()
+                    break
+        finally:
+            renderer.close()
+
+    def draw(self, board: np.ndarray) -> None:
+        """
+            Args:
+                board: The board to be drawn
+
+            Returns:
+                None
+
+            Concept:
+                Queues a snapshot of the board without waiting and wakes the render thread if it is idle.
+        """
+
+        self.frames.append(board.copy())
+        self.queued += 1
+        if not self.pending.is_set():
+            self.pending.set()
+
+    def poll_events(self) -> bool:
+        """
+            Args:
+                None
+
+            Returns:
+                False if the window was closed, True otherwise
+        """
+
+        return not self.closed.is_set()
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Stops the render thread, which closes the window. Frames still waiting are dropped.
+        """
+
+        self.stop_event.set()
+        self.thread.join()
@@ -0,0 +1,176 @@
+import os
+import numpy as np
+from helper_classes.bitboard import WIN, FULL_BOARD
+from helper_classes.encoding import NUM_ACTIONS, POW3, encode_masks, reachable_states
+from helper_classes.symmetry import CANONICAL_STATE
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Center first, then corners, then edges: good moves early make alpha-beta cut more
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+_canonical_state = CANONICAL_STATE.tolist()
+
+def negamax(x_mask: int, o_mask: int, alpha: int, beta: int, table: dict) -> int:
+    """
+        Args:
+            x_mask: 9-bit mask of player 1
+            o_mask: 9-bit mask of player 2
+            alpha: Lower bound of the search window
+            beta: Upper bound of the search window
+            table: Transposition table {canonical state id: (value, bound flag)}
+
+        Returns:
+            Game-theoretic value for the player to move: 1 win, 0 draw, -1 loss (a bound if outside the window)
+
+        Concept:
+            Negamax with alpha-beta pruning. Results are stored in the transposition table under the canonical state id,
+            so all 8 symmetric boards share one entry, together with whether the value is exact, a lower or an upper bound.
+    """
+
+    x_to_move = bin(x_mask).count("1") == bin(o_mask).count("1")
+    own, opponent = (x_mask, o_mask) if x_to_move else (o_mask, x_mask)
+    if WIN[opponent]:
+        return -1
+    if own | opponent == FULL_BOARD:
+        return 0
+
+    key = _canonical_state[encode_masks(x_mask, o_mask)]
+    entry = table.get(key)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT:
+            return value
+        if flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    original_alpha = alpha
+    best = -2
+    empty = ~(own | opponent) & FULL_BOARD
+    for cell in MOVE_ORDER:
+        if not empty >> cell & 1:
+            continue
+        if x_to_move:
+            value = -negamax(x_mask | 1 << cell, o_mask, -beta, -alpha, table)
+        else:
+            value = -negamax(x_mask, o_mask | 1 << cell, -beta, -alpha, table)
+        best = max(best, value)
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+
+    flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+    table[key] = (best, flag)
+
+    return best
+
+def solve() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Args:
+            None
+
+        Returns:
+            state ids of every reachable position, their value for the player to move, and a 9-bit mask of the optimal actions
+
+        Concept:
+            Searches every child of every reachable position with a full window, reusing one transposition table.
+            Finished positions have value -1 (the previous player won) or 0 (draw) and no optimal actions.
+    """
+
+    states = reachable_states()
+    values = np.zeros(len(states), dtype=np.int8)
+    optimal = np.zeros(len(states), dtype=np.uint16)
+    table = {}
+
+    boards = states[:, None] // POW3 % 3
+    for i, digits in enumerate(boards.tolist()):
+        x_mask = sum(1 << cell for cell, digit in enumerate(digits) if digit == 1)
+        o_mask = sum(1 << cell for cell, digit in enumerate(digits) if digit == 2)
+        x_to_move = bin(x_mask).count("1") == bin(o_mask).count("1")
+
+        if WIN[x_mask] or WIN[o_mask] or x_mask | o_mask == FULL_BOARD:
+            values[i] = -1 if WIN[x_mask] or WIN[o_mask] else 0
+            continue
+
+        child_values = {}
+        for cell in range(9):
+            if (x_mask | o_mask) >> cell & 1:
+                continue
+            child = (x_mask | 1 << cell, o_mask) if x_to_move else (x_mask, o_mask | 1 << cell)
+            child_values[cell] = -negamax(*child, -2, 2, table)
+
+        values[i] = max(child_values.values())
+        optimal[i] = sum(1 << cell for cell, value in child_values.items() if value == values[i])
+
+    return states, values, optimal
+
+def load_or_solve(cache_file: str = "agents/solver_table.npz") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Args:
+            cache_file: Compact cache of the solved table, written on the first call
+
+        Returns:
+            state ids, values and optimal action masks, see solve()
+
+        Concept:
+            Solving takes a moment, so the table is computed once and then read from the cache.
+    """
+
+    if cache_file and os.path.exists(cache_file):
+        with np.load(cache_file) as data:
+            return data["states"], data["values"], data["optimal"]
+
+    states, values, optimal = solve()
+    if cache_file:
+        np.savez_compressed(cache_file, states=states, values=values, optimal=optimal)
+
+    return states, values, optimal
+
+def score_policy(q_values: np.ndarray, states: np.ndarray, optimal: np.ndarray, player: int) -> float:
+    """
+        Args:
+            q_values: (num_states, 9) q values with one row per entry of states
+            states: State ids of the rows, as returned by load_or_solve
+            optimal: Optimal action masks, as returned by load_or_solve
+            player: Player the q values belong to, 1 or -1
+
+        Returns:
+            Fraction of the positions of the player where every greedy action is optimal
+
+        Concept:
+            Takes the greedy actions of every row at once (ties included, occupied cells masked out) and checks them against the
+            optimal action masks. Only unfinished positions where the player is to move are counted.
+    """
+
+    boards = states[:, None] // POW3 % 3
+    x_count = (boards == 1).sum(axis=1)
+    o_count = (boards == 2).sum(axis=1)
+    to_move = (x_count == o_count) if player == 1 else (x_count == o_count + 1)
+    positions = to_move & (optimal != 0)
+
+    masked = np.where(boards == 0, q_values, -np.inf)
+    greedy = masked == masked.max(axis=1, keepdims=True)
+    greedy_masks = greedy.astype(np.int64) @ (1 << np.arange(NUM_ACTIONS))
+
+    return float(np.mean((greedy_masks[positions] & ~optimal[positions].astype(np.int64)) == 0))
+
+def optimal_actions(state: int, states: np.ndarray, optimal: np.ndarray) -> list:
+    """
+        Args:
+            state: State id
+            states: State ids, as returned by load_or_solve
+            optimal: Optimal action masks, as returned by load_or_solve
+
+        Returns:
+            The optimal action ids of the state
+
+        Concept:
+            Binary search in the sorted state ids, then reads the bits of the mask.
+    """
+
+    mask = int(optimal[np.searchsorted(states, state)])
+    return [cell for cell in range(NUM_ACTIONS) if mask >> cell & 1]
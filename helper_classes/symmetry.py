@@ -0,0 +1,259 @@
+import numpy as np
+from helper_classes.encoding import NUM_STATES, POW3
+
+def _build_permutations() -> np.ndarray:
+    """
+        Args:
+            None
+
+        Returns:
+            (8, 9) array, row t lists which old cell lands on each new cell under transform t
+
+        Concept:
+            The 8 symmetries of the square (dihedral group D4): 4 rotations, each with and without a mirror.
+    """
+
+    grid = np.arange(9).reshape(3, 3)
+    permutations = []
+    for mirror in (False, True):
+        for turns in range(4):
+            transformed = np.rot90(np.fliplr(grid) if mirror else grid, turns)
+            permutations.append(transformed.ravel())
+
+    return np.array(permutations)
+
+# GATHER[t][new_cell] = old_cell, SCATTER[t][old_cell] = new_cell
+GATHER = _build_permutations()
+SCATTER = np.argsort(GATHER, axis=1)
+
+def _build_canonical_tables() -> tuple[np.ndarray, np.ndarray]:
+    """
+        Args:
+            None
+
+        Returns:
+            canonical state id and transform index of every state id
+
+        Concept:
+            Applies all 8 transforms to every state id at once and keeps the smallest resulting id as the canonical representative.
+    """
+
+    digits = np.arange(NUM_STATES)[:, None] // POW3 % 3
+    transformed = np.stack([digits[:, gather] @ POW3 for gather in GATHER])
+    transforms = transformed.argmin(axis=0)
+
+    return transformed[transforms, np.arange(NUM_STATES)], transforms
+
+CANONICAL_STATE, CANONICAL_TRANSFORM = _build_canonical_tables()
+
+# Plain lists for fast scalar lookups
+_canonical_state = CANONICAL_STATE.tolist()
+_canonical_transform = CANONICAL_TRANSFORM.tolist()
+_gather = GATHER.tolist()
+_scatter = SCATTER.tolist()
+
+def canonicalize(state: int) -> tuple[int, int]:
+    """
+        Args:
+            state: State id
+
+        Returns:
+            canonical state id and the transform that maps the state onto it
+
+        Concept:
+            Two table lookups.
+    """
+
+    return _canonical_state[state], _canonical_transform[state]
+
+def transform_state(state: int, transform: int) -> int:
+    """
+        Args:
+            state: State id
+            transform: Transform index
+
+        Returns:
+            State id of the transformed board
+
+        Concept:
+            Permutes the base-3 digits of the state id.
+    """
+
+    digits = state // POW3 % 3
+    return int(digits[GATHER[transform]] @ POW3)
+
+class SymmetricQTable:
+    def __init__(self, inner, entries: dict = None) -> None:
+        """
+            Args:
+                inner: Q-table backend storing the canonical entries
+                entries: Initial q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Layer under the agent that stores every state in its canonical orientation, so all 8 symmetric boards share their q values.
+                Actions are moved into the canonical frame on the way in and back out on the way out.
+        """
+
+        self.inner = inner
+        for (state, action), q in (entries or {}).items():
+            self.set(state, action, q)
+
+    def get(self, state: int, action: int) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+
+            Returns:
+                The q value of the action in the state
+
+            Concept:
+                Reads the canonical entry.
+        """
+
+        canonical, transform = _canonical_state[state], _canonical_transform[state]
+        return self.inner.get(canonical, _scatter[transform][action])
+
+    def set(self, state: int, action: int, value: float) -> None:
+        """
+            Args:
+                state: State id
+                action: Action id
+                value: New q value
+
+            Returns:
+                None
+
+            Concept:
+                Writes the canonical entry, which updates all symmetric boards at once.
+        """
+
+        canonical, transform = _canonical_state[state], _canonical_transform[state]
+        self.inner.set(canonical, _scatter[transform][action], value)
+
+    def td_update(self, state: int, action: int, target: float, alpha: float) -> float:
+        """
+            Args:
+                state: State id
+                action: Action id
+                target: TD target, reward + gamma * max next q
+                alpha: The learning rate
+
+            Returns:
+                The TD error of the canonical entry
+
+            Concept:
+                Applies the update to the canonical entry.
+        """
+
+        canonical, transform = _canonical_state[state], _canonical_transform[state]
+        return self.inner.td_update(canonical, _scatter[transform][action], target, alpha)
+
+    def q_values(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The q value of every action in the state
+
+            Concept:
+                Reads the canonical entries of the transformed actions.
+        """
+
+        canonical, transform = _canonical_state[state], _canonical_transform[state]
+        scatter = _scatter[transform]
+        return self.inner.q_values(canonical, [scatter[a] for a in actions])
+
+    def max_q(self, state: int, actions: list) -> float:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                The highest q value of the actions, 0 if there are no actions
+
+            Concept:
+                Max over the canonical entries of the transformed actions.
+        """
+
+        canonical, transform = _canonical_state[state], _canonical_transform[state]
+        scatter = _scatter[transform]
+        return self.inner.max_q(canonical, [scatter[a] for a in actions])
+
+    def best_actions(self, state: int, actions: list) -> list:
+        """
+            Args:
+                state: State id
+                actions: Action ids
+
+            Returns:
+                All actions that share the highest q value, in the frame of the given state
+
+            Concept:
+                Takes the best canonical actions and maps them back through the inverse transform.
+        """
+
+        canonical, transform = _canonical_state[state], _canonical_transform[state]
+        scatter = _scatter[transform]
+        gather = _gather[transform]
+        return [gather[a] for a in self.inner.best_actions(canonical, [scatter[a] for a in actions])]
+
+    def to_dict(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The entries of every orientation keyed by (state id, action id) pairs
+
+            Concept:
+                Expands every canonical entry to all 8 symmetric boards, so the saved table can be used by an agent without the symmetry layer.
+        """
+
+        entries = {}
+        for (canonical, action), q in self.inner.to_dict().items():
+            for transform in range(8):
+                state = transform_state(canonical, transform)
+                entries[(state, _gather[_canonical_transform[state]][action])] = q
+
+        return entries
+
+    def drain_changes(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                The canonical entries written since the last call
+
+            Concept:
+                Keys are canonical (state id, action id) pairs. A canonical state maps onto itself with the identity transform, so get and set accept these keys unchanged.
+        """
+
+        return self.inner.drain_changes()
+
+    def load_entries(self, entries: dict) -> None:
+        """
+            Args:
+                entries: canonical q values keyed by (state id, action id) pairs
+
+            Returns:
+                None
+
+            Concept:
+                Overwrites the given canonical entries without recording them as changed.
+        """
+
+        self.inner.load_entries(entries)
+
+    def nbytes(self) -> int:
+        return self.inner.nbytes()
+
+    def __len__(self) -> int:
+        return len(self.inner)
@@ -0,0 +1,366 @@
+import json
+import time
+import cProfile
+import pstats
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class NullTelemetry:
+    """
+        Telemetry that records nothing. Code on the hot path checks enabled once and skips all instrumentation,
+        so training without telemetry pays for a single attribute read per episode.
+    """
+
+    enabled = False
+
+    def start(self, episode: int, wins: tuple) -> None:
+        pass
+
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def td_error(self, error: float) -> None:
+        pass
+
+    def episode_start(self, episode: int) -> None:
+        pass
+
+    def episode_end(self, episode: int, wins: tuple, agents: tuple = ()) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+NULL_TELEMETRY = NullTelemetry()
+
+class Telemetry(NullTelemetry):
+    enabled = True
+
+    def __init__(self, sinks: list, every_episodes: int = 10000, every_seconds: float = 0.0, window: int = 1000, profile_window: tuple = None, profile_file: str = "output_files/training.prof") -> None:
+        """
+            Args:
+                sinks: Objects with an emit(snapshot) method and a close() method
+                every_episodes: Emit a snapshot after this many episodes, 0 to disable
+                every_seconds: Emit a snapshot after this many seconds, 0 to disable
+                window: Number of recent episodes the rolling win rates and TD errors are computed over
+                profile_window: (first episode, last episode) to run cProfile over, None to not profile
+                profile_file: File the profile statistics are dumped to
+
+            Returns:
+                None
+
+            Concept:
+                Collects counters, accumulated timers, rolling outcomes and TD errors. At every interval a snapshot with rates since
+                the previous snapshot is handed to every sink.
+        """
+
+        self.sinks = sinks
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.counters = {}
+        self.timers = {}
+        self.outcomes = deque(maxlen=window)
+        self.outcome_counts = [0, 0, 0]
+        self.td_errors = deque(maxlen=window * 9)
+        self.last_wins = None
+
+        self.profile_window = profile_window
+        self.profile_file = profile_file
+        self.profiler = None
+
+        self.started = time.perf_counter()
+        self.last_time = self.started
+        self.last_episode = 0
+        self.last_counters = {}
+
+    def start(self, episode: int, wins: tuple) -> None:
+        """
+            Args:
+                episode: Episode counter the run starts from, non-zero when resuming
+                wins: Player 1 wins, player 2 wins and draws at that episode
+
+            Returns:
+                None
+
+            Concept:
+                Called by train() before the first episode. The outcome of the first episode is derived from these win counts, and
+                the first interval starts here instead of at episode 0.
+        """
+
+        self.last_wins = tuple(wins)
+        self.last_episode = episode
+        self.last_time = time.perf_counter()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+            Args:
+                name: Name of the counter
+                amount: Amount to add
+
+            Returns:
+                None
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+            Args:
+                name: Name of the timer, e.g. "env", "agent" or "logging"
+                seconds: Time to add
+
+            Returns:
+                None
+        """
+
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def td_error(self, error: float) -> None:
+        """
+            Args:
+                error: TD error of one update
+
+            Returns:
+                None
+
+            Concept:
+                Kept as a magnitude over a rolling window.
+        """
+
+        self.td_errors.append(abs(error))
+
+    def episode_start(self, episode: int) -> None:
+        """
+            Args:
+                episode: Index of the episode about to start
+
+            Returns:
+                None
+
+            Concept:
+                Starts the profiler at the first episode of the profile window.
+        """
+
+        if self.profile_window and episode == self.profile_window[0]:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def episode_end(self, episode: int, wins: tuple, agents: tuple = ()) -> None:
+        """
+            Args:
+                episode: Number of episodes played so far
+                wins: Player 1 wins, player 2 wins and draws so far
+                agents: Agents whose q_table size is reported
+
+            Returns:
+                None
+
+            Concept:
+                Derives the outcome of the episode from the change of the win counts, stops the profiler at the end of the profile window
+                and emits a snapshot when an interval ran out.
+        """
+
+        if self.last_wins is not None:
+            for outcome, (now, before) in enumerate(zip(wins, self.last_wins)):
+                if now != before:
+                    if len(self.outcomes) == self.outcomes.maxlen:
+                        self.outcome_counts[self.outcomes[0]] -= 1
+                    self.outcomes.append(outcome)
+                    self.outcome_counts[outcome] += 1
+                    break
+        self.last_wins = tuple(wins)
+        self.count("episodes")
+
+        if self.profiler is not None and episode >= self.profile_window[1]:
+            self.stop_profiler()
+
+        now = time.perf_counter()
+        if (self.every_episodes and episode - self.last_episode >= self.every_episodes) or (self.every_seconds and now - self.last_time >= self.every_seconds):
+            self.emit(episode, agents, now)
+
+    def snapshot(self, episode: int, agents: tuple, now: float) -> dict:
+        """
+            Args:
+                episode: Number of episodes played so far
+                agents: Agents whose q_table size is reported
+                now: Current perf_counter time
+
+            Returns:
+                Metrics since the previous snapshot and rolling metrics over the window
+        """
+
+        elapsed = max(now - self.last_time, 1e-9)
+        episodes = self.counters.get("episodes", 0) - self.last_counters.get("episodes", 0)
+        steps = self.counters.get("steps", 0) - self.last_counters.get("steps", 0)
+        timed = sum(self.timers.values()) or 1.0
+        played = max(len(self.outcomes), 1)
+
+        return {
+            "episode": episode,
+            "elapsed": now - self.started,
+            "episodes_per_sec": episodes / elapsed,
+            "steps_per_sec": steps / elapsed,
+            "time_split": {name: seconds / timed for name, seconds in self.timers.items()},
+            "counters": dict(self.counters),
+            "q_table_sizes": [len(agent.q_table) for agent in agents],
+            "win_rate": {"player1": self.outcome_counts[0] / played, "player2": self.outcome_counts[1] / played, "draw": self.outcome_counts[2] / played},
+            "td_error": sum(self.td_errors) / len(self.td_errors) if self.td_errors else 0.0,
+        }
+
+    def emit(self, episode: int, agents: tuple, now: float) -> None:
+        """
+            Args:
+                episode: Number of episodes played so far
+                agents: Agents whose q_table size is reported
+                now: Current perf_counter time
+
+            Returns:
+                None
+
+            Concept:
+                Hands a snapshot to every sink and starts the next interval.
+        """
+
+        snapshot = self.snapshot(episode, agents, now)
+        for sink in self.sinks:
+            sink.emit(snapshot)
+
+        self.last_time = now
+        self.last_episode = episode
+        self.last_counters = dict(self.counters)
+
+    def stop_profiler(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Dumps the statistics of the profile window to profile_file (readable with pstats or snakeviz).
+        """
+
+        self.profiler.disable()
+        self.profiler.dump_stats(self.profile_file)
+        self.profiler = None
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Stops a profile window that is still running and closes the sinks.
+        """
+
+        if self.profiler is not None:
+            self.stop_profiler()
+        for sink in self.sinks:
+            sink.close()
+
+class PrintSink:
+    def emit(self, snapshot: dict) -> None:
+        """
+            Args:
+                snapshot: Telemetry snapshot
+
+            Returns:
+                None
+
+            Concept:
+                Prints one summary line per snapshot.
+        """
+
+        split = ", ".join(f"{name} {share:.0%}" for name, share in snapshot["time_split"].items())
+        print(f"Episode {snapshot['episode']}: {snapshot['episodes_per_sec']:,.0f} episodes/s, {snapshot['steps_per_sec']:,.0f} steps/s, "
+              f"wins {snapshot['win_rate']['player1']:.1%}/{snapshot['win_rate']['player2']:.1%}, draws {snapshot['win_rate']['draw']:.1%}, "
+              f"|TD error| {snapshot['td_error']:.4f}, q_tables {snapshot['q_table_sizes']}" + (f", time {split}" if split else ""))
+
+    def close(self) -> None:
+        pass
+
+class JsonlSink:
+    def __init__(self, filename: str) -> None:
+        """
+            Args:
+                filename: JSON Lines file the snapshots are appended to
+
+            Returns:
+                None
+        """
+
+        self.file = open(filename, 'a', encoding='utf-8')
+
+    def emit(self, snapshot: dict) -> None:
+        self.file.write(json.dumps(snapshot, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+class HttpSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8766) -> None:
+        """
+            Args:
+                host: Address to listen on
+                port: Port to listen on, 0 for any free port
+
+            Returns:
+                None
+
+            Concept:
+                Local metrics endpoint: a daemon thread serves the latest snapshot as JSON on GET /metrics.
+        """
+
+        self.latest = {}
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(sink.latest).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def emit(self, snapshot: dict) -> None:
+        self.latest = snapshot
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+def print_profile(filename: str, count: int = 20) -> None:
+    """
+        Args:
+            filename: Statistics dumped by a profile window
+            count: Number of functions to print
+
+        Returns:
+            None
+
+        Concept:
+            Prints the functions with the highest cumulative time.
+    """
+
+    pstats.Stats(filename).sort_stats("cumulative").print_stats(count)
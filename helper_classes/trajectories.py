@@ -0,0 +1,388 @@
+import os
+import numpy as np
+from helper_classes.encoding import NUM_ACTIONS
+from helper_classes.q_tables import ArrayQTable
+
+# Columns of a transition: name -> fixed-width dtype
+COLUMNS = {
+    "state": np.int32,
+    "action": np.int8,
+    "reward": np.float32,
+    "next_state": np.int32,
+    "next_legal": np.uint16,
+    "done": np.bool_,
+    "player": np.int8,
+}
+
+ACTION_BITS = 1 << np.arange(NUM_ACTIONS)
+
+def allocate_columns(size: int) -> dict:
+    """
+        Args:
+            size: Number of transitions
+
+        Returns:
+            One zeroed array per column
+
+        Concept:
+            Transitions are stored column by column, so every field is one contiguous fixed-width array.
+    """
+
+    return {name: np.zeros(size, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+def legal_mask(actions: list) -> int:
+    """
+        Args:
+            actions: Action ids
+
+        Returns:
+            9-bit mask with the bit of every action set
+    """
+
+    mask = 0
+    for action in actions:
+        mask |= 1 << action
+    return mask
+
+class TrajectoryWriter:
+    def __init__(self, directory: str, shard_size: int = 65536) -> None:
+        """
+            Args:
+                directory: Folder the shards are written to
+                shard_size: Transitions per shard
+
+            Returns:
+                None
+
+            Concept:
+                Appends transitions to preallocated columns and writes them as one .npz shard (one array per column)
+                whenever shard_size transitions are collected. Shards are numbered on from the ones already in the folder.
+        """
+
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        self.shard = len(shard_files(directory))
+        self.columns = allocate_columns(shard_size)
+        self.size = 0
+
+    def record(self, player: int, state: int, action: int, reward: float, next_state: int, next_actions: list, done: bool) -> None:
+        """
+            Args:
+                player: Player whose q_table the transition updates
+                state: State id
+                action: Action id
+                reward: Reward of the update
+                next_state: State id after the move
+                next_actions: Available actions after the move
+                done: Whether the move ended the game
+
+            Returns:
+                None
+
+            Concept:
+                Stores one transition, writing the shard once it is full.
+        """
+
+        i = self.size
+        columns = self.columns
+        columns["state"][i] = state
+        columns["action"][i] = action
+        columns["reward"][i] = reward
+        columns["next_state"][i] = next_state
+        columns["next_legal"][i] = legal_mask(next_actions)
+        columns["done"][i] = done
+        columns["player"][i] = player
+        self.size += 1
+
+        if self.size == self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Writes the collected transitions as the next shard, through a temporary file so readers never see a partial shard.
+        """
+
+        if self.size == 0:
+            return
+
+        filename = os.path.join(self.directory, f"shard_{self.shard:06d}.npz")
+        temporary = filename + ".tmp.npz"
+        np.savez(temporary, **{name: column[:self.size] for name, column in self.columns.items()})
+        os.replace(temporary, filename)
+
+        self.shard += 1
+        self.size = 0
+
+    def close(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Writes the last, partial shard.
+        """
+
+        self.flush()
+
+def shard_files(directory: str) -> list:
+    """
+        Args:
+            directory: Folder of the shards
+
+        Returns:
+            Paths of the shards, oldest first
+    """
+
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.startswith("shard_") and name.endswith(".npz") and ".tmp" not in name]
+
+def read_shards(directory: str):
+    """
+        Args:
+            directory: Folder of the shards
+
+        Returns:
+            Generator of the columns of every shard
+
+        Concept:
+            Loads one shard at a time, so the folder may hold more transitions than fit in memory.
+    """
+
+    for filename in shard_files(directory):
+        with np.load(filename) as data:
+            yield {name: data[name] for name in COLUMNS}
+
+class ReplayBuffer:
+    def __init__(self, capacity: int) -> None:
+        """
+            Args:
+                capacity: Largest number of transitions kept
+
+            Returns:
+                None
+
+            Concept:
+                Ring buffer over the same columns as the shards: once full, every new transition overwrites the oldest one.
+        """
+
+        self.capacity = capacity
+        self.columns = allocate_columns(capacity)
+        self.position = 0
+        self.size = 0
+
+    def record(self, player: int, state: int, action: int, reward: float, next_state: int, next_actions: list, done: bool) -> None:
+        """
+            Args:
+                player: Player whose q_table the transition updates
+                state: State id
+                action: Action id
+                reward: Reward of the update
+                next_state: State id after the move
+                next_actions: Available actions after the move
+                done: Whether the move ended the game
+
+            Returns:
+                None
+
+            Concept:
+                Same interface as TrajectoryWriter.record, so self-play can feed either.
+        """
+
+        i = self.position
+        columns = self.columns
+        columns["state"][i] = state
+        columns["action"][i] = action
+        columns["reward"][i] = reward
+        columns["next_state"][i] = next_state
+        columns["next_legal"][i] = legal_mask(next_actions)
+        columns["done"][i] = done
+        columns["player"][i] = player
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, columns: dict) -> None:
+        """
+            Args:
+                columns: Transitions column by column, e.g. a shard from read_shards
+
+            Returns:
+                None
+
+            Concept:
+                Copies the transitions into the ring in at most two slices.
+        """
+
+        count = len(columns["state"])
+        if count >= self.capacity:
+            columns = {name: column[-self.capacity:] for name, column in columns.items()}
+            count = self.capacity
+
+        first = min(count, self.capacity - self.position)
+        for name, column in columns.items():
+            self.columns[name][self.position:self.position + first] = column[:first]
+            self.columns[name][:count - first] = column[first:count]
+
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def get_state(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                Copy of the filled part of the ring with its write position, for checkpoints
+
+            Concept:
+                The ring is copied as laid out in memory, so a restored buffer samples the same transitions for the same indices.
+        """
+
+        return {
+            "capacity": self.capacity,
+            "position": self.position,
+            "size": self.size,
+            "columns": {name: column[:self.size].copy() for name, column in self.columns.items()},
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+            Args:
+                state: Buffer state from get_state
+
+            Returns:
+                None
+
+            Concept:
+                Restores the ring exactly; the capacity has to match the one it was saved with.
+        """
+
+        if state["capacity"] != self.capacity:
+            raise ValueError(f"Replay buffer was saved with capacity {state['capacity']}, not {self.capacity}")
+        for name, column in state["columns"].items():
+            self.columns[name][:len(column)] = column
+        self.position = state["position"]
+        self.size = state["size"]
+
+    def sample(self, batch_size: int, rng: np.random.Generator) -> dict:
+        """
+            Args:
+                batch_size: Number of transitions
+                rng: Random generator
+
+            Returns:
+                Uniformly sampled transitions (with replacement), column by column
+        """
+
+        indices = rng.integers(0, self.size, batch_size)
+        return {name: column[indices] for name, column in self.columns.items()}
+
+class RecorderGroup:
+    def __init__(self, *recorders) -> None:
+        """
+            Args:
+                recorders: TrajectoryWriter and/or ReplayBuffer instances
+
+            Returns:
+                None
+
+            Concept:
+                Forwards every transition to all recorders, e.g. to write shards and fill a replay buffer at once.
+        """
+
+        self.recorders = recorders
+
+    def record(self, *transition) -> None:
+        for recorder in self.recorders:
+            recorder.record(*transition)
+
+def replay_td(q_table: ArrayQTable, columns: dict, alpha: float, gamma: float) -> float:
+    """
+        Args:
+            q_table: Array q_table to update
+            columns: Transitions of this q_table's player, column by column
+            alpha: The learning rate
+            gamma: The discount factor
+
+        Returns:
+            Mean absolute TD error of the batch
+
+        Concept:
+            One vectorized TD update over the whole batch, with the same target as QLearningAgent.update_q_table:
+            reward + gamma * max q over the recorded legal next actions (0 if there are none). All targets are computed from the values
+            before the batch. Transitions that hit the same entry are averaged (bincount over the flat cell index), so an entry that occurs
+            many times in a batch still moves one step of size alpha, towards the mean target. The updated keys are recorded in changed, so
+            drain_changes (and with it delta checkpoints) sees them.
+    """
+
+    values = q_table.values
+    rows = q_table.rows[columns["state"]]
+    next_rows = q_table.rows[columns["next_state"]]
+    actions = columns["action"].astype(np.intp)
+
+    legal = (columns["next_legal"][:, None].astype(np.int64) & ACTION_BITS) != 0
+    next_q = np.where(legal, values[next_rows], -np.inf).max(axis=1)
+    next_q[~legal.any(axis=1)] = 0
+
+    errors = columns["reward"] + gamma * next_q - values[rows, actions]
+    cells = rows.astype(np.intp) * NUM_ACTIONS + actions
+    sums = np.bincount(cells, weights=errors, minlength=values.size)
+    counts = np.bincount(cells, minlength=values.size)
+    hit = np.flatnonzero(counts)
+    values.reshape(-1)[hit] += (alpha * sums[hit] / counts[hit]).astype(values.dtype)
+    q_table.visited.reshape(-1)[hit] = True
+    hit_rows, hit_actions = np.divmod(hit, NUM_ACTIONS)
+    q_table.changed.update(zip(q_table.states[hit_rows].tolist(), hit_actions.tolist()))
+
+    return float(np.abs(errors).mean()) if len(errors) else 0.0
+
+def train_offline(directory: str, q_table1: ArrayQTable, q_table2: ArrayQTable, alpha: float, gamma: float, sweeps: int = 1, batch_size: int = 4096, seed: int = None) -> list:
+    """
+        Args:
+            directory: Folder of the shards
+            q_table1: Array q_table of player 1 (X)
+            q_table2: Array q_table of player 2 (O)
+            alpha: The learning rate
+            gamma: The discount factor
+            sweeps: Number of passes over all shards
+            batch_size: Transitions per vectorized update
+            seed: Seed of the shuffling
+
+        Returns:
+            Mean absolute TD error of every sweep
+
+        Concept:
+            Replays the recorded transitions without playing any games. Every sweep visits the shards in order and each shard in shuffled
+            mini-batches; the transitions of a batch are split by player and applied with replay_td.
+    """
+
+    rng = np.random.default_rng(seed)
+    tables = {1: q_table1, -1: q_table2}
+    history = []
+    for _ in range(sweeps):
+        total_error = 0.0
+        count = 0
+        for columns in read_shards(directory):
+            order = rng.permutation(len(columns["state"]))
+            for start in range(0, len(order), batch_size):
+                batch = {name: column[order[start:start + batch_size]] for name, column in columns.items()}
+                for player, q_table in tables.items():
+                    mine = batch["player"] == player
+                    if mine.any():
+                        total_error += replay_td(q_table, {name: column[mine] for name, column in batch.items()}, alpha, gamma) * np.count_nonzero(mine)
+                        count += np.count_nonzero(mine)
+        history.append(total_error / max(count, 1))
+
+    return history
@@ -0,0 +1,36 @@
+import sys
+from helper_classes.encoding import decode_state
+from helper_classes.decision_log import read_records
+
+def render_actions(log_filename: str, output_filename: str) -> None:
+    """
+        Args:
+            log_filename: JSON Lines decision log written by test_model.py
+            output_filename: Text file to write
+
+        Returns:
+            None
+
+        Concept:
+            Renders the decision records in the human-readable actions_taken.txt format: the board, the q value of every available action and the chosen q value per move.
+    """
+
+    with open(output_filename, 'w') as f:
+        for record in read_records(log_filename):
+            if record["type"] == "game_start":
+                f.write("Game Start: \n")
+            elif record["type"] == "game_end":
+                f.write(f"Game End: {record['result']}\n\n\n")
+            elif record["type"] == "decision":
+                f.write(f"\nGame State: \n{decode_state(record['state'])}\n")
+                f.write("Available Actions: \n")
+                for q_value in record["q"]:
+                    f.write(f"\t{q_value}\n")
+                f.write(f"Chosen Action: \n\t{max(record['q'])}\n")
+
+if __name__ == "__main__":
+    # python render_actions.py [decision log] [output file]
+    log_filename = sys.argv[1] if len(sys.argv) > 1 else "output_files/decisions.jsonl"
+    output_filename = sys.argv[2] if len(sys.argv) > 2 else "output_files/actions_taken.txt"
+
+    render_actions(log_filename, output_filename)
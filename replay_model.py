@@ -0,0 +1,34 @@
+import time
+import argparse
+from helper_classes.q_learner import QLearningAgent
+from helper_classes.trajectories import train_offline
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the agents offline by replaying recorded self-play transitions.")
+    parser.add_argument("--trajectories", default="trajectories", help="Folder of the shards written by train_model.py")
+    parser.add_argument("--agent1", default="", help="Q-table to start player 1 from, empty for a fresh table")
+    parser.add_argument("--agent2", default="", help="Q-table to start player 2 from, empty for a fresh table")
+    parser.add_argument("--output1", default="agents/agent1_q_table_replay.pkl")
+    parser.add_argument("--output2", default="agents/agent2_q_table_replay.pkl")
+    parser.add_argument("--sweeps", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--alpha", type=float, default=0.07)
+    parser.add_argument("--gamma", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    agent1 = QLearningAgent(player=1, alpha=args.alpha, gamma=args.gamma, backend="array")
+    agent2 = QLearningAgent(player=-1, alpha=args.alpha, gamma=args.gamma, backend="array")
+    if args.agent1:
+        agent1.load_model(args.agent1)
+    if args.agent2:
+        agent2.load_model(args.agent2)
+
+    start = time.perf_counter()
+    history = train_offline(args.trajectories, agent1.q_table, agent2.q_table, args.alpha, args.gamma, args.sweeps, args.batch_size, args.seed)
+    for sweep, error in enumerate(history):
+        print(f"Sweep {sweep + 1}/{args.sweeps}: mean |TD error| {error:.5f}")
+    print(f"{args.sweeps} sweeps in {time.perf_counter() - start:.2f} s")
+
+    agent1.save_model(args.output1)
+    agent2.save_model(args.output2)
@@ -0,0 +1,289 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+import numpy as np
+from collections import deque
+from helper_classes.inference import BatchPolicy
+
+class InferenceServer:
+    def __init__(self, policy: BatchPolicy, max_batch: int = 256, max_wait: float = 0.0, window: int = 100000) -> None:
+        """
+            Args:
+                policy: Batched policy answering the requests
+                max_batch: Largest number of requests answered by one lookup
+                max_wait: Extra seconds to wait for more requests once the queue is drained
+                window: Number of recent request latencies kept for the statistics
+
+            Returns:
+                None
+
+            Concept:
+                Asyncio server speaking newline-delimited JSON over TCP. Requests of all connections go into one queue, and a batcher
+                task coalesces them into micro-batches for a single vectorized lookup.
+                Request:  {"id": any, "board": [9 cells, 0 empty, 1 X, -1 O]}    Response: {"id": any, "action": cell, "q": value}
+                Request:  {"stats": true}                                        Response: {"requests", "batches", "qps", "p50_ms", "p99_ms"}
+        """
+
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = None
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    async def batcher(self) -> None:
+        """
+            Args:
+                None
+
+            Returns:
+                None
+
+            Concept:
+                Waits for a request, takes every request already queued, waits up to max_wait for more (no waiting by default),
+                answers the batch and repeats.
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # Let the other connections run once so every request that is already in flight joins this batch
+            await asyncio.sleep(0)
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            actions, q_values, valid = self.policy.choose(np.array([board for board, _, _ in batch]))
+            now = time.perf_counter()
+            for (_, future, received), action, q, ok in zip(batch, actions.tolist(), q_values.tolist(), valid.tolist()):
+                if not future.done():
+                    future.set_result((action, q) if ok else None)
+                self.latencies.append(now - received)
+
+            self.requests += len(batch)
+            self.batches += 1
+
+    async def choose(self, board: list):
+        """
+            Args:
+                board: 9 cells of the board
+
+            Returns:
+                (action, q value), or None for an invalid board
+
+            Concept:
+                Queues the board for the next micro-batch and waits for its answer.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((board, future, time.perf_counter()))
+        return await future
+
+    def stats(self) -> dict:
+        """
+            Args:
+                None
+
+            Returns:
+                Request and batch counts, queries per second and p50/p99 latency in milliseconds
+
+            Concept:
+                Latencies are measured from the moment a request is queued until its batch is answered.
+        """
+
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "qps": self.requests / (time.perf_counter() - self.started),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+            Args:
+                reader: Stream of the connection
+                writer: Stream of the connection
+
+            Returns:
+                None
+
+            Concept:
+                Answers the requests of one connection in order. Requests on a connection may be pipelined.
+        """
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                    if request.get("stats"):
+                        response = self.stats()
+                    else:
+                        board = request["board"]
+                        if len(board) != 9 or any(cell not in (0, 1, -1) for cell in board):
+                            raise ValueError("board must have 9 cells of 0, 1 or -1")
+                        result = await self.choose(board)
+                        response = {"id": request.get("id"), "action": result[0], "q": result[1]} if result else {"id": request.get("id"), "error": "invalid board"}
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"error": str(error)}
+
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: asyncio.Event = None) -> None:
+        """
+            Args:
+                host: Address to listen on
+                port: Port to listen on, 0 for any free port
+                ready: Event set once the server listens; self.port then holds the port
+
+            Returns:
+                None
+
+            Concept:
+                Starts the batcher task and serves connections until cancelled.
+        """
+
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self.batcher())
+        server = await asyncio.start_server(self.handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+async def query(host: str, port: int, requests: list) -> list:
+    """
+        Args:
+            host: Address of the server
+            port: Port of the server
+            requests: Requests to send, each any JSON value, e.g. {"id": 1, "board": [9 cells]} or {"stats": true}
+
+        Returns:
+            The response of every request
+
+        Concept:
+            Local client: opens one connection and sends the requests one after another, one JSON line each.
+    """
+
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+async def play_games(host: str, port: int, games: int, latencies: list) -> None:
+    """
+        Args:
+            host: Address of the server
+            port: Port of the server
+            games: Number of games to play
+            latencies: List the round-trip time of every request is appended to
+
+        Returns:
+            None
+
+        Concept:
+            Load-generating client: the server plays both sides of games against itself, with a random move mixed in now and then.
+    """
+
+    reader, writer = await asyncio.open_connection(host, port)
+    for _ in range(games):
+        board = [0] * 9
+        player = 1
+        for _ in range(9):
+            start = time.perf_counter()
+            writer.write(json.dumps({"board": board}).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+
+            empty = [cell for cell in range(9) if board[cell] == 0]
+            action = response["action"] if "action" in response and random.random() > 0.2 else random.choice(empty)
+            board[action] = player
+            player = -player
+            if not any(cell == 0 for cell in board) or "error" in response:
+                break
+
+    writer.close()
+    await writer.wait_closed()
+
+async def benchmark(policy: BatchPolicy, clients: int, games: int) -> None:
+    """
+        Args:
+            policy: Batched policy to serve
+            clients: Number of concurrent client connections
+            games: Games played by every client
+
+        Returns:
+            None
+
+        Concept:
+            Starts the server on a free local port, runs the clients concurrently and prints client-side and server-side statistics.
+    """
+
+    server = InferenceServer(policy)
+    ready = asyncio.Event()
+    server_task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+    await ready.wait()
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(play_games("127.0.0.1", server.port, games, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(f"clients: {clients}, requests: {len(latencies)}, {len(latencies) / elapsed:,.0f} queries/s")
+    print(f"round trip p50: {np.percentile(latencies, 50):.2f} ms, p99: {np.percentile(latencies, 99):.2f} ms")
+    stats = server.stats()
+    print(f"server: {stats['batches']} batches, {stats['requests'] / max(stats['batches'], 1):.1f} requests/batch, queue-to-answer p50: {stats['p50_ms']:.2f} ms, p99: {stats['p99_ms']:.2f} ms")
+
+    server_task.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the trained agents over TCP with micro-batched inference.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--agent1", default="agents/agent1_q_table.qtb")
+    parser.add_argument("--agent2", default="agents/agent2_q_table.qtb")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=0.0)
+    parser.add_argument("--bench", action="store_true", help="Run a local load test instead of serving")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--games", type=int, default=50)
+    args = parser.parse_args()
+
+    policy = BatchPolicy(args.agent1, args.agent2)
+    if args.bench:
+        asyncio.run(benchmark(policy, args.clients, args.games))
+    else:
+        print(f"Serving on {args.host}:{args.port}")
+        asyncio.run(InferenceServer(policy, args.max_batch, args.max_wait_ms / 1000).serve(args.host, args.port))
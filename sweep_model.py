@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import random
+import signal
+import sqlite3
+import hashlib
+import argparse
+import itertools
+import contextlib
+import multiprocessing
+import numpy as np
+from evaluate_model import play_matchup
+from helper_classes.solver import load_or_solve, score_policy
+from train_model import train
+
+GRID = {
+    "epsilon": [0.1, 0.25, 0.4],
+    "alpha": [0.03, 0.07, 0.15],
+    "gamma": [0.8, 0.9, 0.95],
+    "episodes": [20000],
+}
+
+# name: (low, high, log scale) of the random search
+RANGES = {
+    "epsilon": (0.05, 0.5, False),
+    "alpha": (0.01, 0.3, True),
+    "gamma": (0.6, 0.99, False),
+    "episodes": (5000, 50000, True),
+}
+
+COLUMNS = {
+    "run_id": "TEXT PRIMARY KEY",
+    "epsilon": "REAL",
+    "alpha": "REAL",
+    "gamma": "REAL",
+    "episodes": "INTEGER",
+    "seed": "INTEGER",
+    "status": "TEXT",
+    "score": "REAL",
+    "agreement1": "REAL",
+    "agreement2": "REAL",
+    "win_vs_random1": "REAL",
+    "win_vs_random2": "REAL",
+    "loss_vs_optimal1": "REAL",
+    "loss_vs_optimal2": "REAL",
+    "seconds": "REAL",
+    "finished": "REAL",
+}
+
+def grid_configs(grid: dict, seeds: list) -> list:
+    """
+        Args:
+            grid: Values to try per hyperparameter
+            seeds: Seeds every combination is trained with
+
+        Returns:
+            One config per combination and seed
+
+        Concept:
+            Full cartesian product of the grid.
+    """
+
+    names = list(grid)
+    return [dict(zip(names, values), seed=seed) for values in itertools.product(*(grid[name] for name in names)) for seed in seeds]
+
+def random_configs(ranges: dict, samples: int, seeds: list, search_seed: int) -> list:
+    """
+        Args:
+            ranges: (low, high, log scale) per hyperparameter
+            samples: Number of sampled combinations
+            seeds: Seeds every combination is trained with
+            search_seed: Seed of the sampling, so a rerun samples the same configs and can skip finished ones
+
+        Returns:
+            One config per sample and seed
+
+        Concept:
+            Samples each hyperparameter uniformly, or log-uniformly for ranges over orders of magnitude. Values are rounded so the
+            configs stay readable.
+    """
+
+    rng = random.Random(search_seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for name, (low, high, log_scale) in ranges.items():
+            value = np.exp(rng.uniform(np.log(low), np.log(high))) if log_scale else rng.uniform(low, high)
+            config[name] = int(round(value, -3)) if name == "episodes" else round(float(value), 4)
+        configs.extend(dict(config, seed=seed) for seed in seeds)
+
+    return configs
+
+def run_id(config: dict) -> str:
+    """
+        Args:
+            config: Hyperparameters and seed of a run
+
+        Returns:
+            Stable id of the run
+
+        Concept:
+            Hash of the config and the evaluation settings, used to skip finished runs.
+    """
+
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+def limit_resources(memory_mb: int, cpu_seconds: int) -> None:
+    """
+        Args:
+            memory_mb: Address space limit of the worker, 0 for no limit
+            cpu_seconds: CPU time limit of the worker, 0 for no limit
+
+        Returns:
+            None
+
+        Concept:
+            Pool initializer. A run that exceeds the limits fails with MemoryError or TimeoutError instead of starving the machine.
+            Not available on Windows, where the limits are skipped.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return
+    if memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, memory_mb * 1024 * 1024))
+    if cpu_seconds:
+        # The soft limit raises TimeoutError in the run, so the pool gets a result instead of losing a killed worker
+        signal.signal(signal.SIGXCPU, cpu_limit_exceeded)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+
+def cpu_limit_exceeded(signum, frame) -> None:
+    raise TimeoutError("CPU time limit exceeded")
+
+def run_config(config: dict, games: int) -> dict:
+    """
+        Args:
+            config: Hyperparameters and seed of the run
+            games: Evaluation games per matchup
+
+        Returns:
+            The config with the status and scores of the run
+
+        Concept:
+            Trains headless with the array backend without saving, then scores the agents:
+            share of positions where the greedy moves are optimal (the score is the mean over both agents),
+            win rate against a random player and loss rate against the solver.
+    """
+
+    result = dict(config, run_id=run_id(dict(config, games=games)))
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            agent1, agent2 = train(config["episodes"], config["epsilon"], config["alpha"], config["gamma"], headless=True, backend="array", seed=config["seed"], save=False)
+
+        states, _, optimal = load_or_solve()
+        tables = (agent1.q_table, agent2.q_table)
+        result["agreement1"] = score_policy(agent1.q_table.values, states, optimal, 1)
+        result["agreement2"] = score_policy(agent2.q_table.values, states, optimal, -1)
+        result["score"] = (result["agreement1"] + result["agreement2"]) / 2
+
+        x_wins, o_wins, _ = play_matchup("agent1 vs random", tables, games, 1024, config["seed"])
+        result["win_vs_random1"] = x_wins / games
+        x_wins, o_wins, _ = play_matchup("random vs agent2", tables, games, 1024, config["seed"])
+        result["win_vs_random2"] = o_wins / games
+        x_wins, o_wins, _ = play_matchup("agent1 vs optimal", tables, games, 1024, config["seed"])
+        result["loss_vs_optimal1"] = o_wins / games
+        x_wins, o_wins, _ = play_matchup("optimal vs agent2", tables, games, 1024, config["seed"])
+        result["loss_vs_optimal2"] = x_wins / games
+        result["status"] = "ok"
+    except (MemoryError, TimeoutError, ValueError, KeyError) as error:
+        result["status"] = f"error: {type(error).__name__}: {error}"
+
+    result["seconds"] = time.perf_counter() - start
+    result["finished"] = time.time()
+    return result
+
+def run_config_star(args: tuple) -> dict:
+    return run_config(*args)
+
+def open_results(filename: str) -> sqlite3.Connection:
+    """
+        Args:
+            filename: SQLite database of the results
+
+        Returns:
+            Connection with the runs table created
+
+        Concept:
+            One row per run, keyed by run id.
+    """
+
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    connection = sqlite3.connect(filename)
+    connection.execute(f"CREATE TABLE IF NOT EXISTS runs ({', '.join(f'{name} {kind}' for name, kind in COLUMNS.items())})")
+    return connection
+
+def sweep(configs: list, games: int = 2000, workers: int = 1, results_file: str = "sweeps/results.sqlite", memory_mb: int = 1024, cpu_seconds: int = 0) -> list:
+    """
+        Args:
+            configs: Configs from grid_configs or random_configs
+            games: Evaluation games per matchup
+            workers: Number of worker processes
+            results_file: SQLite database of the results
+            memory_mb: Address space limit per worker, 0 for no limit
+            cpu_seconds: CPU time limit per worker, 0 for no limit
+
+        Returns:
+            Results of the runs played in this call
+
+        Concept:
+            Skips configs with a finished ("ok") row in the database and schedules the rest on a process pool. Every worker runs
+            one config and is then replaced (maxtasksperchild=1), so memory does not build up across runs. Results are written by
+            the parent as they arrive, so an interrupted sweep keeps its finished runs.
+    """
+
+    connection = open_results(results_file)
+    finished = {row[0] for row in connection.execute("SELECT run_id FROM runs WHERE status = 'ok'")}
+    pending = [config for config in configs if run_id(dict(config, games=games)) not in finished]
+    print(f"{len(configs) - len(pending)} of {len(configs)} runs already finished, {len(pending)} to run")
+
+    results = []
+    with multiprocessing.Pool(workers, initializer=limit_resources, initargs=(memory_mb, cpu_seconds), maxtasksperchild=1) as pool:
+        for result in pool.imap_unordered(run_config_star, [(config, games) for config in pending]):
+            connection.execute(f"INSERT OR REPLACE INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                               [result.get(name) for name in COLUMNS])
+            connection.commit()
+            results.append(result)
+            print(f"[{len(results)}/{len(pending)}] epsilon={result['epsilon']} alpha={result['alpha']} gamma={result['gamma']} "
+                  f"episodes={result['episodes']} seed={result['seed']}: {result['status']}, score {result.get('score') or 0:.3f}, {result['seconds']:.1f} s")
+
+    connection.close()
+    return results
+
+def best_runs(results_file: str, count: int = 10) -> list:
+    """
+        Args:
+            results_file: SQLite database of the results
+            count: Number of runs
+
+        Returns:
+            Rows of the best finished runs, highest score first
+    """
+
+    connection = open_results(results_file)
+    rows = connection.execute(f"SELECT epsilon, alpha, gamma, episodes, seed, score, win_vs_random1, win_vs_random2, loss_vs_optimal1, loss_vs_optimal2 "
+                              f"FROM runs WHERE status = 'ok' ORDER BY score DESC LIMIT ?", (count,)).fetchall()
+    connection.close()
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep epsilon, alpha, gamma and episodes with headless training runs.")
+    parser.add_argument("--random", type=int, default=0, help="Number of random samples, 0 for the grid")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--search-seed", type=int, default=0)
+    parser.add_argument("--games", type=int, default=2000, help="Evaluation games per matchup")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--memory-mb", type=int, default=1024, help="Address space limit per run, 0 for no limit")
+    parser.add_argument("--cpu-seconds", type=int, default=0, help="CPU time limit per run, 0 for no limit")
+    parser.add_argument("--results", default="sweeps/results.sqlite")
+    args = parser.parse_args()
+
+    load_or_solve()  # Solve once before the workers start, they read the cache
+    configs = random_configs(RANGES, args.random, args.seeds, args.search_seed) if args.random else grid_configs(GRID, args.seeds)
+    start = time.perf_counter()
+    sweep(configs, args.games, args.workers, args.results, args.memory_mb, args.cpu_seconds)
+    print(f"Sweep took {time.perf_counter() - start:.1f} s")
+
+    print("Best runs (score = share of positions with optimal greedy moves):")
+    for epsilon, alpha, gamma, episodes, seed, score, win1, win2, loss1, loss2 in best_runs(args.results):
+        print(f"  epsilon={epsilon} alpha={alpha} gamma={gamma} episodes={episodes} seed={seed}: score {score:.3f}, "
+              f"wins vs random {win1:.1%}/{win2:.1%}, losses vs optimal {loss1:.1%}/{loss2:.1%}")
@@ -1,17 +1,28 @@
+import os
 import numpy as np
-import pygame
 import pickle
 import random
-from collections import defaultdict
+import threading
 import time
+from helper_classes.encoding import encode_board, is_legacy_q_table, convert_legacy_q_table
+from helper_classes.decision_log import DecisionLogger
+from helper_classes.model_format import load_binary, binary_source, fingerprint
+from helper_classes.policy import GreedyPolicy
+
+# Imported by TicTacToe.init_pygame, so the game logic and the agents load without pygame
+pygame = None
 
 class TicTacToe:
-    def __init__(self) -> None:
+    def __init__(self, headless: bool = False) -> None:
         self.board = np.zeros((3, 3), dtype=int)
         self.current_player = 1
-        self.init_pygame()
+        self.headless = headless
+        if not headless:
+            self.init_pygame()
 
     def init_pygame(self) -> None:
+        global pygame
+        import pygame
         pygame.init()
         self.screen = pygame.display.set_mode((300, 300))
         pygame.display.set_caption("Tic-Tac-Toe Testing")
@@ -26,11 +37,11 @@ class TicTacToe:
         return self.board
 
     def available_actions(self) -> list:
-        return list(zip(*np.where(self.board == 0)))
+        return np.flatnonzero(self.board == 0).tolist()
 
     def make_move(self, action) -> bool:
-        if self.board[action] == 0:
-            self.board[action] = self.current_player
+        if self.board.flat[action] == 0:
+            self.board.flat[action] = self.current_player
             done, winner = self.check_winner()
             self.render()
             self.current_player = -self.current_player
@@ -55,6 +66,8 @@ class TicTacToe:
         return False, None
 
     def render(self) -> None:
+        if self.headless:
+            return
         self.screen.fill((255, 255, 255))
         for row in range(3):
             for col in range(3):
@@ -71,44 +84,115 @@ class TicTacToe:
         pygame.display.flip()
 
     def close_pygame(self) -> None:
-        pygame.quit()
+        if not self.headless:
+            pygame.quit()
 
 class QLearningAgent:
-    def __init__(self, player: int, q_table: dict) -> None:
+    def __init__(self, player: int, q_table, logger: DecisionLogger = None, policy: GreedyPolicy = None) -> None:
         self.q_table = q_table
         self.player = player
-        self.actions_taken = ""
+        self.logger = logger
+        self.policy = policy
     
-    def get_state(self, board: np.ndarray) -> tuple:
-        return tuple(map(tuple, board))
+    def get_state(self, board: np.ndarray) -> int:
+        return encode_board(board)
     
-    def choose_action(self, board: np.ndarray, available_actions: list) -> tuple:
-        q_values = [self.q_table[(self.get_state(board), action)] for action in available_actions]
-        max_q = max(q_values)
-        chosen_action = random.choice([a for a, q in zip(available_actions, q_values) if q == max_q])
+    def choose_action(self, board: np.ndarray, available_actions: list) -> int:
+        state = self.get_state(board)
+        if self.policy is not None:
+            # The compiled policy picks the move with one index; the q values below are only read for the log and the printout
+            chosen_action = self.policy.choose(state)
+            max_q = self.policy.best_q(state)
+            q_values = self.q_table.q_values(state, available_actions)
+        else:
+            q_values = self.q_table.q_values(state, available_actions)
+            max_q = max(q_values)
+            chosen_action = random.choice([a for a, q in zip(available_actions, q_values) if q == max_q])
         
-        self.actions_taken += f"""\nGame State: \n{board}\n"""
-        self.actions_taken += f"""Available Actions: \n"""
-        for q_value in q_values:
-            self.actions_taken += f"\t{q_value}\n"
-        self.actions_taken += f"""Chosen Action: \n\t{max_q}\n"""
+        if self.logger is not None:
+            self.logger.log_decision(self.player, state, available_actions, q_values, chosen_action)
         
         print(f"\nPlayer {1 if self.player == 1 else 2} Q-values: {q_values}")
         print(f"\nPlayer {1 if self.player == 1 else 2} chooses action: {chosen_action} \nwith Q-value: {max_q}\n")
         
         return chosen_action
+
+class BinaryQTable:
+    def __init__(self, filename: str) -> None:
+        # Read-only memory map of a .qtb file: only the header is read now, the pages of the visited states when they are played
+        states, values, _ = load_binary(filename)
+        # Plain ndarray views of the same mapping, indexing an np.memmap goes through its subclass hooks
+        self.states, self.values = np.asarray(states), np.asarray(values)
+    
+    def q_values(self, state: int, actions: list) -> list:
+        row = int(np.searchsorted(self.states, state))
+        if row == len(self.states) or self.states[row] != state:
+            return [0] * len(actions)
+        values = self.values[row].tolist()
+        return [values[action] for action in actions]
+
+class PickledQTable:
+    def __init__(self, filename: str) -> None:
+        with open(filename, 'rb') as f:
+            self.table = pickle.load(f)
+        
+        if is_legacy_q_table(self.table):
+            self.table = convert_legacy_q_table(self.table)
     
-    def save_actions_taken(self, filename: str) -> None:
-        with open(filename, 'w') as f:
-            f.write(str(self.actions_taken))
+    def q_values(self, state: int, actions: list) -> list:
+        return [self.table.get((state, action), 0) for action in actions]
+
+def load_q_table(filename: str):
+    return BinaryQTable(filename) if filename.endswith(".qtb") else PickledQTable(filename)
+
+def compiled_policy(model_file: str) -> str:
+    # Policy written by convert_agents.py --policy, ModelLoader only uses it if it was validated against model_file
+    policy_file = os.path.splitext(model_file)[0] + ".qtp"
+    return policy_file if os.path.exists(policy_file) else None
+
+def select_model(prefix: str) -> str:
+    # The memory-mapped .qtb is used whenever it was converted from the .pkl as it is now; a .pkl retrained since then wins
+    binary, pickled = prefix + ".qtb", prefix + ".pkl"
+    if os.path.exists(binary) and (not os.path.exists(pickled) or binary_source(binary) == fingerprint(pickled)):
+        return binary
+    return pickled
 
-def load_q_table(filename: str) -> dict:
-    with open(filename, 'rb') as f:
-        q_table = pickle.load(f)
+class ModelLoader:
+    def __init__(self, filenames: dict, policy_files: dict = None) -> None:
+        # Loads the q_tables of {player: filename}, and the compiled policies of {player: filename or None}, on a background
+        # thread while the window and the prompt come up
+        self.filenames = filenames
+        self.policy_files = policy_files or {}
+        self.q_tables = {}
+        self.policies = {}
+        self.error = None
+        self.thread = threading.Thread(target=self.load, daemon=True)
+        self.thread.start()
     
-    return defaultdict(lambda: 0, q_table)
+    def load(self) -> None:
+        try:
+            for player, filename in self.filenames.items():
+                self.q_tables[player] = load_q_table(filename)
+            for player, filename in self.policy_files.items():
+                policy = GreedyPolicy.load(filename) if filename else None
+                # A model saved after the policy was compiled has a different fingerprint, its moves come from the q_table
+                self.policies[player] = policy if policy is not None and policy.matches(self.filenames[player]) else None
+        except Exception as error:
+            self.error = error
+    
+    def get(self, player: int):
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.q_tables[player]
+    
+    def get_policy(self, player: int) -> GreedyPolicy:
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.policies.get(player)
 
-def user_move(available_actions: list) -> tuple:
+def user_move(available_actions: list) -> int:
     while True:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -117,14 +201,15 @@ def user_move(available_actions: list) -> tuple:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 x, y = event.pos
                 row, col = y // 100, x // 100
-                if (row, col) in available_actions:
-                    return (row, col)
+                if row * 3 + col in available_actions:
+                    return row * 3 + col
 
 def main() -> None:
-    agent1_file = "agents/agent1_q_table.pkl"
-    agent2_file = "agents/agent2_q_table.pkl"
-    actions_taken_file = "output_files/actions_taken.txt"
+    agent1_file = select_model("agents/agent1_q_table") # .qtb (memory-mapped) if it matches the .pkl, else the .pkl
+    agent2_file = select_model("agents/agent2_q_table")
+    decision_log_file = "output_files/decisions.jsonl" # Render with render_actions.py
     
+    loader = ModelLoader({1: agent1_file, -1: agent2_file}, {1: compiled_policy(agent1_file), -1: compiled_policy(agent2_file)})
     env = TicTacToe()
     
     user_player = int(input("Choose player 1 (X) or player 2 (O): "))
@@ -134,35 +219,36 @@ def main() -> None:
         user_player = -1
     
     agent_player = -user_player
-    agent_q_table_file = agent1_file if agent_player == 1 else agent2_file
+    q_table = loader.get(agent_player)
+    logger = DecisionLogger(decision_log_file)
+    agent = QLearningAgent(player=agent_player, q_table=q_table, logger=logger, policy=loader.get_policy(agent_player))
     
-    q_table = load_q_table(agent_q_table_file)
-    agent = QLearningAgent(player=agent_player, q_table=q_table)
-    
-    while True:
-        print("Starting new game...")
-        state = env.reset()
-        done = False
-        agent.actions_taken += "Game Start: \n"
-        
-        while not done:
-            if env.current_player == user_player:
-                available_actions = env.available_actions()
-                action = user_move(available_actions)
-            else:
-                available_actions = env.available_actions()
-                action = agent.choose_action(state, available_actions)
-            
-            print(env.board)
+    try:
+        while True:
+            print("Starting new game...")
+            state = env.reset()
+            done = False
+            logger.log_event("game_start")
             
-            done, game_result = env.make_move(action)
+            while not done:
+                if env.current_player == user_player:
+                    available_actions = env.available_actions()
+                    action = user_move(available_actions)
+                else:
+                    available_actions = env.available_actions()
+                    action = agent.choose_action(state, available_actions)
+                
+                print(env.board)
+                
+                done, game_result = env.make_move(action)
 
-            if done:
-                print()
-                time.sleep(2)
-        
-        agent.actions_taken += f"Game End: {game_result}\n\n\n"
-        agent.save_actions_taken(actions_taken_file)
+                if done:
+                    print()
+                    time.sleep(2)
+            
+            logger.log_event("game_end", result=game_result)
+    finally:
+        logger.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+import os
+import asyncio
+from helper_classes.inference import BatchPolicy
+from serve_model import InferenceServer, query
+
+AGENTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents")
+
+def serve_and_query(requests: list) -> list:
+    # Starts a server on a free local port, sends the requests over one connection and stops the server
+    async def run() -> list:
+        policy = BatchPolicy(os.path.join(AGENTS, "agent1_q_table.qtb"), os.path.join(AGENTS, "agent2_q_table.qtb"), seed=0)
+        server = InferenceServer(policy)
+        ready = asyncio.Event()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        try:
+            return await query("127.0.0.1", server.port, requests)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    return asyncio.run(run())
+
+def test_valid_board_returns_legal_action():
+    boards = [[0] * 9, [1, -1, 0, 0, 1, 0, 0, 0, 0], [1, -1, 1, -1, 1, -1, 0, 0, 0]]
+    responses = serve_and_query([{"id": i, "board": board} for i, board in enumerate(boards)])
+
+    for i, (board, response) in enumerate(zip(boards, responses)):
+        assert response["id"] == i
+        assert board[response["action"]] == 0
+        assert isinstance(response["q"], float)
+
+def test_malformed_requests_return_errors():
+    responses = serve_and_query([{"board": [0] * 8}, {"board": [0, 0, 0, 0, 2, 0, 0, 0, 0]}, {"id": 1}, [1, 2], "hello", {"board": [0] * 9}])
+
+    assert all("error" in response for response in responses[:5])
+    assert "action" in responses[5]
+
+def test_finished_board_is_rejected():
+    won = [1, 1, 1, -1, -1, 0, 0, 0, 0]
+    full = [1, -1, 1, 1, -1, -1, -1, 1, 1]
+    responses = serve_and_query([{"id": 1, "board": won}, {"id": 2, "board": full}])
+
+    assert responses == [{"id": 1, "error": "invalid board"}, {"id": 2, "error": "invalid board"}]
+
+def test_stats_count_queries():
+    responses = serve_and_query([{"board": [0] * 9}] * 3 + [{"stats": True}])
+    stats = responses[-1]
+
+    assert stats["requests"] == 3
+    assert stats["batches"] >= 1
+    assert stats["p50_ms"] <= stats["p99_ms"]
+    assert stats["qps"] > 0
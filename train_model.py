@@ -1,66 +1,538 @@
-import pygame
+import os
+import time
+import random
+import signal
+import argparse
+import threading
+import contextlib
+import multiprocessing
+import numpy as np
+from collections import defaultdict
+from helper_classes.checkpoint import Checkpointer, load_checkpoint
 from helper_classes.environment import TicTacToe
 from helper_classes.q_learner import QLearningAgent
+from helper_classes.q_tables import ArrayQTable, SharedArrayQTable
+from helper_classes.symmetry import SymmetricQTable
+from helper_classes.telemetry import NULL_TELEMETRY, Telemetry, PrintSink, JsonlSink, HttpSink
+from helper_classes.trajectories import TrajectoryWriter, ReplayBuffer, RecorderGroup, replay_td
 
-def train(episodes: int, epsilon: float, alpha: float, gamma: float) -> None:
-    env = TicTacToe()
-    agent1 = QLearningAgent(player=1, epsilon=epsilon, alpha=alpha, gamma=gamma)
-    agent2 = QLearningAgent(player=-1, epsilon=epsilon, alpha=alpha, gamma=gamma)
+def play_episode(env: TicTacToe, agent1: QLearningAgent, agent2: QLearningAgent, recorder=None, telemetry=NULL_TELEMETRY) -> bool:
+    """
+        Args:
+            env: The environment to play in
+            agent1: Agent playing as player 1 (X)
+            agent2: Agent playing as player 2 (O)
+            recorder: Optional TrajectoryWriter or ReplayBuffer that receives every transition used for an update
+            telemetry: Telemetry collecting steps, TD errors and the time spent in the environment, the agents and logging
+        
+        Returns:
+            False if the pygame window was closed during the episode, True otherwise
+        
+        Concept:
+            Plays one self-play episode and updates the q_tables of both agents after every move.
+            State ids come from the environment, which keeps them up to date move by move.
+            The clock is only read when telemetry is enabled.
+    """
     
+    timed = telemetry.enabled
+    state = env.reset()
+    done = False
+    while not done:
+        if timed:
+            t0 = time.perf_counter()
+        player = env.current_player
+        agent = agent1 if player == 1 else agent2
+        actions = env.available_actions()
+        reward, critical_location = env.check_critical(player) # Check critical conditions
+        if timed:
+            t1 = time.perf_counter()
+        
+        state_id = env.state_id()
+        action = agent.choose_action(state, actions, state_id)
+        if timed:
+            t2 = time.perf_counter()
+        
+        """
+            If critical location is given and agent wins, give 2 reward points
+            If critical location is given and agent doesn't mark there and loses, give 2 penalty points
+        """
+        if critical_location is not None:
+            if action == critical_location:
+                reward = 2
+            elif done and reward == -1:
+                reward = -2
+        
+        reward_move, done = env.make_move(action)
+        next_actions = env.available_actions()
+        if timed:
+            t3 = time.perf_counter()
+        
+        next_state_id = env.state_id()
+        error = agent.update_q_table(state_id, action, reward + reward_move, next_state_id, next_actions)
+        # Update Q table for the other agent in case of losing
+        if done and reward != 0:
+            other_agent = agent2 if player == 1 else agent1
+            other_agent.update_q_table(state_id, action, -reward, next_state_id, next_actions)
+        if timed:
+            t4 = time.perf_counter()
+        
+        if recorder is not None:
+            recorder.record(player, state_id, action, reward + reward_move, next_state_id, next_actions, done)
+            if done and reward != 0:
+                recorder.record(-player, state_id, action, -reward, next_state_id, next_actions, done)
+        
+        if not env.poll_events():
+            return False
+        
+        if timed:
+            t5 = time.perf_counter()
+            telemetry.add_time("env", t1 - t0 + t3 - t2)
+            telemetry.add_time("agent", t2 - t1 + t4 - t3)
+            telemetry.add_time("logging", t5 - t4)
+            telemetry.count("steps")
+            telemetry.td_error(error)
+    
+    return True
+
+def train(episodes: int, epsilon: float, alpha: float, gamma: float, headless: bool = False, render_every: int = 1, backend: str = "dict", symmetry: bool = False,
+          checkpoint_dir: str = None, checkpoint_every: int = 10000, checkpoint_seconds: float = 300.0, resume: bool = False, seed: int = None,
+          trajectory_dir: str = None, replay_capacity: int = 0, replay_batch: int = 256, save: bool = True, telemetry=None,
+          size: int = 3, win_length: int = None, capacity: int = 1 << 16, eviction: str = "lru", render_async: bool = False) -> tuple[QLearningAgent, QLearningAgent]:
+    """
+        Args:
+            episodes: Total number of episodes, including those of a resumed run
+            epsilon: The exploration rate
+            alpha: The learning rate
+            gamma: The discount factor
+            headless: Train without pygame
+            render_every: Render every Nth episode when not headless
+            backend: Storage of the q_tables
+            symmetry: Whether the agents use the symmetry layer
+            checkpoint_dir: Folder for periodic checkpoints, None to disable them
+            checkpoint_every: Episodes between checkpoints
+            checkpoint_seconds: Seconds between checkpoints
+            resume: Continue from the last checkpoint in checkpoint_dir
+            seed: Seed of the random module (ignored when resuming)
+            trajectory_dir: Folder the transitions are streamed to as shards, None to not record them (3x3 board only)
+            replay_capacity: Size of the online replay buffer, 0 to disable replay (needs the array backend without symmetry)
+            replay_batch: Transitions replayed after every episode
+            save: Whether to save the q_tables when done
+            telemetry: Telemetry receiving the training metrics, None for no instrumentation
+            size: Number of rows and columns of the board
+            win_length: Marks in a row needed to win, size if None
+            capacity: State slots per q_table of the hashed backend, maximum states per q_table of the bounded backend
+            eviction: Eviction policy of the bounded backend, "lru" or "lfu"
+            render_async: Render on a separate thread that drops frames instead of slowing training (when not headless)
+        
+        Returns:
+            The trained agents
+        
+        Concept:
+            Plays self-play episodes and saves the q_tables when done. With a checkpoint_dir the tables, random state, episode counter,
+            win counts and hyperparameters are checkpointed periodically and when training stops early, so a resumed run continues
+            exactly where the last checkpoint left off, replay buffer and sampler included. On resume the hyperparameters of the checkpoint are used.
+            With a replay buffer, a sampled batch of past transitions is replayed with one vectorized TD update after every episode.
+            Ctrl-C stops training at the end of the current episode and checkpoints there, so resuming after it is exact too; a second
+            Ctrl-C interrupts immediately and keeps the last checkpoint written before it.
+            Progress is reported through the telemetry sinks instead of a print per episode.
+    """
+    
+    telemetry = telemetry or NULL_TELEMETRY
+    start = 0
+    state = None
+    if resume and checkpoint_dir:
+        state, agent1, agent2 = load_checkpoint(checkpoint_dir)
+    
+    if state is not None:
+        start = state["episode"]
+        epsilon, alpha, gamma = state["hyperparameters"]["epsilon"], state["hyperparameters"]["alpha"], state["hyperparameters"]["gamma"]
+        backend, symmetry = state["hyperparameters"]["backend"], state["hyperparameters"]["symmetry"]
+        size, win_length = agent1.size, state["hyperparameters"].get("win_length")
+        capacity, eviction = agent1.capacity, agent1.eviction
+        replay_capacity = state["hyperparameters"].get("replay_capacity", replay_capacity)
+        replay_batch = state["hyperparameters"].get("replay_batch", replay_batch)
+    
+    env = TicTacToe(headless=headless, render_every=render_every, size=size, win_length=win_length, render_async=render_async)
+    if state is not None:
+        random.setstate(state["random_state"])
+        env.player1_wincount, env.player2_wincount, env.draw_count = state["wins"]
+        print(f"Resuming from episode {start}")
+    else:
+        if seed is not None:
+            random.seed(seed)
+        agent1 = QLearningAgent(player=1, epsilon=epsilon, alpha=alpha, gamma=gamma, backend=backend, symmetry=symmetry, size=size, capacity=capacity, eviction=eviction)
+        agent2 = QLearningAgent(player=-1, epsilon=epsilon, alpha=alpha, gamma=gamma, backend=backend, symmetry=symmetry, size=size, capacity=capacity, eviction=eviction)
+    
+    hyperparameters = {"epsilon": epsilon, "alpha": alpha, "gamma": gamma, "backend": backend, "symmetry": symmetry,
+                       "size": size, "win_length": win_length, "capacity": capacity, "eviction": eviction,
+                       "replay_capacity": replay_capacity, "replay_batch": replay_batch}
+    if replay_capacity and (type(agent1.q_table) is not ArrayQTable or type(agent2.q_table) is not ArrayQTable):
+        raise ValueError("Replay needs the array backend without symmetry")
+    if trajectory_dir and size != 3:
+        raise ValueError("Trajectory shards store 3x3 state ids and action masks, record them on the 3x3 board only")
+    
+    writer = TrajectoryWriter(trajectory_dir) if trajectory_dir else None
+    replay = ReplayBuffer(replay_capacity) if replay_capacity else None
+    replay_rng = np.random.default_rng(seed)
+    if replay is not None and state is not None and state.get("replay") is not None:
+        replay.set_state(state["replay"]["buffer"])
+        replay_rng.bit_generator.state = state["replay"]["rng"]
+    recorder = writer or replay
+    if writer is not None and replay is not None:
+        recorder = RecorderGroup(writer, replay)
+    checkpointer = Checkpointer(checkpoint_dir, checkpoint_every, checkpoint_seconds, start_episode=start) if checkpoint_dir else None
+    played = start
+    # False while an episode and its replay batch are half applied; such tables are never checkpointed
+    consistent = True
+    stop_requested = False
+    
+    def request_stop(signum, frame) -> None:
+        # First Ctrl-C: finish the current episode and stop at its end. A second one interrupts at once.
+        nonlocal stop_requested
+        stop_requested = True
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGINT, request_stop)
+    
+    def checkpoint() -> None:
+        wins = (env.player1_wincount, env.player2_wincount, env.draw_count)
+        replay_state = {"buffer": replay.get_state(), "rng": replay_rng.bit_generator.state} if replay is not None else None
+        checkpointer.save(played, agent1, agent2, random.getstate(), wins, hyperparameters, replay_state)
+    
+    telemetry.start(start, (env.player1_wincount, env.player2_wincount, env.draw_count))
     try:
-        for episode in range(episodes):
-            print(f"Episode {episode + 1}/{episodes}")
+        for episode in range(start, episodes):
+            telemetry.episode_start(episode)
+            consistent = False
+            if not play_episode(env, agent1, agent2, recorder, telemetry):
+                return agent1, agent2
+            played = episode + 1
+            
+            if replay is not None and replay.size >= replay_batch:
+                replay_start = time.perf_counter()
+                batch = replay.sample(replay_batch, replay_rng)
+                for agent in (agent1, agent2):
+                    mine = batch["player"] == agent.player
+                    replay_td(agent.q_table, {name: column[mine] for name, column in batch.items()}, agent.alpha, agent.gamma)
+                telemetry.add_time("replay", time.perf_counter() - replay_start)
+            consistent = True
+            
+            if checkpointer is not None and checkpointer.due(played):
+                checkpoint_start = time.perf_counter()
+                checkpoint()
+                telemetry.add_time("logging", time.perf_counter() - checkpoint_start)
             
-            state = env.reset()
-            done = False
-            while not done:
-                # print(env.board)
-                player = env.current_player
-                agent = agent1 if player == 1 else agent2
-                state_tuple = agent.get_state(state)
-                actions = env.available_actions()
-                action = agent.choose_action(state, actions)
-                
-                reward, critical_location = env.check_critical(player) # Check critical conditions
-                
-                """
-                    If critical location is given and agent wins, give 2 reward points
-                    If critical location is given and agent doesn't mark there and loses, give 2 penalty points
-                """
-                if critical_location:
-                    if action == critical_location:
-                        reward = 2
-                    elif done and reward == -1:
-                        reward = -2
-                
-                reward_move, done = env.make_move(action)
-                next_state_tuple = agent.get_state(env.board)
-                next_actions = env.available_actions()
-                agent.update_q_table(state_tuple, action, reward + reward_move, next_state_tuple, next_actions)
-                
-                # Update Q table for the other agent in case of losing
-                if done and reward != 0:
-                    other_agent = agent2 if player == 1 else agent1
-                    other_agent.update_q_table(state_tuple, action, -reward, next_state_tuple, next_actions)
-                
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        return
+            telemetry.episode_end(played, (env.player1_wincount, env.player2_wincount, env.draw_count), (agent1, agent2))
+            
+            if stop_requested:
+                print(f"Interrupted, stopping after episode {played}")
+                raise KeyboardInterrupt
 
     finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGINT, previous_handler)
         env.close_pygame()
+        if writer is not None:
+            writer.close()
+        if checkpointer is not None:
+            # Only at an episode boundary: tables with part of an episode applied would not resume exactly,
+            # so after a hard interrupt or a closed window the last checkpoint stays the newest
+            if consistent and played > checkpointer.last_episode:
+                checkpoint()
+            checkpointer.close()
+        telemetry.close()
         print(f"Player 1 wins: {env.player1_wincount} times")
         print(f"Player 2 wins: {env.player2_wincount} times")
         print(f"Draws: {env.draw_count}")
 
-    agent1.save_model('agents\\agent1_q_table.pkl')
-    agent2.save_model('agents\\agent2_q_table.pkl')
+    if save:
+        save_agents(agent1, agent2)
+    
+    return agent1, agent2
+
+def save_agents(agent1: QLearningAgent, agent2: QLearningAgent) -> None:
+    """
+        Args:
+            agent1: Agent playing as player 1 (X)
+            agent2: Agent playing as player 2 (O)
+        
+        Returns:
+            None
+        
+        Concept:
+            Saves the q_tables of both agents in the agents folder.
+    """
+    
+    agent1.save_model(os.path.join('agents', 'agent1_q_table.pkl'))
+    agent2.save_model(os.path.join('agents', 'agent2_q_table.pkl'))
+
+def self_play_worker(connection, seed: int, epsilon: float, alpha: float, gamma: float, backend: str, symmetry: bool) -> None:
+    """
+        Args:
+            connection: Pipe to the coordinator
+            seed: Seed of the random module of this worker
+            epsilon: The exploration rate
+            alpha: The learning rate
+            gamma: The discount factor
+            backend: Storage of the q_tables
+            symmetry: Whether the agents use the symmetry layer
+        
+        Returns:
+            None
+        
+        Concept:
+            Receives (merged entries of agent 1, merged entries of agent 2, episodes) from the coordinator, loads the merged entries,
+            plays the episodes headless and sends back the entries it changed and the win counts. A None message stops the worker.
+    """
+    
+    random.seed(seed)
+    env = TicTacToe(headless=True)
+    agent1 = QLearningAgent(player=1, epsilon=epsilon, alpha=alpha, gamma=gamma, backend=backend, symmetry=symmetry)
+    agent2 = QLearningAgent(player=-1, epsilon=epsilon, alpha=alpha, gamma=gamma, backend=backend, symmetry=symmetry)
+    
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            
+            merged1, merged2, episodes = message
+            agent1.q_table.load_entries(merged1)
+            agent2.q_table.load_entries(merged2)
+            
+            counts = (env.player1_wincount, env.player2_wincount, env.draw_count)
+            for _ in range(episodes):
+                play_episode(env, agent1, agent2)
+            counts = (env.player1_wincount - counts[0], env.player2_wincount - counts[1], env.draw_count - counts[2])
+            
+            connection.send((agent1.q_table.drain_changes(), agent2.q_table.drain_changes(), counts))
+    
+    connection.close()
+
+def merge_changes(q_table, changes: list) -> dict:
+    """
+        Args:
+            q_table: The coordinator's q_table, holding the values every worker started the round from
+            changes: Changed entries sent by each worker
+        
+        Returns:
+            The merged entries
+        
+        Concept:
+            Unweighted mean: every entry moves by the mean of the deltas of the workers that changed it, each worker counting once
+            however often it updated the entry during the round.
+    """
+    
+    delta_sums = defaultdict(float)
+    delta_counts = defaultdict(int)
+    for worker_changes in changes:
+        for (state, action), q in worker_changes.items():
+            delta_sums[(state, action)] += q - q_table.get(state, action)
+            delta_counts[(state, action)] += 1
+    
+    merged = {key: q_table.get(*key) + delta_sums[key] / delta_counts[key] for key in delta_sums}
+    q_table.load_entries(merged)
+    
+    return merged
+
+def train_parallel(episodes: int, epsilon: float, alpha: float, gamma: float, workers: int, sync_every: int = 1000, backend: str = "dict", symmetry: bool = False, seed: int = None, save: bool = True) -> tuple[QLearningAgent, QLearningAgent]:
+    """
+        Args:
+            episodes: Total number of self-play episodes over all workers
+            epsilon: The exploration rate
+            alpha: The learning rate
+            gamma: The discount factor
+            workers: Number of worker processes
+            sync_every: Episodes each worker plays between merges
+            backend: Storage of the q_tables
+            symmetry: Whether the agents use the symmetry layer
+            seed: Base seed, worker i uses seed + i (random seeds if None)
+            save: Whether to save the q_tables when done
+        
+        Returns:
+            The merged agents
+        
+        Concept:
+            Starts K headless self-play workers. After every round of sync_every episodes the coordinator merges the changed entries
+            of all workers, and broadcasts the merged entries with the next round. With save the merged q_tables are saved like in train().
+    """
+    
+    agent1 = QLearningAgent(player=1, epsilon=epsilon, alpha=alpha, gamma=gamma, backend=backend, symmetry=symmetry)
+    agent2 = QLearningAgent(player=-1, epsilon=epsilon, alpha=alpha, gamma=gamma, backend=backend, symmetry=symmetry)
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+    
+    connections = []
+    processes = []
+    for i in range(workers):
+        connection, worker_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=self_play_worker, args=(worker_connection, seed + i, epsilon, alpha, gamma, backend, symmetry), daemon=True)
+        process.start()
+        connections.append(connection)
+        processes.append(process)
+    
+    wins = [0, 0, 0]
+    merged1, merged2 = {}, {}
+    played = 0
+    try:
+        while played < episodes:
+            round_episodes = min(sync_every, -(-(episodes - played) // workers))
+            for i, connection in enumerate(connections):
+                # Spread the last, shorter round evenly and never play more than requested
+                worker_episodes = max(0, min(round_episodes, episodes - played - i * round_episodes))
+                connection.send((merged1, merged2, worker_episodes))
+            results = [connection.recv() for connection in connections]
+            
+            merged1 = merge_changes(agent1.q_table, [changes1 for changes1, _, _ in results])
+            merged2 = merge_changes(agent2.q_table, [changes2 for _, changes2, _ in results])
+            for _, _, counts in results:
+                wins = [total + count for total, count in zip(wins, counts)]
+            
+            played = min(episodes, played + round_episodes * workers)
+            print(f"Episode {played}/{episodes}")
+    finally:
+        for connection in connections:
+            connection.send(None)
+        for process in processes:
+            process.join()
+        print(f"Player 1 wins: {wins[0]} times")
+        print(f"Player 2 wins: {wins[1]} times")
+        print(f"Draws: {wins[2]}")
+    
+    if save:
+        save_agents(agent1, agent2)
+    
+    return agent1, agent2
+
+def shared_actor(agent1: QLearningAgent, agent2: QLearningAgent, seed: int, episodes: int, results) -> None:
+    """
+        Args:
+            agent1: Agent playing as player 1 (X), backed by a shared q_table
+            agent2: Agent playing as player 2 (O), backed by a shared q_table
+            seed: Seed of the random module of this actor
+            episodes: Number of episodes to play
+            results: Queue receiving (player 1 wins, player 2 wins, draws, moves) when done
+        
+        Returns:
+            None
+        
+        Concept:
+            Plays headless self-play episodes, applying every TD update directly to the shared q_tables.
+    """
+    
+    random.seed(seed)
+    env = TicTacToe(headless=True)
+    moves = 0
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(episodes):
+            play_episode(env, agent1, agent2)
+            moves += int((env.board != 0).sum())
+    
+    results.put((env.player1_wincount, env.player2_wincount, env.draw_count, moves))
+
+def train_shared(episodes: int, epsilon: float, alpha: float, gamma: float, actors: int, lock_stripes: int = 0, symmetry: bool = False, seed: int = None, save: bool = True) -> tuple[QLearningAgent, QLearningAgent, int]:
+    """
+        Args:
+            episodes: Total number of self-play episodes over all actors
+            epsilon: The exploration rate
+            alpha: The learning rate
+            gamma: The discount factor
+            actors: Number of actor processes
+            lock_stripes: Number of stripe locks per q_table, 0 for lock-free updates
+            symmetry: Whether the agents use the symmetry layer
+            seed: Base seed, actor i uses seed + i (random seeds if None)
+            save: Whether to save the q_tables when done
+        
+        Returns:
+            The trained agents and the total number of moves played
+        
+        Concept:
+            Both agents are backed by a SharedArrayQTable and K actor processes update them in place, so nothing is pickled or merged.
+            The shared memory is copied into regular array tables at the end and freed.
+    """
+    
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+    agents = []
+    shared_tables = []
+    for player in (1, -1):
+        agent = QLearningAgent(player=player, epsilon=epsilon, alpha=alpha, gamma=gamma, backend="array", symmetry=symmetry)
+        shared_table = SharedArrayQTable(lock_stripes=lock_stripes)
+        agent.q_table = SymmetricQTable(shared_table) if symmetry else shared_table
+        agents.append(agent)
+        shared_tables.append(shared_table)
+    
+    results = multiprocessing.Queue()
+    processes = []
+    for i in range(actors):
+        actor_episodes = episodes // actors + (i < episodes % actors)
+        process = multiprocessing.Process(target=shared_actor, args=(agents[0], agents[1], seed + i, actor_episodes, results), daemon=True)
+        process.start()
+        processes.append(process)
+    
+    totals = [0, 0, 0, 0]
+    try:
+        for _ in processes:
+            totals = [total + count for total, count in zip(totals, results.get())]
+        for process in processes:
+            process.join()
+        
+        for agent, shared_table in zip(agents, shared_tables):
+            agent.q_table = agent.make_q_table(agent.q_table.to_dict())
+    finally:
+        for shared_table in shared_tables:
+            shared_table.close()
+        print(f"Player 1 wins: {totals[0]} times")
+        print(f"Player 2 wins: {totals[1]} times")
+        print(f"Draws: {totals[2]}")
+    
+    if save:
+        save_agents(agents[0], agents[1])
+    
+    return agents[0], agents[1], totals[3]
 
 if __name__ == "__main__":
     epsilon = 0.25    # Exploration Rate
     alpha = 0.07      # Learning Rate
     gamma = 0.8       # Discount Factor
     episodes = 100000 # Iteration Count
+    headless = True   # Train without pygame
+    render_every = 1  # Render every Nth episode when not headless
+    backend = "dict"  # Q-table storage, "dict", "array", "hashed" or "bounded"
+    symmetry = False  # Share q values between the 8 rotations and reflections of a board
+    workers = 1       # Self-play processes, more than 1 trains headless in parallel
+    sync_every = 1000 # Episodes each worker plays between q_table merges
+    checkpoint_every = 10000   # Episodes between checkpoints
+    checkpoint_seconds = 300.0 # Seconds between checkpoints
+    trajectory_dir = None      # Folder to stream transitions to, e.g. "trajectories"
+    replay_capacity = 0        # Online replay buffer size, needs backend "array" and no symmetry
+    telemetry_every = 10000    # Episodes between telemetry snapshots
+    size = 3                   # Rows and columns of the board, boards other than 3x3 need backend "dict", "hashed" or "bounded"
+    win_length = None          # Marks in a row needed to win, None for a full row
+    render_async = False       # Draw on a separate thread that drops frames, so watching does not slow training (not on macOS)
+    
+    parser = argparse.ArgumentParser(description="Train both agents through self-play.")
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="Folder of the periodic checkpoints, empty to disable")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint in --checkpoint-dir")
+    parser.add_argument("--telemetry", nargs="*", default=["print"], choices=["print", "jsonl", "http"], help="Telemetry sinks, none to disable telemetry")
+    parser.add_argument("--telemetry-file", default=os.path.join("output_files", "telemetry.jsonl"))
+    parser.add_argument("--telemetry-port", type=int, default=8766, help="Port of the http sink, GET /metrics")
+    parser.add_argument("--profile", default="", help="Episode window to run cProfile over, e.g. 1000:2000")
+    args = parser.parse_args()
+    
+    sinks = []
+    if "print" in args.telemetry:
+        sinks.append(PrintSink())
+    if "jsonl" in args.telemetry:
+        sinks.append(JsonlSink(args.telemetry_file))
+    if "http" in args.telemetry:
+        sinks.append(HttpSink(port=args.telemetry_port))
+    profile_window = tuple(int(episode) for episode in args.profile.split(":")) if args.profile else None
+    telemetry = Telemetry(sinks, every_episodes=telemetry_every, profile_window=profile_window) if sinks or profile_window else None
     
-    train(episodes=episodes, epsilon=epsilon, alpha=alpha, gamma=gamma)
\ No newline at end of file
+    if workers > 1:
+        train_parallel(episodes=episodes, epsilon=epsilon, alpha=alpha, gamma=gamma, workers=workers, sync_every=sync_every, backend=backend, symmetry=symmetry)
+    else:
+        train(episodes=episodes, epsilon=epsilon, alpha=alpha, gamma=gamma, headless=headless, render_every=render_every, backend=backend, symmetry=symmetry,
+              checkpoint_dir=args.checkpoint_dir or None, checkpoint_every=checkpoint_every, checkpoint_seconds=checkpoint_seconds, resume=args.resume,
+              trajectory_dir=trajectory_dir, replay_capacity=replay_capacity, telemetry=telemetry, size=size, win_length=win_length, render_async=render_async)